@@ -8,7 +8,7 @@ from sqlalchemy import engine_from_config, pool
 from sqlalchemy.orm import sessionmaker
 
 from database import Base
-from models import Check, Target, User  # noqa: F401 — register with Base.metadata
+from models import Check, CheckRollup, Incident, Target, TargetStatus, User, WorkerHeartbeat  # noqa: F401 — register with Base.metadata
 
 config = context.config
 if config.config_file_name is not None:
@@ -0,0 +1,25 @@
+"""Add per-target check_interval_seconds to targets.
+
+Revision ID: 003
+Revises: 002
+Create Date: Add check_interval_seconds
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL means "use the worker's CHECK_INTERVAL_SECONDS"
+    op.add_column("targets", sa.Column("check_interval_seconds", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("targets", "check_interval_seconds")
@@ -0,0 +1,33 @@
+"""Add worker_heartbeats for sharding targets across worker replicas.
+
+Revision ID: 004
+Revises: 003
+Create Date: Add worker_heartbeats
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "worker_heartbeats",
+        sa.Column("worker_id", sa.String(length=255), nullable=False),
+        sa.Column("hostname", sa.String(length=255), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("worker_id"),
+    )
+    op.create_index(op.f("ix_worker_heartbeats_last_seen_at"), "worker_heartbeats", ["last_seen_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_worker_heartbeats_last_seen_at"), table_name="worker_heartbeats")
+    op.drop_table("worker_heartbeats")
@@ -0,0 +1,110 @@
+"""Add check_rollups (1m/1h/1d per-target aggregates with latency sketch) and backfill from checks.
+
+Revision ID: 005
+Revises: 004
+Create Date: Add check_rollups
+
+"""
+import math
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match GAMMA in worker/rollups.py and backend/rollups.py
+_LOG_GAMMA = math.log(1.02 / 0.98)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "check_rollups",
+        sa.Column("target_id", sa.Integer(), nullable=False),
+        sa.Column("bucket_seconds", sa.Integer(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("checks", sa.Integer(), nullable=False),
+        sa.Column("up_checks", sa.Integer(), nullable=False),
+        sa.Column("latency_count", sa.Integer(), nullable=False),
+        sa.Column("latency_min", sa.Integer(), nullable=True),
+        sa.Column("latency_max", sa.Integer(), nullable=True),
+        sa.Column("latency_sum", sa.BigInteger(), nullable=False),
+        sa.Column("latency_sketch", postgresql.JSONB(), server_default=sa.text("'{}'::jsonb"), nullable=False),
+        sa.ForeignKeyConstraint(["target_id"], ["targets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("target_id", "bucket_seconds", "bucket_start"),
+    )
+    # Sketches are {bucket index: count}; merging adds counts per index.
+    op.execute(
+        sa.text(
+            """
+            CREATE FUNCTION merge_latency_sketch(a jsonb, b jsonb) RETURNS jsonb
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+                SELECT COALESCE(jsonb_object_agg(key, total), '{}'::jsonb)
+                FROM (
+                    SELECT key, SUM(value::bigint) AS total
+                    FROM (
+                        SELECT * FROM jsonb_each_text(COALESCE(a, '{}'::jsonb))
+                        UNION ALL
+                        SELECT * FROM jsonb_each_text(COALESCE(b, '{}'::jsonb))
+                    ) kv
+                    GROUP BY key
+                ) merged
+            $$
+            """
+        )
+    )
+    op.execute(
+        sa.text(
+            """
+            CREATE AGGREGATE latency_sketch_sum(jsonb) (
+                SFUNC = merge_latency_sketch, STYPE = jsonb, INITCOND = '{}'
+            )
+            """
+        )
+    )
+    op.execute(
+        sa.text(
+            f"""
+            WITH per_index AS (
+                SELECT
+                    c.target_id,
+                    g.seconds,
+                    to_timestamp(floor(extract(epoch FROM c.checked_at) / g.seconds) * g.seconds) AS bucket_start,
+                    CASE
+                        WHEN c.latency_ms IS NULL THEN NULL
+                        WHEN c.latency_ms <= 0 THEN 0
+                        ELSE ceil(ln(c.latency_ms) / {_LOG_GAMMA})::int
+                    END AS idx,
+                    count(*) AS n,
+                    count(*) FILTER (WHERE c.is_up) AS up,
+                    count(c.latency_ms) AS lat_n,
+                    min(c.latency_ms) AS lat_min,
+                    max(c.latency_ms) AS lat_max,
+                    COALESCE(sum(c.latency_ms), 0) AS lat_sum
+                FROM checks c
+                CROSS JOIN (VALUES (60), (3600), (86400)) AS g(seconds)
+                GROUP BY 1, 2, 3, 4
+            )
+            INSERT INTO check_rollups (
+                target_id, bucket_seconds, bucket_start, checks, up_checks,
+                latency_count, latency_min, latency_max, latency_sum, latency_sketch
+            )
+            SELECT
+                target_id, seconds, bucket_start, sum(n), sum(up),
+                sum(lat_n), min(lat_min), max(lat_max), sum(lat_sum),
+                COALESCE(jsonb_object_agg(idx::text, lat_n) FILTER (WHERE idx IS NOT NULL), '{{}}'::jsonb)
+            FROM per_index
+            GROUP BY target_id, seconds, bucket_start
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("check_rollups")
+    op.execute(sa.text("DROP AGGREGATE IF EXISTS latency_sketch_sum(jsonb)"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS merge_latency_sketch(jsonb, jsonb)"))
@@ -0,0 +1,183 @@
+"""Partition checks by day on checked_at; add partition maintenance functions.
+
+The table is rebuilt as a range-partitioned table with one partition per UTC day. Existing rows are copied
+over. The standalone ix_checks_target_id and ix_checks_checked_at indexes are not recreated: partition
+pruning covers time ranges and (target_id, checked_at DESC) covers per-target lookups. The worker calls
+ensure_checks_partitions() to create upcoming days and drop_checks_partitions_before() to apply its
+retention policy by dropping whole partitions instead of deleting rows.
+
+Revision ID: 006
+Revises: 005
+Create Date: Partition checks
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Serializes partition DDL between worker replicas (pg_advisory_xact_lock key).
+_PARTITION_LOCK_KEY = 7_300_001
+
+
+def upgrade() -> None:
+    op.execute(
+        sa.text(
+            f"""
+            CREATE FUNCTION ensure_checks_partitions(from_day date, to_day date) RETURNS integer
+            LANGUAGE plpgsql AS $$
+            DECLARE
+                day date := from_day;
+                created integer := 0;
+                part text;
+            BEGIN
+                PERFORM pg_advisory_xact_lock({_PARTITION_LOCK_KEY});
+                WHILE day <= to_day LOOP
+                    part := 'checks_p' || to_char(day, 'YYYYMMDD');
+                    IF to_regclass(part) IS NULL THEN
+                        EXECUTE format(
+                            'CREATE TABLE %I PARTITION OF checks FOR VALUES FROM (%L) TO (%L)',
+                            part,
+                            (day::timestamp AT TIME ZONE 'UTC'),
+                            ((day + 1)::timestamp AT TIME ZONE 'UTC')
+                        );
+                        created := created + 1;
+                    END IF;
+                    day := day + 1;
+                END LOOP;
+                RETURN created;
+            END
+            $$
+            """
+        )
+    )
+    op.execute(
+        sa.text(
+            f"""
+            CREATE FUNCTION drop_checks_partitions_before(cutoff date) RETURNS integer
+            LANGUAGE plpgsql AS $$
+            DECLARE
+                part record;
+                dropped integer := 0;
+            BEGIN
+                PERFORM pg_advisory_xact_lock({_PARTITION_LOCK_KEY});
+                FOR part IN
+                    SELECT c.relname
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    JOIN pg_class p ON p.oid = i.inhparent
+                    WHERE p.relname = 'checks'
+                      AND c.relname ~ '^checks_p[0-9]{{8}}$'
+                      AND to_date(substring(c.relname FROM 9), 'YYYYMMDD') < cutoff
+                LOOP
+                    EXECUTE format('DROP TABLE %I', part.relname);
+                    dropped := dropped + 1;
+                END LOOP;
+                RETURN dropped;
+            END
+            $$
+            """
+        )
+    )
+
+    op.execute(sa.text("ALTER TABLE checks RENAME TO checks_old"))
+    op.execute(sa.text("ALTER INDEX checks_pkey RENAME TO checks_old_pkey"))
+    op.execute(sa.text("ALTER INDEX ix_checks_target_id_checked_at RENAME TO ix_checks_old_target_id_checked_at"))
+    # Keep the id sequence (and its current value) when the old table is dropped; widen it for large tables.
+    op.execute(sa.text("ALTER SEQUENCE checks_id_seq OWNED BY NONE"))
+    op.execute(sa.text("ALTER SEQUENCE checks_id_seq AS bigint"))
+    op.execute(
+        sa.text(
+            """
+            CREATE TABLE checks (
+                id BIGINT NOT NULL DEFAULT nextval('checks_id_seq'),
+                target_id INTEGER NOT NULL REFERENCES targets (id) ON DELETE CASCADE,
+                checked_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                status_code INTEGER,
+                latency_ms INTEGER,
+                is_up BOOLEAN NOT NULL,
+                error TEXT,
+                CONSTRAINT checks_pkey PRIMARY KEY (id, checked_at)
+            ) PARTITION BY RANGE (checked_at)
+            """
+        )
+    )
+    op.execute(sa.text("ALTER SEQUENCE checks_id_seq OWNED BY checks.id"))
+    op.execute(
+        sa.text(
+            """
+            SELECT ensure_checks_partitions(
+                LEAST(
+                    COALESCE((SELECT min(checked_at) FROM checks_old), now())::date,
+                    (now() AT TIME ZONE 'UTC')::date
+                ) - 1,
+                GREATEST(
+                    COALESCE((SELECT max(checked_at) FROM checks_old), now())::date,
+                    (now() AT TIME ZONE 'UTC')::date
+                ) + 7
+            )
+            """
+        )
+    )
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO checks (id, target_id, checked_at, status_code, latency_ms, is_up, error)
+            SELECT id, target_id, checked_at, status_code, latency_ms, is_up, error FROM checks_old
+            """
+        )
+    )
+    op.execute(sa.text("DROP TABLE checks_old"))
+    op.create_index(
+        "ix_checks_target_id_checked_at",
+        "checks",
+        ["target_id", "checked_at"],
+        unique=False,
+        postgresql_ops={"checked_at": "DESC"},
+    )
+
+
+def downgrade() -> None:
+    op.execute(sa.text("ALTER TABLE checks RENAME TO checks_partitioned"))
+    op.execute(sa.text("ALTER INDEX checks_pkey RENAME TO checks_partitioned_pkey"))
+    op.execute(sa.text("ALTER INDEX ix_checks_target_id_checked_at RENAME TO ix_checks_partitioned_target_id_checked_at"))
+    op.execute(sa.text("ALTER SEQUENCE checks_id_seq OWNED BY NONE"))
+    op.create_table(
+        "checks",
+        sa.Column("id", sa.Integer(), server_default=sa.text("nextval('checks_id_seq')"), nullable=False),
+        sa.Column("target_id", sa.Integer(), nullable=False),
+        sa.Column("checked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("latency_ms", sa.Integer(), nullable=True),
+        sa.Column("is_up", sa.Boolean(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["target_id"], ["targets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO checks (id, target_id, checked_at, status_code, latency_ms, is_up, error)
+            SELECT id, target_id, checked_at, status_code, latency_ms, is_up, error FROM checks_partitioned
+            """
+        )
+    )
+    op.execute(sa.text("DROP TABLE checks_partitioned"))
+    op.execute(sa.text("ALTER SEQUENCE checks_id_seq AS integer"))
+    op.execute(sa.text("ALTER SEQUENCE checks_id_seq OWNED BY checks.id"))
+    op.create_index(op.f("ix_checks_target_id"), "checks", ["target_id"], unique=False)
+    op.create_index(op.f("ix_checks_checked_at"), "checks", ["checked_at"], unique=False)
+    op.create_index(
+        "ix_checks_target_id_checked_at",
+        "checks",
+        ["target_id", "checked_at"],
+        unique=False,
+        postgresql_ops={"checked_at": "DESC"},
+    )
+    op.execute(sa.text("DROP FUNCTION IF EXISTS drop_checks_partitions_before(date)"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS ensure_checks_partitions(date, date)"))
@@ -0,0 +1,61 @@
+"""Add target_status: latest check and current up/down state per target, kept current by the worker.
+
+Revision ID: 007
+Revises: 006
+Create Date: Add target_status
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "target_status",
+        sa.Column("target_id", sa.Integer(), nullable=False),
+        sa.Column("checked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("latency_ms", sa.Integer(), nullable=True),
+        sa.Column("is_up", sa.Boolean(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("state_since", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["target_id"], ["targets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("target_id"),
+    )
+    # Backfill from the latest check per target; state_since is the first check after the last
+    # check with the opposite is_up (or the target's first check if it never changed state).
+    op.execute(
+        """
+        INSERT INTO target_status (target_id, checked_at, status_code, latency_ms, is_up, error, state_since)
+        SELECT
+            l.target_id, l.checked_at, l.status_code, l.latency_ms, l.is_up, l.error,
+            (
+                SELECT min(c.checked_at) FROM checks c
+                WHERE c.target_id = l.target_id
+                  AND c.checked_at > COALESCE(
+                      (
+                          SELECT max(f.checked_at) FROM checks f
+                          WHERE f.target_id = l.target_id AND f.is_up <> l.is_up
+                      ),
+                      '-infinity'
+                  )
+            )
+        FROM (
+            SELECT DISTINCT ON (target_id) target_id, checked_at, status_code, latency_ms, is_up, error
+            FROM checks
+            ORDER BY target_id, checked_at DESC
+        ) l
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("target_status")
@@ -0,0 +1,40 @@
+"""Add consecutive_failures and backoff_until to target_status (worker backoff for failing targets).
+
+Revision ID: 008
+Revises: 007
+Create Date: Add target_status backoff state
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "target_status",
+        sa.Column("consecutive_failures", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+    # NULL while the target is checked at its normal interval
+    op.add_column("target_status", sa.Column("backoff_until", sa.DateTime(timezone=True), nullable=True))
+    # Down targets: every check since they went down failed.
+    op.execute(
+        """
+        UPDATE target_status s
+        SET consecutive_failures = (
+            SELECT count(*) FROM checks c WHERE c.target_id = s.target_id AND c.checked_at >= s.state_since
+        )
+        WHERE NOT s.is_up
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("target_status", "backoff_until")
+    op.drop_column("target_status", "consecutive_failures")
@@ -0,0 +1,53 @@
+"""Add incidents: confirmed outages per target, opened and closed by the worker.
+
+Revision ID: 009
+Revises: 008
+Create Date: Add incidents
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "incidents",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("target_id", sa.Integer(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("ended_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("duration_seconds", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["target_id"], ["targets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_incidents_target_id_started_at", "incidents", ["target_id", "started_at"])
+    op.create_index(
+        "uq_incidents_open_target_id",
+        "incidents",
+        ["target_id"],
+        unique=True,
+        postgresql_where=sa.text("ended_at IS NULL"),
+    )
+    # Targets already down for at least the default confirmation count (INCIDENT_CONFIRM_FAILURES=3)
+    # get an open incident from when they went down; earlier history is not replayed.
+    op.execute(
+        """
+        INSERT INTO incidents (target_id, started_at, error)
+        SELECT target_id, state_since, error FROM target_status
+        WHERE NOT is_up AND consecutive_failures >= 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_incidents_open_target_id", table_name="incidents")
+    op.drop_index("ix_incidents_target_id_started_at", table_name="incidents")
+    op.drop_table("incidents")
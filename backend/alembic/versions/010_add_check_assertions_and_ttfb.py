@@ -0,0 +1,31 @@
+"""Add per-target check assertions and time to first byte per check.
+
+Revision ID: 010
+Revises: 009
+Create Date: Add check assertions and ttfb
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("targets", sa.Column("expected_status", sa.Integer(), nullable=True))
+    op.add_column("targets", sa.Column("body_keyword", sa.Text(), nullable=True))
+    op.add_column("targets", sa.Column("body_regex", sa.Text(), nullable=True))
+    # Nullable without a default: a catalog-only change on the partitioned table and all its partitions.
+    op.add_column("checks", sa.Column("ttfb_ms", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("checks", "ttfb_ms")
+    op.drop_column("targets", "body_regex")
+    op.drop_column("targets", "body_keyword")
+    op.drop_column("targets", "expected_status")
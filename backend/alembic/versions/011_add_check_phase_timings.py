@@ -0,0 +1,29 @@
+"""Add DNS, connect, TLS and transfer time per check.
+
+Revision ID: 011
+Revises: 010
+Create Date: Add check phase timings
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PHASES = ("dns_ms", "connect_ms", "tls_ms", "transfer_ms")
+
+
+def upgrade() -> None:
+    # Nullable without a default, like ttfb_ms in 010: no rewrite of the partitions.
+    for column in PHASES:
+        op.add_column("checks", sa.Column(column, sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    for column in reversed(PHASES):
+        op.drop_column("checks", column)
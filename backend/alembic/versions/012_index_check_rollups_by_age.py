@@ -0,0 +1,26 @@
+"""Index check_rollups by granularity and bucket start, for expiring old rollups.
+
+Revision ID: 012
+Revises: 011
+Create Date: Index check rollups by age
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The primary key leads with target_id; the worker deletes by (bucket_seconds, bucket_start < cutoff).
+    op.create_index(
+        "ix_check_rollups_bucket_seconds_bucket_start", "check_rollups", ["bucket_seconds", "bucket_start"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_check_rollups_bucket_seconds_bucket_start", table_name="check_rollups")
@@ -1,14 +1,20 @@
 """Authentication: password hashing, JWT cookies, dependencies."""
 
-from auth.deps import get_current_user
-from auth.password import hash_password, verify_password
+from auth.deps import get_current_principal, get_current_user, get_stream_user_id
+from auth.password import hash_password, password_hasher, verify_password
 from auth.cookies import create_session_cookie, read_session_token, clear_session_cookie
+from auth.principal import Principal, principal_cache
 
 __all__ = [
+    "get_current_principal",
     "get_current_user",
+    "get_stream_user_id",
     "hash_password",
+    "password_hasher",
     "verify_password",
     "create_session_cookie",
     "read_session_token",
     "clear_session_cookie",
+    "Principal",
+    "principal_cache",
 ]
@@ -5,16 +5,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.cookies import read_session_token
+from auth.principal import Principal, principal_cache
 from config import settings
-from database import get_db
+from database import AsyncSessionLocal, get_db
 from models import User
 
 
-async def get_current_user(
-    request: Request,
-    session: AsyncSession = Depends(get_db),
-) -> User:
-    """Require authenticated user; derive from HTTP-only session cookie."""
+def _session_payload(request: Request) -> tuple[int, dict]:
     session_cookie = request.cookies.get(settings.COOKIE_NAME)
     payload = read_session_token(session_cookie)
     if not payload or "sub" not in payload:
@@ -24,11 +21,48 @@ async def get_current_user(
         )
     user_id = payload.get("sub")
     try:
-        uid = int(user_id)
+        return int(user_id), payload
     except (TypeError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session")
+
+
+async def get_current_principal(request: Request) -> Principal:
+    """
+    Require authenticated user, as a Principal (id, email). Served from the in-process cache when the
+    session token was verified recently; otherwise the JWT is decoded and the user looked up in a short
+    session of its own (never the request's get_db session, which stays unopened on read paths).
+    """
+    token = request.cookies.get(settings.COOKIE_NAME)
+    if token:
+        principal = principal_cache.get(token)
+        if principal is not None:
+            return principal
+    uid, payload = _session_payload(request)
+    async with AsyncSessionLocal() as session:
+        row = (await session.execute(select(User.id, User.email).where(User.id == uid))).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    principal = Principal(id=row.id, email=row.email)
+    principal_cache.put(token, principal, payload.get("exp"))
+    return principal
+
+
+async def get_current_user(
+    request: Request,
+    session: AsyncSession = Depends(get_db),
+) -> User:
+    """Require authenticated user as an ORM entity (for routes that modify the user itself)."""
+    uid, _ = _session_payload(request)
     result = await session.execute(select(User).where(User.id == uid))
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
+
+
+async def get_stream_user_id(principal: Principal = Depends(get_current_principal)) -> int:
+    """
+    Require authenticated user for a long-lived (streaming) response. Built on get_current_principal so
+    no pooled DB connection is held for the lifetime of the stream, as a get_db dependency would be.
+    """
+    return principal.id
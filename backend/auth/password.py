@@ -1,5 +1,15 @@
 """Password hashing using Argon2 (fallback to bcrypt if unavailable)."""
 
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from config import settings
+
 try:
     from passlib.context import CryptContext
     _ctx = CryptContext(schemes=["argon2"], deprecated="auto")
@@ -16,3 +26,94 @@ def hash_password(plain: str) -> str:
 
 def verify_password(plain: str, hashed: str) -> bool:
     return _ctx.verify(plain, hashed)
+
+
+class HashStats:
+    """Counters for hashing work done through the pool (updated from worker threads)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def observe(self, waited: float, hashed: float) -> None:
+        with self._lock:
+            self.completed += 1
+            self.hash_seconds += hashed
+            self.max_hash_seconds = max(self.max_hash_seconds, hashed)
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            n = self.completed
+            return {
+                "completed": n,
+                "rejected": self.rejected,
+                "hash_ms_mean": round(self.hash_seconds / n * 1000, 1) if n else None,
+                "hash_ms_max": round(self.max_hash_seconds * 1000, 1),
+                "queue_wait_ms_mean": round(self.wait_seconds / n * 1000, 1) if n else None,
+                "queue_wait_ms_max": round(self.max_wait_seconds * 1000, 1),
+            }
+
+
+class PasswordHasher:
+    """
+    Run hash/verify on a dedicated thread pool so Argon2 never blocks the event loop (argon2-cffi
+    releases the GIL while hashing). At most `workers + queue_limit` calls are admitted at once; beyond
+    that callers get 503 instead of queueing without bound, so a login storm cannot starve the rest of
+    the API.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.stats = HashStats()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._admitted = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._admitted
+
+    async def hash(self, plain: str) -> str:
+        return await self._run(hash_password, plain)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(verify_password, plain, hashed)
+
+    async def _run(self, fn, *args):
+        if self._admitted >= self.workers + self.queue_limit:
+            self.stats.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in attempts in progress; try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._admitted += 1
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.stats.observe(started - submitted, time.perf_counter() - started)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self._admitted -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS or max(1, (os.cpu_count() or 2) - 1),
+    settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
@@ -0,0 +1,119 @@
+"""
+Verified session principals cached in-process, so authenticated requests skip the users lookup.
+
+Entries are keyed by session token and live for AUTH_CACHE_TTL_SECONDS (never past the token's own
+expiry). A user's entries are dropped when a transaction in this process that deletes the user or
+changes its password hash or email through the ORM commits; other API processes see such changes once
+their entries expire.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from config import settings
+from models import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as routes need it: no ORM entity, no session."""
+
+    id: int
+    email: str
+
+
+class PrincipalCache:
+    """LRU of token -> (Principal, expires_at) with a per-user index for invalidation."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[Principal, float]] = OrderedDict()
+        self._tokens_by_user: dict[int, set[str]] = {}
+
+    def get(self, token: str) -> Principal | None:
+        entry = self._entries.get(token)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                self.forget(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, token: str, principal: Principal, token_expires_at: float | None = None) -> None:
+        """Cache principal for token; token_expires_at (epoch seconds) caps the entry's lifetime."""
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        self.forget(token)
+        self._entries[token] = (principal, time.monotonic() + ttl)
+        self._tokens_by_user.setdefault(principal.id, set()).add(token)
+        while len(self._entries) > self.max_size:
+            self.forget(next(iter(self._entries)))
+
+    def forget(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[0].id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[0].id]
+
+    def invalidate_user(self, user_id: int) -> None:
+        for token in list(self._tokens_by_user.get(user_id, ())):
+            self.forget(token)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+# Session.info key: ids of users changed by the session's current transaction.
+_CHANGED_USERS = "principal_cache_changed_users"
+
+
+def _changed(target: User) -> None:
+    # Flush time is too early to invalidate: a request could re-cache the old row before the commit.
+    object_session(target).info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target: User) -> None:
+    _changed(target)
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target: User) -> None:
+    attrs = inspect(target).attrs
+    if attrs.password_hash.history.has_changes() or attrs.email.history.has_changes():
+        _changed(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    # Releasing a savepoint also fires after_commit; only the outermost commit makes the change visible.
+    if session.get_nested_transaction() is None:
+        for user_id in session.info.pop(_CHANGED_USERS, ()):
+            principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_rolled_back(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_CHANGED_USERS, None)
@@ -0,0 +1 @@
+"""Benchmarks for the API (run from backend/: python -m bench.<name>)."""
@@ -1,13 +1,74 @@
 """Async SQLAlchemy engine and session management."""
 
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from config import settings
 
+
+class PoolStats:
+    """Connection acquisition counters for the engine's pool (read by /health/details)."""
+
+    def __init__(self):
+        self.waiting = 0
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.acquisitions += 1
+        self.wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that times every checkout, including the wait for a free connection, and counts
+    the checkouts that found the pool exhausted (no idle connection and no overflow left) as waiting.
+    """
+
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self.max_overflow = max_overflow
+
+    def exhausted(self) -> bool:
+        """True if a checkout now has to wait for another one to return its connection."""
+        if self.checkedout() < self.size() + self.overflow():
+            return False  # an idle connection is available
+        return self.max_overflow > -1 and self.overflow() >= self.max_overflow
+
+    def _do_get(self):
+        waiting = self.exhausted()
+        pool_stats.waiting += waiting
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.waiting -= waiting
+            pool_stats.observe(time.perf_counter() - start)
+
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -23,6 +84,24 @@ class Base(DeclarativeBase):
     pass
 
 
+def pool_status() -> dict:
+    """Point-in-time pool occupancy plus cumulative acquisition stats."""
+    pool = engine.pool
+    n = pool_stats.acquisitions
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "waiting": pool_stats.waiting,
+        "acquisitions": n,
+        "timeouts": pool_stats.timeouts,
+        "acquire_ms_mean": round(pool_stats.wait_seconds / n * 1000, 2) if n else None,
+        "acquire_ms_max": round(pool_stats.max_wait_seconds * 1000, 2),
+    }
+
+
 async def get_db():
     """Dependency that yields an async database session."""
     async with AsyncSessionLocal() as session:
@@ -0,0 +1,111 @@
+"""
+Live check results for SSE subscribers.
+
+The worker sends one NOTIFY per updated target after each flush (payload "<user_id>|<json>"; see
+worker/status.py). Each API process holds a single LISTEN connection, opened when the first client
+subscribes, and hands each payload to that user's subscriber queues without parsing it. An idle
+dashboard therefore costs one queue and a keepalive every few seconds, and no database queries.
+"""
+
+import asyncio
+import logging
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sent to every subscriber after the listener (re)connects: events may have been missed, refetch.
+RESYNC = "resync"
+
+
+class EventHub:
+    """Fan NOTIFY payloads on `channel` out to per-user asyncio queues (one LISTEN connection per process)."""
+
+    def __init__(self, dsn: str, channel: str, queue_size: int, reconnect_seconds: float = 5.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.queue_size = queue_size
+        self.reconnect_seconds = reconnect_seconds
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """Return a queue of JSON payloads (or RESYNC) for user_id; starts the listener if needed."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(str(user_id), set()).add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(str(user_id))
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[str(user_id)]
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _deliver(self, queue: asyncio.Queue, message: str) -> None:
+        if queue.full():
+            # A stalled client: drop its backlog and tell it to refetch instead of growing without bound.
+            while not queue.empty():
+                queue.get_nowait()
+            message = RESYNC
+        queue.put_nowait(message)
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        user_id, _, message = payload.partition("|")
+        for queue in self._subscribers.get(user_id, ()):
+            self._deliver(queue, message)
+
+    async def _listen(self) -> None:
+        connected_before = False
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Event listener could not connect: %s", e)
+                await asyncio.sleep(self.reconnect_seconds)
+                continue
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: lost.set())
+            try:
+                await conn.add_listener(self.channel, self._on_notify)
+                if connected_before:
+                    for queues in self._subscribers.values():
+                        for queue in queues:
+                            self._deliver(queue, RESYNC)
+                connected_before = True
+                logger.info("Listening for check results on %r", self.channel)
+                await lost.wait()
+                logger.warning("Event listener connection lost; reconnecting")
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Event listener failed: %s", e)
+            finally:
+                if not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(self.reconnect_seconds)
+
+
+def _listen_dsn(url: str) -> str:
+    """DATABASE_URL as a plain libpq URL for asyncpg (drops the +asyncpg driver suffix)."""
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+hub = EventHub(_listen_dsn(settings.DATABASE_URL), settings.EVENTS_CHANNEL, settings.EVENTS_QUEUE_SIZE)
@@ -0,0 +1,91 @@
+"""
+Streaming encoders for exports: NDJSON, CSV and Arrow IPC from an async iterator of row dicts.
+
+Each encoder holds at most one row (NDJSON/CSV) or one record batch (Arrow) at a time, and chunked()
+coalesces the output into ~64 KiB writes, so memory stays flat however many rows are exported.
+Arrow needs the optional pyarrow package.
+"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401 — registers pa.ipc
+except ImportError:  # optional: only format=arrow needs it
+    pa = None
+
+WRITE_BYTES = 64 * 1024
+ARROW_BATCH_ROWS = 10_000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def _text(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def ndjson(rows: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    async for row in rows:
+        yield (json.dumps(row, default=_text) + "\n").encode()
+
+
+async def csv_rows(rows: AsyncIterator[dict], fields: Sequence[str]) -> AsyncIterator[bytes]:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=fields, lineterminator="\n")
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow({k: _text(v) for k, v in row.items()})
+        yield out.getvalue().encode()
+        out.seek(0)
+        out.truncate()
+    yield out.getvalue().encode()
+
+
+async def arrow_ipc(rows: AsyncIterator[dict], schema: "pa.Schema") -> AsyncIterator[bytes]:
+    """Arrow IPC stream: the schema, then one record batch per ARROW_BATCH_ROWS rows, then end-of-stream."""
+    buffer = io.BytesIO()
+    writer = pa.ipc.new_stream(buffer, schema)
+
+    def drain() -> bytes:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    batch: list[dict] = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= ARROW_BATCH_ROWS:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            batch = []
+            yield drain()
+    if batch:
+        writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+    writer.close()
+    yield drain()
+
+
+async def chunked(parts: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Coalesce small pieces into ~WRITE_BYTES writes."""
+    pending: list[bytes] = []
+    size = 0
+    async for part in parts:
+        pending.append(part)
+        size += len(part)
+        if size >= WRITE_BYTES:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
@@ -1,11 +1,25 @@
 """FastAPI application entrypoint."""
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from routers import auth, targets
+from auth import password_hasher, principal_cache
+from database import pool_status
+from events import hub
+from metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, generate_latest
+from routers import auth, bulk, events, targets
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await hub.close()
+    password_hasher.shutdown()
+
 
-app = FastAPI(title="Uptime Monitor API")
+app = FastAPI(title="Uptime Monitor API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,12 +28,42 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(targets.router)
+app.include_router(bulk.router)
+app.include_router(events.router)
 
 
 @app.get("/health")
 async def health():
     """Health check for load balancers and orchestration."""
     return {"status": "ok"}
+
+
+@app.get("/health/details")
+async def health_details():
+    """Process-local counters: DB pool, password hashing pool, session cache, live event subscribers."""
+    return {
+        "status": "ok",
+        "db_pool": pool_status(),
+        "password_hashing": {
+            "workers": password_hasher.workers,
+            "queue_limit": password_hasher.queue_limit,
+            "in_flight": password_hasher.in_flight,
+            **password_hasher.stats.snapshot(),
+        },
+        "auth_cache": {
+            "entries": len(principal_cache),
+            "hits": principal_cache.hits,
+            "misses": principal_cache.misses,
+        },
+        "events": {"subscribers": hub.subscriber_count},
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (request latency per route, DB query time, process counters)."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,126 @@
+"""
+Prometheus metrics for the API, served at GET /metrics.
+
+Request latency is recorded per route template (`/targets/{target_id}/checks`, not the concrete path)
+by a plain ASGI middleware, and query time by SQLAlchemy cursor events on the engine; each is one
+histogram observation. The counters also shown by /health/details (DB pool, password hashing, session
+cache, live event streams) are read only when /metrics is scraped. Values are per process.
+"""
+
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+
+from auth import password_hasher, principal_cache
+from database import engine, pool_stats, pool_status
+from events import hub
+
+__all__ = ["CONTENT_TYPE_LATEST", "MetricsMiddleware", "generate_latest"]
+
+REQUEST_SECONDS = Histogram(
+    "uptime_api_request_seconds",
+    "Time from request start until the response body is sent (streams included), by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_QUERY_SECONDS = Histogram(
+    "uptime_api_db_query_seconds",
+    "Statement execution time as seen by the driver, by leading SQL keyword",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+_OPERATIONS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"))
+_QUERY_TIMER_KEY = "metrics_query_start"
+
+
+class MetricsMiddleware:
+    """Time every HTTP request and label it with the matched route's path template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_SECONDS.labels(scope["method"], route, str(status_code)).observe(time.perf_counter() - start)
+
+
+def _operation(statement: str) -> str:
+    words = statement.lstrip()[:16].split(None, 1)
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in _OPERATIONS else "OTHER"
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_QUERY_TIMER_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info[_QUERY_TIMER_KEY].pop()
+    DB_QUERY_SECONDS.labels(_operation(statement)).observe(time.perf_counter() - started)
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _query_failed(context) -> None:
+    timers = context.connection.info.get(_QUERY_TIMER_KEY) if context.connection is not None else None
+    if timers:
+        timers.pop()
+
+
+class _ProcessCollector:
+    """Expose the /health/details counters at scrape time (nothing is recorded on the request path)."""
+
+    def collect(self):
+        pool = pool_status()
+        yield GaugeMetricFamily("uptime_api_db_pool_size", "Connections kept open by the pool", value=pool["size"])
+        yield GaugeMetricFamily("uptime_api_db_pool_checked_out", "Connections in use", value=pool["checked_out"])
+        yield GaugeMetricFamily("uptime_api_db_pool_overflow", "Connections open beyond the pool size", value=pool["overflow"])
+        yield GaugeMetricFamily("uptime_api_db_pool_waiting", "Requests waiting for a connection because the pool is exhausted", value=pool["waiting"])
+        yield CounterMetricFamily("uptime_api_db_pool_acquisitions", "Connection checkouts", value=pool_stats.acquisitions)
+        yield CounterMetricFamily(
+            "uptime_api_db_pool_acquire_seconds", "Total time spent getting a connection", value=pool_stats.wait_seconds
+        )
+        yield CounterMetricFamily("uptime_api_db_pool_timeouts", "Checkouts that timed out", value=pool_stats.timeouts)
+
+        stats = password_hasher.stats
+        yield GaugeMetricFamily(
+            "uptime_api_password_hash_in_flight", "Hash calls running or queued", value=password_hasher.in_flight
+        )
+        yield CounterMetricFamily("uptime_api_password_hash_completed", "Hash calls completed", value=stats.completed)
+        yield CounterMetricFamily(
+            "uptime_api_password_hash_rejected", "Hash calls refused with 503 (queue full)", value=stats.rejected
+        )
+        yield CounterMetricFamily(
+            "uptime_api_password_hash_seconds", "Total time spent hashing", value=stats.hash_seconds
+        )
+        yield CounterMetricFamily(
+            "uptime_api_password_hash_wait_seconds", "Total time hash calls waited for a thread", value=stats.wait_seconds
+        )
+
+        yield GaugeMetricFamily("uptime_api_auth_cache_entries", "Cached sessions", value=len(principal_cache))
+        yield CounterMetricFamily("uptime_api_auth_cache_hits", "Session lookups served from cache", value=principal_cache.hits)
+        yield CounterMetricFamily("uptime_api_auth_cache_misses", "Session lookups that loaded the user", value=principal_cache.misses)
+
+        yield GaugeMetricFamily("uptime_api_event_subscribers", "Open GET /events streams", value=hub.subscriber_count)
+
+
+REGISTRY.register(_ProcessCollector())
@@ -1,7 +1,11 @@
 """SQLAlchemy models."""
 
 from models.check import Check
+from models.incident import Incident
+from models.rollup import CheckRollup
+from models.status import TargetStatus
 from models.target import Target
 from models.user import User
+from models.worker import WorkerHeartbeat
 
-__all__ = ["User", "Target", "Check"]
+__all__ = ["User", "Target", "Check", "CheckRollup", "TargetStatus", "Incident", "WorkerHeartbeat"]
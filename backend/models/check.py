@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, Text
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database import Base
@@ -13,13 +13,24 @@ if TYPE_CHECKING:
 
 
 class Check(Base):
+    """Partitioned by day on checked_at (migration 006), hence the (id, checked_at) primary key."""
+
     __tablename__ = "checks"
 
-    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    target_id: Mapped[int] = mapped_column(ForeignKey("targets.id", ondelete="CASCADE"), nullable=False, index=True)
-    checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    target_id: Mapped[int] = mapped_column(ForeignKey("targets.id", ondelete="CASCADE"), nullable=False)
+    checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, nullable=False)
     status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Whole check, up to the end of the (capped) body read.
     latency_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Until the response headers arrived; NULL for rows written before migration 010.
+    ttfb_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Phases of the check (migration 011), summed over every connection it opened; connect_ms and tls_ms
+    # are 0 when a pooled connection was reused, and transfer_ms is the body read after the headers.
+    dns_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    connect_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    tls_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    transfer_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
     is_up: Mapped[bool] = mapped_column(Boolean, nullable=False)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
@@ -27,4 +38,5 @@ class Check(Base):
 
     __table_args__ = (
         Index("ix_checks_target_id_checked_at", "target_id", "checked_at", postgresql_ops={"checked_at": "DESC"}),
+        {"postgresql_partition_by": "RANGE (checked_at)"},
     )
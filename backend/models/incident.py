@@ -0,0 +1,34 @@
+"""Incident model: a confirmed outage of a target (opened and closed by the worker on state changes)."""
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, Text, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from database import Base
+
+if TYPE_CHECKING:
+    from models.target import Target
+
+
+class Incident(Base):
+    __tablename__ = "incidents"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    target_id: Mapped[int] = mapped_column(ForeignKey("targets.id", ondelete="CASCADE"), nullable=False)
+    # First failed check of the run that confirmed the outage.
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # First successful check of the run that confirmed recovery; NULL while the incident is open.
+    ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    duration_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Error of the first failed check.
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_incidents_target_id_started_at", "target_id", "started_at"),
+        # At most one open incident per target.
+        Index("uq_incidents_open_target_id", "target_id", unique=True, postgresql_where=text("ended_at IS NULL")),
+    )
+
+    target: Mapped["Target"] = relationship("Target", back_populates="incidents")
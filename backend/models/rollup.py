@@ -0,0 +1,28 @@
+"""Check rollup model (per-target aggregates of checks at 1-minute, 1-hour and 1-day granularity)."""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import Base
+
+
+class CheckRollup(Base):
+    __tablename__ = "check_rollups"
+
+    target_id: Mapped[int] = mapped_column(ForeignKey("targets.id", ondelete="CASCADE"), primary_key=True)
+    bucket_seconds: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    checks: Mapped[int] = mapped_column(Integer, nullable=False)
+    up_checks: Mapped[int] = mapped_column(Integer, nullable=False)
+    latency_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    latency_min: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    latency_max: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    latency_sum: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # {bucket index: count}; see rollups.py
+    latency_sketch: Mapped[dict] = mapped_column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+
+    # Expiry of old minute/hour rollups (see the worker's ROLLUP_*_RETENTION_DAYS).
+    __table_args__ = (Index("ix_check_rollups_bucket_seconds_bucket_start", "bucket_seconds", "bucket_start"),)
@@ -0,0 +1,32 @@
+"""Latest status per target (written by the worker alongside each batch of checks)."""
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Text, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from database import Base
+
+if TYPE_CHECKING:
+    from models.target import Target
+
+
+class TargetStatus(Base):
+    __tablename__ = "target_status"
+
+    target_id: Mapped[int] = mapped_column(ForeignKey("targets.id", ondelete="CASCADE"), primary_key=True)
+    checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    latency_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    is_up: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # First check of the current run of is_up values, i.e. when the target last went up or down.
+    state_since: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Failed checks in a row (0 while up). While the worker backs off a failing target, backoff_until is
+    # when it will be checked next; NULL when it is checked at its normal interval.
+    consecutive_failures: Mapped[int] = mapped_column(Integer, server_default="0", nullable=False)
+    backoff_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    target: Mapped["Target"] = relationship("Target", back_populates="status")
@@ -3,13 +3,15 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, String, UniqueConstraint, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, WriteOnlyMapped, mapped_column, relationship
 
 from database import Base
 
 if TYPE_CHECKING:
     from models.check import Check
+    from models.incident import Incident
+    from models.status import TargetStatus
     from models.user import User
 
 
@@ -21,11 +23,30 @@ class Target(Base):
     url: Mapped[str] = mapped_column(String(2048), nullable=False)
     normalized_url: Mapped[str] = mapped_column(String(2048), nullable=False, index=True)
     name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # None: checked every CHECK_INTERVAL_SECONDS (worker default)
+    check_interval_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Assertions (all optional): exact status instead of any 2xx/3xx, and a keyword or regex that must
+    # occur in the first HTTP_MAX_BODY_BYTES of the body (the worker then skips HEAD).
+    expected_status: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    body_keyword: Mapped[str | None] = mapped_column(Text, nullable=True)
+    body_regex: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     __table_args__ = (UniqueConstraint("user_id", "normalized_url", name="uq_targets_user_id_normalized_url"),)
 
     user: Mapped["User"] = relationship("User", back_populates="targets")
-    checks: Mapped[list["Check"]] = relationship(
-        "Check", back_populates="target", cascade="all, delete-orphan", order_by="Check.checked_at.desc()"
+    # Write-only: never loaded into memory (read history with GET /targets/{id}/checks). passive_deletes
+    # leaves checks to ON DELETE CASCADE when a target is deleted.
+    checks: WriteOnlyMapped["Check"] = relationship(
+        "Check",
+        back_populates="target",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="Check.checked_at.desc()",
+    )
+    incidents: WriteOnlyMapped["Incident"] = relationship(
+        "Incident", back_populates="target", cascade="all, delete-orphan", passive_deletes=True
+    )
+    status: Mapped["TargetStatus | None"] = relationship(
+        "TargetStatus", back_populates="target", uselist=False, passive_deletes=True
     )
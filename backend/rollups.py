@@ -0,0 +1,198 @@
+"""
+Uptime and latency-percentile reads from check_rollups (maintained by the worker; see worker/rollups.py).
+
+A window is split into aligned day, hour and minute buckets (days in the middle, hours and minutes only
+at the ragged edges), so any window costs one query over at most ~165 rollup rows per target plus one
+per day, and never touches raw checks. Windows are rounded outward to whole minutes; an edge older than
+the minute (hour) rollup retention is rounded outward to a whole hour (day), since the worker has deleted
+the finer rollups there.
+
+bucket_series downsamples a window into fixed-size buckets (for charts) the same way, from the
+coarsest granularity that divides the bucket size.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import CheckRollup
+
+# Must match GRANULARITIES and GAMMA in worker/rollups.py
+GRANULARITIES = (86400, 3600, 60)
+GAMMA = 1.02 / 0.98
+_MINUTE = 60
+
+
+def _epoch(dt: datetime) -> int:
+    return int(dt.timestamp())
+
+
+def _at(epoch: int) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+def retained_since(now: datetime | None = None) -> dict[int, datetime | None]:
+    """Per granularity, the oldest bucket start the worker's rollup retention still keeps (None: all)."""
+    today = (now or datetime.now(timezone.utc)).replace(hour=0, minute=0, second=0, microsecond=0)
+    since = {}
+    for size, days in ((60, settings.ROLLUP_MINUTE_RETENTION_DAYS), (3600, settings.ROLLUP_HOUR_RETENTION_DAYS)):
+        since[size] = today - timedelta(days=days) if days > 0 else None
+    return since
+
+
+def cover(
+    start: datetime, end: datetime, retained: dict[int, datetime | None] | None = None
+) -> list[tuple[int, datetime, datetime]]:
+    """
+    Aligned (bucket_seconds, from, to) ranges that exactly tile [start, end) rounded out to minutes, or to
+    hours / days for an edge older than what `retained` (see retained_since) says is kept at the finer size.
+    """
+    lo = _epoch(start) // _MINUTE * _MINUTE
+    hi = -(-_epoch(end) // _MINUTE) * _MINUTE
+    # Cutoffs are whole days, so rounding an edge before one never crosses it.
+    for size, coarser in ((60, 3600), (3600, 86400)):
+        since = (retained or {}).get(size)
+        if since is not None:
+            if lo < _epoch(since):
+                lo = lo // coarser * coarser
+            if hi < _epoch(since):
+                hi = -(-hi // coarser) * coarser
+
+    def split(lo: int, hi: int, sizes: tuple[int, ...]) -> list[tuple[int, int, int]]:
+        if lo >= hi:
+            return []
+        size, finer = sizes[0], sizes[1:]
+        if not finer:
+            return [(size, lo, hi)]
+        a = -(-lo // size) * size
+        b = hi // size * size
+        if a >= b:
+            return split(lo, hi, finer)
+        return split(lo, a, finer) + [(size, a, b)] + split(b, hi, finer)
+
+    return [(size, _at(a), _at(b)) for size, a, b in split(lo, hi, GRANULARITIES)]
+
+
+def quantile(sketch: dict[str, int], q: float, lo: int | None, hi: int | None) -> int | None:
+    """Estimate the q-quantile (ms) from a merged sketch, clamped to the observed min/max."""
+    items = sorted((int(k), v) for k, v in sketch.items())
+    total = sum(v for _, v in items)
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for index, count in items:
+        seen += count
+        if seen > rank:
+            value = 0.0 if index == 0 else 2 * GAMMA**index / (GAMMA + 1)
+            break
+    value = round(value)
+    if lo is not None:
+        value = max(value, lo)
+    if hi is not None:
+        value = min(value, hi)
+    return value
+
+
+async def window_stats(db: AsyncSession, target_ids: list[int], start: datetime, end: datetime) -> dict[int, dict]:
+    """Per-target uptime and latency stats over [start, end) from rollups; targets with no data are omitted."""
+    if not target_ids:
+        return {}
+    ranges = cover(start, end, retained_since())
+    if not ranges:
+        return {}
+    in_window = or_(
+        *(
+            and_(
+                CheckRollup.bucket_seconds == size,
+                CheckRollup.bucket_start >= frm,
+                CheckRollup.bucket_start < to,
+            )
+            for size, frm, to in ranges
+        )
+    )
+    stmt = (
+        select(
+            CheckRollup.target_id,
+            func.sum(CheckRollup.checks),
+            func.sum(CheckRollup.up_checks),
+            func.sum(CheckRollup.latency_count),
+            func.min(CheckRollup.latency_min),
+            func.max(CheckRollup.latency_max),
+            func.sum(CheckRollup.latency_sum),
+            func.latency_sketch_sum(CheckRollup.latency_sketch),
+        )
+        .where(CheckRollup.target_id.in_(target_ids), in_window)
+        .group_by(CheckRollup.target_id)
+    )
+    rows = (await db.execute(stmt)).all()
+    return {target_id: _summary(*agg) for target_id, *agg in rows}
+
+
+def _pick_granularity(step: int) -> int:
+    """Coarsest rollup granularity whose buckets tile a step-second bucket exactly."""
+    return next(size for size in GRANULARITIES if step % size == 0)
+
+
+async def bucket_series(
+    db: AsyncSession, target_id: int, start: datetime, end: datetime, step: int
+) -> list[tuple[datetime, dict]]:
+    """
+    Downsample one target's history into step-second buckets aligned to the epoch, oldest first, from
+    the coarsest rollups that fit (one query; empty buckets are omitted). step must be a multiple of 60.
+    A step that is not a multiple of 3600 (86400) has no buckets older than the minute (hour) retention.
+    """
+    size = _pick_granularity(step)
+    lo = _epoch(start) // step * step
+    hi = -(-_epoch(end) // step) * step
+    # Inline step so the GROUP BY expression is textually identical to the selected one.
+    step_sql = literal_column(str(int(step)))
+    bucket = func.floor(func.extract("epoch", CheckRollup.bucket_start) / step_sql) * step_sql
+    stmt = (
+        select(
+            bucket,
+            func.sum(CheckRollup.checks),
+            func.sum(CheckRollup.up_checks),
+            func.sum(CheckRollup.latency_count),
+            func.min(CheckRollup.latency_min),
+            func.max(CheckRollup.latency_max),
+            func.sum(CheckRollup.latency_sum),
+            func.latency_sketch_sum(CheckRollup.latency_sketch),
+        )
+        .where(
+            CheckRollup.target_id == target_id,
+            CheckRollup.bucket_seconds == size,
+            CheckRollup.bucket_start >= _at(lo),
+            CheckRollup.bucket_start < _at(hi),
+        )
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+    return [(_at(int(epoch)), _summary(*agg)) for epoch, *agg in (await db.execute(stmt)).all()]
+
+
+def _summary(checks, up, lat_n, lat_min, lat_max, lat_sum, sketch) -> dict:
+    return {
+        "checks": int(checks),
+        "up_checks": int(up),
+        "uptime_percent": round(100.0 * up / checks, 3) if checks else None,
+        "latency_min_ms": lat_min,
+        "latency_max_ms": lat_max,
+        "latency_avg_ms": round(lat_sum / lat_n) if lat_n else None,
+        "latency_p50_ms": quantile(sketch, 0.50, lat_min, lat_max),
+        "latency_p95_ms": quantile(sketch, 0.95, lat_min, lat_max),
+        "latency_p99_ms": quantile(sketch, 0.99, lat_min, lat_max),
+    }
+
+
+def default_window(start: datetime | None, end: datetime | None) -> tuple[datetime, datetime]:
+    """Fill in missing bounds (end: now, start: 24 hours before end); naive datetimes are taken as UTC."""
+    end = end or datetime.now(timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    start = start or end - timedelta(days=1)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    return start, end
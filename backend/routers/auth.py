@@ -1,11 +1,19 @@
 """Auth endpoints: register, login, logout, me."""
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, EmailStr
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth import get_current_user, hash_password, verify_password, create_session_cookie, clear_session_cookie
+from auth import (
+    Principal,
+    clear_session_cookie,
+    create_session_cookie,
+    get_current_principal,
+    password_hasher,
+    principal_cache,
+)
+from config import settings
 from database import get_db
 from models import User
 
@@ -37,10 +45,12 @@ async def register(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new user. Returns user and sets HTTP-only session cookie."""
+    # Hash before touching the DB so no pooled connection is held while waiting for the hash pool.
+    password_hash = await password_hasher.hash(body.password)
     result = await db.execute(select(User).where(User.email == body.email))
     if result.scalar_one_or_none() is not None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    user = User(email=body.email, password_hash=hash_password(body.password))
+    user = User(email=body.email, password_hash=password_hash)
     db.add(user)
     await db.flush()
     await db.refresh(user)
@@ -55,22 +65,27 @@ async def login(
     db: AsyncSession = Depends(get_db),
 ):
     """Authenticate and set HTTP-only session cookie."""
-    result = await db.execute(select(User).where(User.email == body.email))
-    user = result.scalar_one_or_none()
-    if not user or not verify_password(body.password, user.password_hash):
+    result = await db.execute(select(User.id, User.email, User.password_hash).where(User.email == body.email))
+    user = result.one_or_none()
+    # Release the pooled connection before a possibly queued hash verification.
+    await db.rollback()
+    if not user or not await password_hasher.verify(body.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
     create_session_cookie(response, user.id, user.email)
     return UserResponse(id=user.id, email=user.email)
 
 
 @router.post("/logout")
-async def logout(response: Response):
-    """Clear session cookie."""
+async def logout(request: Request, response: Response):
+    """Clear session cookie (and drop its cached principal)."""
+    token = request.cookies.get(settings.COOKIE_NAME)
+    if token:
+        principal_cache.forget(token)
     clear_session_cookie(response)
     return {"ok": True}
 
 
 @router.get("/me", response_model=UserResponse)
-async def me(current_user: User = Depends(get_current_user)):
+async def me(current_user: Principal = Depends(get_current_principal)):
     """Return current authenticated user."""
     return UserResponse(id=current_user.id, email=current_user.email)
\ No newline at end of file
@@ -0,0 +1,382 @@
+"""Bulk target import (streamed NDJSON/CSV body) and streaming exports of targets and check history."""
+
+import csv
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth import Principal, get_current_principal
+from database import AsyncSessionLocal, get_db
+import exports
+from models import Check, Target
+from routers.targets import TargetCreate, normalize_url
+
+router = APIRouter(prefix="/targets", tags=["targets"])
+
+# Rows per INSERT ... ON CONFLICT DO NOTHING statement.
+IMPORT_BATCH_SIZE = 500
+# Upper bound on rows in one import request (the per-row results are returned in one response).
+IMPORT_MAX_ROWS = 50_000
+# Upper bound on one NDJSON line or CSV row (a quoted CSV field may span lines); bounds the read buffer.
+IMPORT_MAX_LINE_BYTES = 16 * 1024
+# Targets fetched per round trip while streaming an export.
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_FIELDS = (
+    "id", "url", "name", "check_interval_seconds", "expected_status", "body_keyword", "body_regex", "created_at"
+)
+CHECK_EXPORT_FIELDS = (
+    "target_id", "id", "checked_at", "status_code", "latency_ms",
+    "ttfb_ms", "dns_ms", "connect_ms", "tls_ms", "transfer_ms", "is_up", "error",
+)
+
+
+class BulkRowResult(BaseModel):
+    line: int
+    url: str | None
+    # created | exists (already monitored) | duplicate (repeated in this upload) | invalid
+    status: str
+    # The created or already monitored target (created and exists rows).
+    id: int | None = None
+    error: str | None = None
+
+
+class BulkImportResponse(BaseModel):
+    created: int
+    existing: int
+    duplicate: int
+    invalid: int
+    results: list[BulkRowResult]
+
+
+def _too_long(line_no: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Line {line_no} is longer than {IMPORT_MAX_LINE_BYTES} bytes",
+    )
+
+
+async def _lines(request: Request) -> AsyncIterator[tuple[int, str]]:
+    """Yield (line number, text without the line break) for each line of the body as it arrives."""
+    buffer = b""
+    line_no = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+        for raw in complete:
+            line_no += 1
+            if len(raw) > IMPORT_MAX_LINE_BYTES:
+                raise _too_long(line_no)
+            yield line_no, raw.decode("utf-8", errors="replace")
+        if len(buffer) > IMPORT_MAX_LINE_BYTES:
+            raise _too_long(line_no + 1)
+    if buffer:
+        yield line_no + 1, buffer.decode("utf-8", errors="replace")
+
+
+def _csv_row(lines: list[str]) -> list[str] | None:
+    """Parse lines as one CSV row; None while a quoted field is still open at the end of the last line."""
+    try:
+        return next(csv.reader(lines, strict=True))
+    except csv.Error as e:
+        if "unexpected end of data" in str(e):
+            return None
+    # Malformed but complete (e.g. text after a closing quote): parse leniently like the default reader.
+    return next(csv.reader(lines))
+
+
+async def _csv_rows(request: Request) -> AsyncIterator[tuple[int, list[str] | None, str | None]]:
+    """
+    Yield (first line, fields, error) for each non-blank CSV row. A quoted field may contain line breaks,
+    so lines are collected until csv reports the row complete and then parsed together.
+    """
+    pending: list[str] = []
+    first_line = 0
+    size = 0
+    async for line_no, text in _lines(request):
+        if not pending:
+            if not text.strip():
+                continue
+            first_line = line_no
+        pending.append(text + "\n")
+        size += len(text.encode("utf-8")) + 1
+        try:
+            fields = _csv_row(pending)
+        except csv.Error as e:
+            yield first_line, None, f"Invalid CSV: {e}"
+            pending, size = [], 0
+            continue
+        if fields is None:
+            if size > IMPORT_MAX_LINE_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"CSV row starting on line {first_line} is longer than {IMPORT_MAX_LINE_BYTES} bytes",
+                )
+            continue
+        yield first_line, fields, None
+        pending, size = [], 0
+    if pending:
+        yield first_line, None, "Invalid CSV: unterminated quoted field"
+
+
+async def _records(request: Request, fmt: str) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Yield (line, record, error) from an NDJSON body, or a CSV body with a header row."""
+    if fmt == "csv":
+        header: list[str] | None = None
+        async for line_no, fields, error in _csv_rows(request):
+            if header is None:
+                header = [f.strip().lower() for f in fields or ()]
+                if "url" not in header:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV header must include 'url'")
+                continue
+            if error:
+                yield line_no, None, error
+                continue
+            record = {k: v.strip() for k, v in zip(header, fields) if v.strip()}
+            yield line_no, record, None
+        return
+    async for line_no, text in _lines(request):
+        text = text.strip()
+        if not text:
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"Invalid JSON: {e.msg}"
+            continue
+        if isinstance(record, str):
+            record = {"url": record}
+        if not isinstance(record, dict):
+            yield line_no, None, "Expected an object or a URL string"
+            continue
+        yield line_no, record, None
+
+
+def _body_format(request: Request) -> str:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("", "application/x-ndjson", "application/jsonl", "application/json-lines", "application/json"):
+        return "ndjson"
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Send application/x-ndjson (one JSON object per line) or text/csv",
+    )
+
+
+async def _insert_batch(db: AsyncSession, batch: list[tuple[BulkRowResult, dict]]) -> None:
+    """
+    Insert one batch with ON CONFLICT DO NOTHING; mark each pending result created or exists, with the id
+    of the new or already monitored target.
+    """
+    stmt = (
+        pg_insert(Target)
+        .values([values for _, values in batch])
+        .on_conflict_do_nothing(constraint="uq_targets_user_id_normalized_url")
+        .returning(Target.id, Target.normalized_url)
+    )
+    created = {normalized: target_id for target_id, normalized in (await db.execute(stmt)).all()}
+    existing: dict[str, int] = {}
+    if len(created) < len(batch):
+        # DO NOTHING returns no row for a conflict; look the existing targets up (one indexed query).
+        stmt = select(Target.normalized_url, Target.id).where(
+            Target.user_id == batch[0][1]["user_id"],
+            Target.normalized_url.in_([values["normalized_url"] for _, values in batch if values["normalized_url"] not in created]),
+        )
+        existing = dict((await db.execute(stmt)).all())
+    for result, values in batch:
+        target_id = created.get(values["normalized_url"])
+        result.status = "created" if target_id is not None else "exists"
+        result.id = target_id if target_id is not None else existing.get(values["normalized_url"])
+
+
+@router.post("/bulk", response_model=BulkImportResponse)
+async def import_targets(
+    request: Request,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create many targets from a streamed body: NDJSON (`{"url": ..., "name": ..., "check_interval_seconds": ...}`,
+    optionally with the assertion fields of POST /targets, or a bare URL string per line) or CSV with a header row. Rows are validated and normalized like
+    POST /targets and inserted IMPORT_BATCH_SIZE at a time; URLs the user already monitors are reported
+    as `exists`, not errors. Results are listed per input line.
+    """
+    fmt = _body_format(request)
+    results: list[BulkRowResult] = []
+    batch: list[tuple[BulkRowResult, dict]] = []
+    seen: set[str] = set()
+    async for line_no, record, error in _records(request, fmt):
+        if len(results) >= IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {IMPORT_MAX_ROWS} rows per import",
+            )
+        url = record.get("url") if record else None
+        result = BulkRowResult(line=line_no, url=str(url) if url is not None else None, status="invalid", error=error)
+        results.append(result)
+        if error:
+            continue
+        try:
+            body = TargetCreate.model_validate(record)
+            raw = str(body.url).strip()
+            normalized = normalize_url(raw)
+        except ValidationError as e:
+            result.error = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors())
+            continue
+        except ValueError as e:
+            result.error = str(e)
+            continue
+        if normalized in seen:
+            result.status = "duplicate"
+            continue
+        seen.add(normalized)
+        result.status = "pending"
+        batch.append(
+            (
+                result,
+                {
+                    "user_id": current_user.id,
+                    "url": raw,
+                    "normalized_url": normalized,
+                    "name": (body.name.strip() or None) if body.name else None,
+                    "check_interval_seconds": body.check_interval_seconds,
+                    "expected_status": body.expected_status,
+                    "body_keyword": body.body_keyword,
+                    "body_regex": body.body_regex,
+                },
+            )
+        )
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await _insert_batch(db, batch)
+            batch = []
+    if batch:
+        await _insert_batch(db, batch)
+    counts = {s: 0 for s in ("created", "exists", "duplicate", "invalid")}
+    for result in results:
+        counts[result.status] += 1
+    return BulkImportResponse(
+        created=counts["created"],
+        existing=counts["exists"],
+        duplicate=counts["duplicate"],
+        invalid=counts["invalid"],
+        results=results,
+    )
+
+
+async def _stream_rows(stmt) -> AsyncIterator[dict]:
+    """Yield result rows as dicts through a server-side cursor, EXPORT_CHUNK_SIZE rows per fetch."""
+    # Own session: the response body streams after the endpoint (and its dependencies) have returned.
+    async with AsyncSessionLocal() as session:
+        stream = await session.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for row in stream:
+            yield row._asdict()
+
+
+def _export_response(rows: AsyncIterator[dict], fmt: str, fields: tuple[str, ...], schema, filename: str):
+    if fmt == "csv":
+        body = exports.csv_rows(rows, fields)
+    elif fmt == "arrow":
+        body = exports.arrow_ipc(rows, schema)
+    else:
+        body = exports.ndjson(rows)
+    return StreamingResponse(
+        exports.chunked(body),
+        media_type=exports.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+@router.get("/export")
+async def export_targets(
+    fmt: str = Query(default="ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Stream all owned targets as NDJSON or CSV (server-side cursor; the output can be re-imported via /targets/bulk)."""
+    stmt = (
+        select(
+            Target.id,
+            Target.url,
+            Target.name,
+            Target.check_interval_seconds,
+            Target.expected_status,
+            Target.body_keyword,
+            Target.body_regex,
+            Target.created_at,
+        )
+        .where(Target.user_id == current_user.id)
+        .order_by(Target.id)
+    )
+    return _export_response(_stream_rows(stmt), fmt, EXPORT_FIELDS, None, "targets")
+
+
+@router.get("/checks/export")
+async def export_checks(
+    fmt: str = Query(default="ndjson", alias="format", pattern="^(ndjson|csv|arrow)$"),
+    start: datetime | None = Query(default=None, alias="from"),
+    end: datetime | None = Query(default=None, alias="to"),
+    target_id: list[int] | None = Query(default=None),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Stream raw check history for owned targets (all, or the given `target_id`s) over [from, to), each
+    bound optional, ordered by target and time. Formats: NDJSON, CSV, or Arrow IPC stream (`arrow`,
+    record batches of 10k rows; needs pyarrow on the server). Only checks still inside the worker's
+    retention window exist; older history is available as rollups via /targets/{id}/checks?step=.
+    """
+    if fmt == "arrow" and not exports.arrow_available():
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="format=arrow needs pyarrow installed")
+    stmt = (
+        select(
+            Check.target_id,
+            Check.id,
+            Check.checked_at,
+            Check.status_code,
+            Check.latency_ms,
+            Check.ttfb_ms,
+            Check.dns_ms,
+            Check.connect_ms,
+            Check.tls_ms,
+            Check.transfer_ms,
+            Check.is_up,
+            Check.error,
+        )
+        .join(Target, Target.id == Check.target_id)
+        .where(Target.user_id == current_user.id)
+        .order_by(Check.target_id, Check.checked_at)
+    )
+    if target_id:
+        stmt = stmt.where(Check.target_id.in_(target_id))
+    if start is not None:
+        stmt = stmt.where(Check.checked_at >= (start if start.tzinfo else start.replace(tzinfo=timezone.utc)))
+    if end is not None:
+        stmt = stmt.where(Check.checked_at < (end if end.tzinfo else end.replace(tzinfo=timezone.utc)))
+    schema = _check_arrow_schema() if fmt == "arrow" else None
+    return _export_response(_stream_rows(stmt), fmt, CHECK_EXPORT_FIELDS, schema, "checks")
+
+
+def _check_arrow_schema():
+    pa = exports.pa
+    return pa.schema(
+        [
+            ("target_id", pa.int32()),
+            ("id", pa.int64()),
+            ("checked_at", pa.timestamp("us", tz="UTC")),
+            ("status_code", pa.int32()),
+            ("latency_ms", pa.int32()),
+            ("ttfb_ms", pa.int32()),
+            ("dns_ms", pa.int32()),
+            ("connect_ms", pa.int32()),
+            ("tls_ms", pa.int32()),
+            ("transfer_ms", pa.int32()),
+            ("is_up", pa.bool_()),
+            ("error", pa.string()),
+        ]
+    )
@@ -0,0 +1,49 @@
+"""Server-Sent Events stream of the user's live check results."""
+
+import asyncio
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from auth import get_stream_user_id
+from config import settings
+from events import RESYNC, hub
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("")
+async def stream_events(user_id: int = Depends(get_stream_user_id)):
+    """
+    text/event-stream of the user's check results as the worker writes them.
+
+    - `check`: data is {target_id, checked_at, is_up, status_code, latency_ms, error, state_since,
+      consecutive_failures, backoff_until, state_changed}; state_changed is true when the target went
+      up or down since the previous batch.
+    - `resync`: events may have been missed (listener reconnect or slow client); refetch /targets/status.
+
+    A comment line is sent every EVENTS_KEEPALIVE_SECONDS so proxies keep the connection open.
+    """
+    queue = hub.subscribe(user_id)
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), settings.EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message == RESYNC:
+                    yield "event: resync\ndata: {}\n\n"
+                else:
+                    yield f"event: check\ndata: {message}\n\n"
+        finally:
+            hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
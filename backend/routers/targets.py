@@ -1,18 +1,27 @@
 """Target endpoints with strict ownership enforcement."""
 
+import base64
+import binascii
+from datetime import datetime, timezone
 from urllib.parse import urlparse
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, HttpUrl
-from sqlalchemy import select
+import re2
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, Field, HttpUrl, field_validator
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth import get_current_user
+from auth import Principal, get_current_principal
 from database import get_db
-from models import Check, Target, User
+from models import Check, Incident, Target, TargetStatus
+from rollups import bucket_series, default_window, window_stats
 
 router = APIRouter(prefix="/targets", tags=["targets"])
 
+# body_regex runs in the worker on RE2 (linear time, no backtracking), so it is validated with RE2 here.
+_RE2_OPTIONS = re2.Options()
+_RE2_OPTIONS.log_errors = False
+
 
 def normalize_url(url: str) -> str:
     """Trim whitespace, require http/https, normalize trailing slash (remove)."""
@@ -37,12 +46,35 @@ def normalize_url(url: str) -> str:
 class TargetCreate(BaseModel):
     url: HttpUrl
     name: str | None = None
+    # Omit to use the worker's default interval.
+    check_interval_seconds: int | None = Field(default=None, ge=30, le=86400)
+    # Assertions: the target is up only with exactly this status (instead of any 2xx/3xx), and only if the
+    # keyword / regex occurs in the first HTTP_MAX_BODY_BYTES of the body.
+    expected_status: int | None = Field(default=None, ge=100, le=599)
+    body_keyword: str | None = Field(default=None, min_length=1, max_length=256)
+    body_regex: str | None = Field(default=None, min_length=1, max_length=256)
+
+    @field_validator("body_regex")
+    @classmethod
+    def _valid_regex(cls, value: str | None) -> str | None:
+        # RE2 syntax: no backreferences or lookaround, so matching time is linear in the body prefix.
+        if value is not None:
+            try:
+                re2.compile(value, options=_RE2_OPTIONS)
+            except re2.error as e:
+                message = e.args[0].decode() if e.args and isinstance(e.args[0], bytes) else str(e)
+                raise ValueError(f"Invalid regular expression (RE2 syntax): {message}")
+        return value
 
 
 class TargetResponse(BaseModel):
     id: int
     url: str
     name: str | None
+    check_interval_seconds: int | None
+    expected_status: int | None
+    body_keyword: str | None
+    body_regex: str | None
     created_at: str
 
     class Config:
@@ -55,55 +87,57 @@ class LatestCheckResponse(BaseModel):
     status_code: int | None
     latency_ms: int | None
     error: str | None
+    # When the target entered its current up/down state.
+    state_since: str | None
+    consecutive_failures: int = 0
+    # Set while the worker checks this failing target less often than its interval: its next check.
+    backoff_until: str | None = None
 
 
 class TargetStatusResponse(BaseModel):
     id: int
     url: str
     name: str | None
+    check_interval_seconds: int | None
     created_at: str
     latest_check: LatestCheckResponse | None
 
 
 @router.get("/status", response_model=list[TargetStatusResponse])
 async def list_targets_status(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    """Return each target owned by the user with its latest check (one per target, no duplicates)."""
-    latest_check_id = (
-        select(Check.id)
-        .where(Check.target_id == Target.id)
-        .order_by(Check.checked_at.desc())
-        .limit(1)
-        .correlate(Target)
-        .scalar_subquery()
-    )
+    """Return each target owned by the user with its latest check, read from target_status (one row per target)."""
     stmt = (
-        select(Target, Check)
+        select(Target, TargetStatus)
         .select_from(Target)
-        .outerjoin(Check, Check.id == latest_check_id)
+        .outerjoin(TargetStatus, TargetStatus.target_id == Target.id)
         .where(Target.user_id == current_user.id)
         .order_by(Target.created_at.desc())
     )
     result = await db.execute(stmt)
     rows = result.all()
     out = []
-    for target, check in rows:
+    for target, latest in rows:
         latest_check = None
-        if check:
+        if latest:
             latest_check = LatestCheckResponse(
-                checked_at=check.checked_at.isoformat() if check.checked_at else None,
-                is_up=check.is_up,
-                status_code=check.status_code,
-                latency_ms=check.latency_ms,
-                error=check.error,
+                checked_at=latest.checked_at.isoformat() if latest.checked_at else None,
+                is_up=latest.is_up,
+                status_code=latest.status_code,
+                latency_ms=latest.latency_ms,
+                error=latest.error,
+                state_since=latest.state_since.isoformat(),
+                consecutive_failures=latest.consecutive_failures,
+                backoff_until=latest.backoff_until.isoformat() if latest.backoff_until else None,
             )
         out.append(
             TargetStatusResponse(
                 id=target.id,
                 url=target.url,
                 name=target.name,
+                check_interval_seconds=target.check_interval_seconds,
                 created_at=target.created_at.isoformat(),
                 latest_check=latest_check,
             )
@@ -111,9 +145,338 @@ async def list_targets_status(
     return out
 
 
+class TargetStatsResponse(BaseModel):
+    target_id: int
+    window_start: str
+    window_end: str
+    checks: int
+    up_checks: int
+    uptime_percent: float | None
+    latency_min_ms: int | None
+    latency_max_ms: int | None
+    latency_avg_ms: int | None
+    latency_p50_ms: int | None
+    latency_p95_ms: int | None
+    latency_p99_ms: int | None
+
+
+def _stats_window(start: datetime | None, end: datetime | None) -> tuple[datetime, datetime]:
+    start, end = default_window(start, end)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'from' must be before 'to'")
+    return start, end
+
+
+def _stats_response(target_id: int, start: datetime, end: datetime, stats: dict | None) -> TargetStatsResponse:
+    empty = {
+        "checks": 0,
+        "up_checks": 0,
+        "uptime_percent": None,
+        "latency_min_ms": None,
+        "latency_max_ms": None,
+        "latency_avg_ms": None,
+        "latency_p50_ms": None,
+        "latency_p95_ms": None,
+        "latency_p99_ms": None,
+    }
+    return TargetStatsResponse(
+        target_id=target_id,
+        window_start=start.isoformat(),
+        window_end=end.isoformat(),
+        **(stats or empty),
+    )
+
+
+@router.get("/stats", response_model=list[TargetStatsResponse])
+async def list_targets_stats(
+    start: datetime | None = Query(default=None, alias="from"),
+    end: datetime | None = Query(default=None, alias="to"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """Uptime % and latency p50/p95/p99 per owned target over [from, to) (default: last 24h), from rollups."""
+    start, end = _stats_window(start, end)
+    result = await db.execute(
+        select(Target.id).where(Target.user_id == current_user.id).order_by(Target.created_at.desc())
+    )
+    target_ids = list(result.scalars().all())
+    stats = await window_stats(db, target_ids, start, end)
+    return [_stats_response(tid, start, end, stats.get(tid)) for tid in target_ids]
+
+
+@router.get("/{target_id}/stats", response_model=TargetStatsResponse)
+async def get_target_stats(
+    target_id: int,
+    start: datetime | None = Query(default=None, alias="from"),
+    end: datetime | None = Query(default=None, alias="to"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """Uptime % and latency p50/p95/p99 for one owned target over [from, to) (default: last 24h)."""
+    start, end = _stats_window(start, end)
+    await _require_owned(db, target_id, current_user.id)
+    stats = await window_stats(db, [target_id], start, end)
+    return _stats_response(target_id, start, end, stats.get(target_id))
+
+
+async def _require_owned(db: AsyncSession, target_id: int, user_id: int) -> None:
+    result = await db.execute(select(Target.id).where(Target.id == target_id, Target.user_id == user_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Target not found")
+
+
+# A downsampled response may hold at most this many buckets (e.g. 30 days at step=3600 is 720).
+MAX_HISTORY_BUCKETS = 1500
+
+
+class CheckItem(BaseModel):
+    id: int
+    checked_at: str
+    is_up: bool
+    status_code: int | None
+    latency_ms: int | None
+    # Time until the response headers arrived (None for checks that got no response).
+    ttfb_ms: int | None
+    # Where the time went: DNS, TCP connect, TLS handshake, and body read after the headers (None for
+    # checks that were not attempted or predate them).
+    dns_ms: int | None
+    connect_ms: int | None
+    tls_ms: int | None
+    transfer_ms: int | None
+    error: str | None
+
+
+class CheckBucket(BaseModel):
+    bucket_start: str
+    checks: int
+    up_checks: int
+    uptime_percent: float | None
+    latency_min_ms: int | None
+    latency_max_ms: int | None
+    latency_avg_ms: int | None
+    latency_p50_ms: int | None
+    latency_p95_ms: int | None
+    latency_p99_ms: int | None
+
+
+class CheckHistoryResponse(BaseModel):
+    target_id: int
+    window_start: str
+    window_end: str
+    step: int | None
+    # Raw checks (no step), oldest first; pass next_cursor back as `cursor` for the next page.
+    checks: list[CheckItem] = []
+    next_cursor: str | None = None
+    # Downsampled buckets (step set), oldest first; buckets without checks are omitted.
+    buckets: list[CheckBucket] = []
+
+
+def _encode_cursor(checked_at: datetime, check_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{checked_at.isoformat()}|{check_id}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        checked_at, check_id = raw.rsplit("|", 1)
+        after_at, after_id = datetime.fromisoformat(checked_at), int(check_id)
+        if not 0 <= after_id < 2**63:
+            raise ValueError("check id out of range")  # would fail in the database as a bigint
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return (after_at if after_at.tzinfo else after_at.replace(tzinfo=timezone.utc)), after_id
+
+
+@router.get("/{target_id}/checks", response_model=CheckHistoryResponse)
+async def list_target_checks(
+    target_id: int,
+    start: datetime | None = Query(default=None, alias="from"),
+    end: datetime | None = Query(default=None, alias="to"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = None,
+    step: int | None = Query(default=None, ge=60, le=86400),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Check history for one owned target over [from, to) (default: last 24h). Without `step`: raw checks,
+    `limit` per page, keyset-paginated on (checked_at, id). With `step` (a multiple of 60 seconds): one
+    bucket per step from rollups, e.g. step=3600 for a 30-day chart.
+    """
+    start, end = _stats_window(start, end)
+    await _require_owned(db, target_id, current_user.id)
+    if step is not None:
+        if step % 60:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'step' must be a multiple of 60")
+        if (end - start).total_seconds() / step > MAX_HISTORY_BUCKETS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Window too large for this step (max {MAX_HISTORY_BUCKETS} buckets)",
+            )
+        series = await bucket_series(db, target_id, start, end, step)
+        return CheckHistoryResponse(
+            target_id=target_id,
+            window_start=start.isoformat(),
+            window_end=end.isoformat(),
+            step=step,
+            buckets=[CheckBucket(bucket_start=at.isoformat(), **stats) for at, stats in series],
+        )
+    stmt = select(
+        Check.id,
+        Check.checked_at,
+        Check.is_up,
+        Check.status_code,
+        Check.latency_ms,
+        Check.ttfb_ms,
+        Check.dns_ms,
+        Check.connect_ms,
+        Check.tls_ms,
+        Check.transfer_ms,
+        Check.error,
+    ).where(Check.target_id == target_id, Check.checked_at >= start, Check.checked_at < end)
+    if cursor:
+        after_at, after_id = _decode_cursor(cursor)
+        # Spelled out rather than a row comparison so the checked_at bound is an index condition.
+        stmt = stmt.where(
+            Check.checked_at >= after_at,
+            or_(Check.checked_at > after_at, and_(Check.checked_at == after_at, Check.id > after_id)),
+        )
+    rows = (await db.execute(stmt.order_by(Check.checked_at, Check.id).limit(limit + 1))).all()
+    next_cursor = _encode_cursor(rows[limit - 1].checked_at, rows[limit - 1].id) if len(rows) > limit else None
+    return CheckHistoryResponse(
+        target_id=target_id,
+        window_start=start.isoformat(),
+        window_end=end.isoformat(),
+        step=None,
+        checks=[
+            CheckItem(
+                id=r.id,
+                checked_at=r.checked_at.isoformat(),
+                is_up=r.is_up,
+                status_code=r.status_code,
+                latency_ms=r.latency_ms,
+                ttfb_ms=r.ttfb_ms,
+                dns_ms=r.dns_ms,
+                connect_ms=r.connect_ms,
+                tls_ms=r.tls_ms,
+                transfer_ms=r.transfer_ms,
+                error=r.error,
+            )
+            for r in rows[:limit]
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+class IncidentItem(BaseModel):
+    id: int
+    started_at: str
+    # None while the target is still down.
+    ended_at: str | None
+    duration_seconds: int | None
+    error: str | None
+
+
+class IncidentListResponse(BaseModel):
+    target_id: int
+    window_start: str
+    window_end: str
+    # Incidents overlapping the window, and their downtime clipped to it.
+    count: int
+    downtime_seconds: int
+    # Newest first, at most `limit`.
+    incidents: list[IncidentItem]
+
+
+class IncidentSummary(BaseModel):
+    target_id: int
+    count: int
+    downtime_seconds: int
+    open: bool
+
+
+def _overlapping(start: datetime, end: datetime):
+    """Incidents that were open at any point in [start, end)."""
+    return and_(Incident.started_at < end, or_(Incident.ended_at.is_(None), Incident.ended_at > start))
+
+
+def _clipped_downtime(start: datetime, end: datetime):
+    """Seconds of downtime inside [start, end), summed over the selected incidents (outer-joined NULLs skipped)."""
+    until = func.least(func.coalesce(Incident.ended_at, func.now()), end)
+    clipped = func.extract("epoch", until - func.greatest(Incident.started_at, start))
+    return func.coalesce(func.sum(clipped).filter(Incident.id.is_not(None)), 0)
+
+
+@router.get("/incidents/summary", response_model=list[IncidentSummary])
+async def list_incident_summary(
+    start: datetime | None = Query(default=None, alias="from"),
+    end: datetime | None = Query(default=None, alias="to"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """Outage count, downtime and whether one is ongoing, per owned target over [from, to) (default: last 24h)."""
+    start, end = _stats_window(start, end)
+    stmt = (
+        select(
+            Target.id,
+            func.count(Incident.id),
+            _clipped_downtime(start, end),
+            func.count(Incident.id).filter(Incident.ended_at.is_(None)) > 0,
+        )
+        .select_from(Target)
+        .outerjoin(Incident, and_(Incident.target_id == Target.id, _overlapping(start, end)))
+        .where(Target.user_id == current_user.id)
+        .group_by(Target.id)
+        .order_by(Target.id)
+    )
+    return [
+        IncidentSummary(target_id=tid, count=count, downtime_seconds=int(downtime), open=bool(is_open))
+        for tid, count, downtime, is_open in (await db.execute(stmt)).all()
+    ]
+
+
+@router.get("/{target_id}/incidents", response_model=IncidentListResponse)
+async def list_target_incidents(
+    target_id: int,
+    start: datetime | None = Query(default=None, alias="from"),
+    end: datetime | None = Query(default=None, alias="to"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Outages of one owned target overlapping [from, to) (default: last 24h), newest first, with their
+    count and total downtime in the window. Read from the incidents table on (target_id, started_at).
+    """
+    start, end = _stats_window(start, end)
+    await _require_owned(db, target_id, current_user.id)
+    where = and_(Incident.target_id == target_id, _overlapping(start, end))
+    count, downtime = (await db.execute(select(func.count(), _clipped_downtime(start, end)).where(where))).one()
+    rows = (
+        await db.execute(select(Incident).where(where).order_by(Incident.started_at.desc()).limit(limit))
+    ).scalars()
+    return IncidentListResponse(
+        target_id=target_id,
+        window_start=start.isoformat(),
+        window_end=end.isoformat(),
+        count=count,
+        downtime_seconds=int(downtime),
+        incidents=[
+            IncidentItem(
+                id=i.id,
+                started_at=i.started_at.isoformat(),
+                ended_at=i.ended_at.isoformat() if i.ended_at else None,
+                duration_seconds=i.duration_seconds,
+                error=i.error,
+            )
+            for i in rows
+        ],
+    )
+
+
 @router.get("", response_model=list[TargetResponse])
 async def list_targets(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Return all targets owned by the authenticated user."""
@@ -122,7 +485,16 @@ async def list_targets(
     )
     targets = result.scalars().all()
     return [
-        TargetResponse(id=t.id, url=t.url, name=t.name, created_at=t.created_at.isoformat())
+        TargetResponse(
+            id=t.id,
+            url=t.url,
+            name=t.name,
+            check_interval_seconds=t.check_interval_seconds,
+            expected_status=t.expected_status,
+            body_keyword=t.body_keyword,
+            body_regex=t.body_regex,
+            created_at=t.created_at.isoformat(),
+        )
         for t in targets
     ]
 
@@ -130,7 +502,7 @@ async def list_targets(
 @router.post("", response_model=TargetResponse, status_code=status.HTTP_201_CREATED)
 async def create_target(
     body: TargetCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new target. URL is normalized; duplicate normalized URL per user returns 409."""
@@ -155,17 +527,30 @@ async def create_target(
         url=raw,
         normalized_url=normalized,
         name=(body.name.strip() or None) if body.name else None,
+        check_interval_seconds=body.check_interval_seconds,
+        expected_status=body.expected_status,
+        body_keyword=body.body_keyword,
+        body_regex=body.body_regex,
     )
     db.add(target)
     await db.flush()
     await db.refresh(target)
-    return TargetResponse(id=target.id, url=target.url, name=target.name, created_at=target.created_at.isoformat())
+    return TargetResponse(
+        id=target.id,
+        url=target.url,
+        name=target.name,
+        check_interval_seconds=target.check_interval_seconds,
+        expected_status=target.expected_status,
+        body_keyword=target.body_keyword,
+        body_regex=target.body_regex,
+        created_at=target.created_at.isoformat(),
+    )
 
 
 @router.delete("/{target_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_target(
     target_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a target only if it belongs to the authenticated user. Checks are removed (CASCADE)."""
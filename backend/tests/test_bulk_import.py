@@ -0,0 +1,143 @@
+"""POST /targets/bulk: streamed line and CSV parsing, the line-length bound, and per-row results."""
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from database import engine
+from main import app
+from routers.bulk import IMPORT_MAX_LINE_BYTES, _records
+
+
+class FakeRequest:
+    """Just enough of a Request for the body readers: the body arrives in `chunk`-byte pieces."""
+
+    def __init__(self, body: bytes, chunk: int = 7):
+        self.body = body
+        self.chunk = chunk
+
+    async def stream(self):
+        for i in range(0, len(self.body), self.chunk):
+            yield self.body[i : i + self.chunk]
+
+
+def records(body: bytes, fmt: str, chunk: int = 7) -> list[tuple]:
+    async def collect():
+        return [item async for item in _records(FakeRequest(body, chunk), fmt)]
+
+    return asyncio.run(collect())
+
+
+def test_csv_quoted_field_spanning_lines():
+    body = b'url,name\r\nhttps://a.example.com,"two\r\nlines, one field"\r\n\r\nhttps://b.example.com,plain\r\n'
+    assert records(body, "csv") == [
+        (2, {"url": "https://a.example.com", "name": "two\r\nlines, one field"}, None),
+        (5, {"url": "https://b.example.com", "name": "plain"}, None),
+    ]
+
+
+def test_csv_escaped_quotes_and_bare_quote():
+    body = b'url,name\nhttps://a.example.com,"say ""hi"""\nhttps://b.example.com,5" screen\nhttps://c.example.com,x\n'
+    assert [r[1]["name"] for r in records(body, "csv")] == ['say "hi"', '5" screen', "x"]
+
+
+def test_csv_without_trailing_newline():
+    assert records(b"url\nhttps://a.example.com", "csv") == [(2, {"url": "https://a.example.com"}, None)]
+
+
+def test_csv_unterminated_quote_is_an_invalid_row():
+    body = b'url,name\nhttps://a.example.com,ok\nhttps://b.example.com,"open\nstill open\n'
+    assert records(body, "csv") == [
+        (2, {"url": "https://a.example.com", "name": "ok"}, None),
+        (3, None, "Invalid CSV: unterminated quoted field"),
+    ]
+
+
+def test_csv_header_must_name_url():
+    with pytest.raises(HTTPException) as e:
+        records(b"name\nfoo\n", "csv")
+    assert e.value.status_code == 400
+
+
+def test_ndjson_lines_and_errors():
+    body = b'{"url": "https://a.example.com"}\n\n  "https://b.example.com"  \n{bad\n[1]\n'
+    assert records(body, "ndjson") == [
+        (1, {"url": "https://a.example.com"}, None),
+        (3, {"url": "https://b.example.com"}, None),
+        (4, None, "Invalid JSON: Expecting property name enclosed in double quotes"),
+        (5, None, "Expected an object or a URL string"),
+    ]
+
+
+@pytest.mark.parametrize("chunk", [1, 4096, 10 * IMPORT_MAX_LINE_BYTES])
+def test_line_at_limit_is_accepted(chunk):
+    line = b'"https://a.example.com/' + b"x" * (IMPORT_MAX_LINE_BYTES - 24) + b'"'
+    assert len(line) == IMPORT_MAX_LINE_BYTES
+    assert len(records(line + b"\n", "ndjson", chunk)) == 1
+
+
+@pytest.mark.parametrize("chunk", [1000, 10 * IMPORT_MAX_LINE_BYTES])
+@pytest.mark.parametrize("newline", [b"\n", b""])
+def test_line_over_limit_is_413(chunk, newline):
+    body = b'"https://a.example.com"\n"' + b"x" * IMPORT_MAX_LINE_BYTES + b'"' + newline
+    with pytest.raises(HTTPException) as e:
+        records(body, "ndjson", chunk)
+    assert e.value.status_code == 413
+    assert "Line 2" in e.value.detail
+
+
+def test_csv_row_over_limit_is_413():
+    # Each line is short, but the open quote keeps the row going.
+    body = b'url,name\nhttps://a.example.com,"' + b"y\n" * IMPORT_MAX_LINE_BYTES
+    with pytest.raises(HTTPException) as e:
+        records(body, "csv", 4096)
+    assert e.value.status_code == 413
+    assert "line 2" in e.value.detail
+
+
+# Through the app, against the database at DATABASE_URL; skipped without one.
+
+
+@pytest.fixture(scope="module")
+def database():
+    async def ping():
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1 FROM targets LIMIT 1"))
+        finally:
+            await engine.dispose()
+
+    try:
+        asyncio.run(ping())
+    except Exception as e:
+        pytest.skip(f"no database: {e}")
+
+
+def test_existing_targets_are_reported_with_their_ids(database):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            email = f"bulk-{uuid.uuid4().hex[:12]}@example.com"
+            me = (await client.post("/auth/register", json={"email": email, "password": "bulk-pass"})).json()
+            try:
+                host = uuid.uuid4().hex[:12]
+                first = b"url\nhttps://a.%s.example.com\nhttps://b.%s.example.com\n" % (host.encode(), host.encode())
+                second = first + b"https://c.%s.example.com\nhttps://C.%s.example.com/\nnot a url\n" % (host.encode(), host.encode())
+                headers = {"content-type": "text/csv"}
+                created = (await client.post("/targets/bulk", content=first, headers=headers)).json()
+                again = (await client.post("/targets/bulk", content=second, headers=headers)).json()
+            finally:
+                async with engine.begin() as conn:
+                    await conn.execute(text("DELETE FROM users WHERE id = :id"), {"id": me["id"]})
+                await engine.dispose()
+        return created, again
+
+    created, again = asyncio.run(main())
+    ids = [r["id"] for r in created["results"]]
+    assert [r["status"] for r in created["results"]] == ["created", "created"] and None not in ids
+    assert (again["created"], again["existing"], again["duplicate"], again["invalid"]) == (1, 2, 1, 1)
+    assert [(r["status"], r["id"]) for r in again["results"][:2]] == [("exists", ids[0]), ("exists", ids[1])]
+    assert again["results"][2]["status"] == "created" and again["results"][2]["id"] not in ids
@@ -0,0 +1,165 @@
+"""GET /targets/{id}/checks: keyset cursor and step bucketing."""
+
+import asyncio
+import base64
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from database import engine
+from main import app
+from routers.targets import MAX_HISTORY_BUCKETS, _decode_cursor, _encode_cursor
+
+T0 = datetime(2026, 2, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def b64(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "checked_at",
+    [T0, T0.replace(microsecond=123456), T0.astimezone(timezone(timedelta(hours=-5)))],
+)
+def test_cursor_round_trip(checked_at):
+    cursor = _encode_cursor(checked_at, 9_000_000_000)
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == (checked_at, 9_000_000_000)
+
+
+def test_naive_cursor_time_is_utc():
+    assert _decode_cursor(b64("2026-02-01T10:00:00|7")) == (T0, 7)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "!!!",
+        "é",
+        b64("not a date|1"),
+        b64("2026-02-01T10:00:00+00:00"),
+        b64("2026-02-01T10:00:00+00:00|x"),
+        b64("2026-02-01T10:00:00+00:00|-1"),
+        b64(f"2026-02-01T10:00:00+00:00|{2**63}"),
+        base64.urlsafe_b64encode(b"\xff\xfe|1").decode(),
+    ],
+)
+def test_bad_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        _decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+
+# The rest runs against the database at DATABASE_URL (migrations applied) and is skipped without one.
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture(scope="module")
+def database():
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1 FROM checks LIMIT 1"))
+
+    try:
+        run(ping())
+    except Exception as e:
+        pytest.skip(f"no database: {e}")
+
+
+async def _client_with_target(client: httpx.AsyncClient) -> int:
+    email = f"history-{uuid.uuid4().hex[:12]}@example.com"
+    assert (await client.post("/auth/register", json={"email": email, "password": "history-pass"})).status_code == 200
+    response = await client.post("/targets", json={"url": f"https://{uuid.uuid4().hex[:12]}.example.com/"})
+    return response.json()["id"]
+
+
+async def _cleanup(client: httpx.AsyncClient) -> None:
+    me = (await client.get("/auth/me")).json()
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM users WHERE id = :id"), {"id": me["id"]})
+
+
+def with_target(body):
+    """Run body(client, target_id) as a fresh user with one target, deleting them afterwards."""
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            target_id = await _client_with_target(client)
+            try:
+                return await body(client, target_id)
+            finally:
+                await _cleanup(client)
+
+    return run(main())
+
+
+def test_pages_through_rows_with_the_same_timestamp(database):
+    async def body(client, target_id):
+        # Five checks at one instant, two before and one after.
+        at = datetime.now(timezone.utc).replace(minute=30, second=0, microsecond=0)
+        times = [at - timedelta(seconds=2), at - timedelta(seconds=1)] + [at] * 5 + [at + timedelta(seconds=1)]
+        async with engine.begin() as conn:
+            await conn.execute(text("SELECT ensure_checks_partitions(CAST(:d AS date), CAST(:d AS date))"), {"d": at.date()})
+            for at in times:
+                await conn.execute(
+                    text("INSERT INTO checks (target_id, checked_at, status_code, latency_ms, is_up) VALUES (:t, :at, 200, 10, true)"),
+                    {"t": target_id, "at": at},
+                )
+            ids = (await conn.execute(text("SELECT id FROM checks WHERE target_id = :t ORDER BY checked_at, id"), {"t": target_id})).scalars().all()
+        window = {"from": (at - timedelta(minutes=1)).isoformat(), "to": (at + timedelta(minutes=1)).isoformat(), "limit": 2}
+        seen, cursor, pages = [], None, 0
+        while True:
+            response = await client.get(f"/targets/{target_id}/checks", params={**window, **({"cursor": cursor} if cursor else {})})
+            assert response.status_code == 200
+            page = response.json()
+            seen += [c["id"] for c in page["checks"]]
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == ids
+        assert pages == 4
+        response = await client.get(f"/targets/{target_id}/checks", params={**window, "cursor": b64(f"{at.isoformat()}|{2**63}")})
+        assert response.status_code == 400
+
+    with_target(body)
+
+
+def test_step_buckets_and_limits(database):
+    async def body(client, target_id):
+        async with engine.begin() as conn:
+            for hour, (checks, up) in enumerate(((60, 60), (60, 30))):
+                await conn.execute(
+                    text(
+                        "INSERT INTO check_rollups (target_id, bucket_seconds, bucket_start, checks, up_checks, latency_count,"
+                        " latency_min, latency_max, latency_sum, latency_sketch)"
+                        " VALUES (:t, 3600, :at, :checks, :up, :checks, 10, 90, :checks * 50, '{\"100\": 1}'::jsonb)"
+                    ),
+                    {"t": target_id, "at": T0 + timedelta(hours=hour), "checks": checks, "up": up},
+                )
+        url = f"/targets/{target_id}/checks"
+        window = {"from": T0.isoformat(), "to": (T0 + timedelta(hours=4)).isoformat()}
+        page = (await client.get(url, params={**window, "step": 7200})).json()
+        assert [(b["bucket_start"], b["checks"], b["up_checks"], b["uptime_percent"]) for b in page["buckets"]] == [
+            (T0.isoformat(), 120, 90, 75.0)
+        ]
+        assert (await client.get(url, params={**window, "step": 90})).status_code == 400
+        wide = {"from": T0.isoformat(), "to": (T0 + timedelta(minutes=MAX_HISTORY_BUCKETS)).isoformat()}
+        assert (await client.get(url, params={**wide, "step": 60})).status_code == 200
+        wider = {**wide, "to": (T0 + timedelta(minutes=MAX_HISTORY_BUCKETS + 1)).isoformat()}
+        assert (await client.get(url, params={**wider, "step": 60})).status_code == 400
+
+    with_target(body)
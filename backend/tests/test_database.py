@@ -0,0 +1,76 @@
+import asyncio
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+from database import InstrumentedPool, pool_stats
+
+
+class _Connection:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _pool(**kw) -> InstrumentedPool:
+    return InstrumentedPool(_Connection, pool_size=2, max_overflow=1, **kw)
+
+
+def test_exhausted_only_without_idle_connection_or_overflow():
+    pool = _pool()
+    held = []
+    for _ in range(3):
+        assert not pool.exhausted()
+        held.append(pool.connect())
+    assert pool.exhausted()
+    held.pop().close()
+    assert not pool.exhausted()  # one idle connection
+    for conn in held:
+        conn.close()
+
+
+def test_unlimited_overflow_never_exhausted():
+    pool = InstrumentedPool(_Connection, pool_size=1, max_overflow=-1)
+    held = [pool.connect() for _ in range(5)]
+    assert not pool.exhausted()
+    for conn in held:
+        conn.close()
+
+
+def test_waiting_counts_only_blocked_checkouts():
+    async def main():
+        pool = _pool(timeout=5)
+        held = [pool.connect() for _ in range(3)]
+        assert pool_stats.waiting == 0  # checkouts with room in the pool never counted
+        blocked = asyncio.create_task(greenlet_spawn(pool.connect))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert pool_stats.waiting == 1
+        held.pop().close()
+        held.append(await blocked)
+        assert pool_stats.waiting == 0
+        for conn in held:
+            conn.close()
+
+    asyncio.run(main())
+
+
+def test_timeout_counted_and_waiting_released():
+    async def main():
+        pool = _pool(timeout=0.01)
+        held = [pool.connect() for _ in range(3)]
+        timeouts = pool_stats.timeouts
+        try:
+            await greenlet_spawn(pool.connect)
+        except PoolTimeoutError:
+            pass
+        else:
+            raise AssertionError("checkout of an exhausted pool did not time out")
+        assert pool_stats.timeouts == timeouts + 1
+        assert pool_stats.waiting == 0
+        for conn in held:
+            conn.close()
+
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+"""Rollup reads: window cover at minute, hour and day boundaries, and quantiles from the latency sketch."""
+
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import rollups
+from rollups import GAMMA, cover, quantile, retained_since
+
+DAY = datetime(2026, 3, 10, tzinfo=timezone.utc)
+M, H, D = 60, 3600, 86400
+
+
+def at(hours=0, minutes=0, seconds=0, days=0):
+    return DAY + timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+
+def assert_tiles(ranges, start, end):
+    """Ranges are aligned to their size, contiguous, and span exactly [start, end)."""
+    assert ranges[0][1] == start and ranges[-1][2] == end
+    for (size, frm, to), nxt in zip(ranges, ranges[1:] + [None]):
+        assert frm < to
+        assert frm.timestamp() % size == 0 and to.timestamp() % size == 0
+        if nxt is not None:
+            assert to == nxt[1]
+
+
+@pytest.mark.parametrize(
+    "start, end, expected",
+    [
+        # Whole days only.
+        (at(), at(days=2), [(D, at(), at(days=2))]),
+        # Whole hours inside a day.
+        (at(hours=3), at(hours=5), [(H, at(hours=3), at(hours=5))]),
+        # Ragged minutes around one hour.
+        (at(minutes=59), at(hours=2, minutes=1), [(M, at(minutes=59), at(hours=1)), (H, at(hours=1), at(hours=2)), (M, at(hours=2), at(hours=2, minutes=1))]),
+        # Across midnight, shorter than an hour: minutes only.
+        (at(minutes=-1), at(minutes=1), [(M, at(minutes=-1), at(minutes=1))]),
+        # Days in the middle, hours and minutes at both edges.
+        (
+            at(hours=-1, minutes=-30),
+            at(days=1, hours=2, minutes=15),
+            [
+                (M, at(hours=-1, minutes=-30), at(hours=-1)),
+                (H, at(hours=-1), at()),
+                (D, at(), at(days=1)),
+                (H, at(days=1), at(days=1, hours=2)),
+                (M, at(days=1, hours=2), at(days=1, hours=2, minutes=15)),
+            ],
+        ),
+    ],
+)
+def test_cover_boundaries(start, end, expected):
+    ranges = cover(start, end)
+    assert ranges == expected
+    assert_tiles(ranges, start, end)
+
+
+def test_cover_rounds_out_to_whole_minutes():
+    ranges = cover(at(minutes=10, seconds=30), at(minutes=12, seconds=1))
+    assert ranges == [(M, at(minutes=10), at(minutes=13))]
+
+
+def test_cover_empty_window():
+    assert cover(at(hours=1), at(hours=1)) == []
+    assert cover(at(hours=2), at(hours=1)) == []
+
+
+def test_cover_random_windows_tile_exactly():
+    rng = random.Random(3)
+    for _ in range(500):
+        start = DAY + timedelta(seconds=rng.randrange(-10 * D, 10 * D))
+        end = start + timedelta(seconds=rng.randrange(1, 40 * D))
+        ranges = cover(start, end)
+        lo = start.replace(second=0, microsecond=0)
+        hi = end if end.second == 0 else end.replace(second=0) + timedelta(minutes=1)
+        assert_tiles(ranges, lo, hi)
+        assert len([r for r in ranges if r[0] != D]) <= 2 * (23 + 59)
+
+
+def test_cover_rounds_edges_past_retention_to_coarser_buckets():
+    retained = {M: at(days=-2), H: at(days=-30)}
+    # Start older than the minute retention: rounded down to its hour; end is recent, keeps minutes.
+    ranges = cover(at(days=-3, hours=5, minutes=20), at(minutes=7), retained)
+    assert ranges == [
+        (H, at(days=-3, hours=5), at(days=-2)),
+        (D, at(days=-2), at()),
+        (M, at(), at(minutes=7)),
+    ]
+    # Start older than the hour retention: rounded down to its day.
+    assert cover(at(days=-40, hours=5), at(), retained) == [(D, at(days=-40), at())]
+    # Both edges old: both rounded outward.
+    ranges = cover(at(days=-5, hours=5, minutes=1), at(days=-5, hours=7, minutes=59), retained)
+    assert ranges == [(H, at(days=-5, hours=5), at(days=-5, hours=8))]
+    # Edges exactly at the cutoff stay as they are.
+    assert cover(at(days=-2), at(days=-2, minutes=5), retained) == [(M, at(days=-2), at(days=-2, minutes=5))]
+
+
+def test_retained_since(monkeypatch):
+    monkeypatch.setattr(rollups.settings, "ROLLUP_MINUTE_RETENTION_DAYS", 30)
+    monkeypatch.setattr(rollups.settings, "ROLLUP_HOUR_RETENTION_DAYS", 0)
+    since = retained_since(at(hours=13, minutes=5))
+    assert since == {M: at(days=-30), H: None}
+
+
+def sketch_of(latencies):
+    """The worker's sketch (worker/rollups.py sketch_index) of a list of latencies."""
+    sketch = {}
+    for ms in latencies:
+        index = math.ceil(math.log(ms) / math.log(GAMMA)) if ms > 0 else 0
+        sketch[str(index)] = sketch.get(str(index), 0) + 1
+    return sketch
+
+
+def exact(latencies, q):
+    """The rank quantile() estimates: the value at position floor(q * (n - 1)) in sorted order."""
+    ordered = sorted(latencies)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def within_bound(estimate, true):
+    # Bucket midpoints are within (GAMMA - 1) / (GAMMA + 1) = 2% of any value in the bucket, plus
+    # rounding to whole ms; 0 and 1 ms share bucket 0, which reads back as 0 before clamping to the min.
+    return abs(estimate - true) <= max(0.02 * true + 0.5, 1) + 1e-9
+
+
+@pytest.mark.parametrize(
+    "name, sample",
+    [
+        ("uniform", lambda rng: rng.randrange(1, 2000)),
+        ("lognormal", lambda rng: max(1, int(rng.lognormvariate(5, 1)))),
+        ("bimodal", lambda rng: rng.choice((rng.randrange(20, 40), rng.randrange(3000, 10000)))),
+        ("tiny", lambda rng: rng.randrange(0, 5)),
+    ],
+)
+def test_quantile_within_error_bound(name, sample):
+    rng = random.Random(name)
+    for n in (1, 2, 10, 1000):
+        latencies = [sample(rng) for _ in range(n)]
+        sketch = sketch_of(latencies)
+        for q in (0.0, 0.5, 0.9, 0.95, 0.99, 1.0):
+            estimate = quantile(sketch, q, min(latencies), max(latencies))
+            assert within_bound(estimate, exact(latencies, q)), (name, n, q, estimate, exact(latencies, q))
+
+
+def test_quantile_is_clamped_to_observed_range():
+    sketch = sketch_of([1000])
+    assert quantile(sketch, 0.5, None, None) != 1000  # the bucket midpoint, not the value
+    assert quantile(sketch, 0.5, 1000, 1000) == 1000
+
+
+def test_quantile_empty_sketch():
+    assert quantile({}, 0.5, None, None) is None
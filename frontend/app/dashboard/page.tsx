@@ -3,7 +3,7 @@
 import { useCallback, useEffect, useState } from "react";
 import Link from "next/link";
 import { useRouter } from "next/navigation";
-import { apiFetch, apiJson } from "@/lib/api";
+import { apiFetch, apiJson, apiUrl } from "@/lib/api";
 
 type LatestCheck = {
   checked_at: string | null;
@@ -11,6 +11,14 @@ type LatestCheck = {
   status_code: number | null;
   latency_ms: number | null;
   error: string | null;
+  state_since: string | null;
+  consecutive_failures: number;
+  backoff_until: string | null;
+};
+
+type CheckEvent = LatestCheck & {
+  target_id: number;
+  state_changed: boolean;
 };
 
 type TargetStatusRow = {
@@ -103,6 +111,43 @@ export default function DashboardPage() {
     };
   }, [loadStatus]);
 
+  // Live updates: the API pushes each new check result over SSE, so the table never needs re-polling.
+  useEffect(() => {
+    if (loading || authFailed) return;
+    const source = new EventSource(apiUrl("/events"), { withCredentials: true });
+    let dropped = false;
+    source.addEventListener("check", (e) => {
+      const ev = JSON.parse((e as MessageEvent).data) as CheckEvent;
+      const latest: LatestCheck = {
+        checked_at: ev.checked_at,
+        is_up: ev.is_up,
+        status_code: ev.status_code,
+        latency_ms: ev.latency_ms,
+        error: ev.error,
+        state_since: ev.state_since,
+        consecutive_failures: ev.consecutive_failures,
+        backoff_until: ev.backoff_until,
+      };
+      setItems((prev) =>
+        prev.map((row) => (row.id === ev.target_id ? { ...row, latest_check: latest } : row))
+      );
+    });
+    // Events may have been missed (server reconnect, slow tab, or our own reconnect): refetch.
+    source.addEventListener("resync", () => {
+      loadStatus();
+    });
+    source.onerror = () => {
+      dropped = true;
+    };
+    source.onopen = () => {
+      if (dropped) {
+        dropped = false;
+        loadStatus();
+      }
+    };
+    return () => source.close();
+  }, [loading, authFailed, loadStatus]);
+
   useEffect(() => {
     if (authFailed) router.replace("/login");
   }, [authFailed, router]);
@@ -270,6 +315,17 @@ export default function DashboardPage() {
                         {status === "down" && (
                           <span className="status-down">Down</span>
                         )}
+                        {lc?.state_since && (
+                          <span style={{ display: "block", fontSize: "0.875rem", color: "#666" }}>
+                            since {formatTimestamp(lc.state_since)}
+                          </span>
+                        )}
+                        {lc?.backoff_until && (
+                          <span style={{ display: "block", fontSize: "0.875rem", color: "#666" }}>
+                            {lc.consecutive_failures} failures in a row; next check{" "}
+                            {formatTimestamp(lc.backoff_until)}
+                          </span>
+                        )}
                       </td>
                       <td>{formatTimestamp(lc?.checked_at ?? null)}</td>
                       <td>
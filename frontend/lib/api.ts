@@ -6,12 +6,15 @@ const defaultOptions: RequestInit = {
   headers: { "Content-Type": "application/json" },
 };
 
+export function apiUrl(path: string): string {
+  return path.startsWith("http") ? path : `${API_BASE}${path}`;
+}
+
 export async function apiFetch(
   path: string,
   options: RequestInit = {}
 ): Promise<Response> {
-  const url = path.startsWith("http") ? path : `${API_BASE}${path}`;
-  return fetch(url, { ...defaultOptions, ...options });
+  return fetch(apiUrl(path), { ...defaultOptions, ...options });
 }
 
 export async function apiJson<T>(path: string, options?: RequestInit): Promise<T> {
@@ -0,0 +1,38 @@
+"""Async HTTP check with the same semantics and result shape as checker.check_url."""
+
+import httpx
+
+from checker import NO_RETRY_ERRORS, Assertions, CheckRun
+from timing import PhaseTimer
+
+
+async def check_url_async(
+    client: httpx.AsyncClient, url: str, assertions: Assertions | None = None, timer: PhaseTimer | None = None
+) -> dict:
+    """
+    Attempt HEAD first (unless the body has to be matched); if HEAD fails (other than by connect error or
+    connect timeout) or its status is not accepted, retry once with a streamed GET read up to
+    HTTP_MAX_BODY_BYTES. Return the same dict as check_url: checked_at, status_code, latency_ms, ttfb_ms,
+    dns_ms, connect_ms, tls_ms, transfer_ms, is_up, error.
+    """
+    check = CheckRun(assertions, timer)
+    extensions = {"trace": check.timer.atrace}
+    try:
+        if check.wants_head:
+            try:
+                check.head_done((await client.head(url, extensions=extensions)).status_code)
+            except NO_RETRY_ERRORS:
+                raise
+            except (httpx.HTTPError, OSError):
+                pass
+        if check.wants_get:
+            check.get_started()
+            async with client.stream("GET", url, extensions=extensions) as resp:
+                body = check.get_headers(resp.status_code)
+                async for chunk in resp.aiter_bytes():
+                    if body.feed(chunk):
+                        break
+        check.complete()
+    except Exception as e:
+        check.fail(e)
+    return check.done()
@@ -0,0 +1,141 @@
+"""Asyncio check engine: runs checks concurrently under global and per-host limits."""
+
+import asyncio
+import logging
+import time
+from urllib.parse import urlparse
+
+import metrics
+from async_checker import check_url_async
+from backoff import backoff_until, host_circuits
+from checker import Assertions, blocked_result
+from config import settings
+from http_client import create_async_client
+from resolver import dns_cache
+from retention import PartitionMaintainer
+from scheduler import Probe, Schedule
+from sharding import Membership
+from sink import ResultSink
+from ssrf import is_url_blocked
+from timing import PhaseTimer
+
+logger = logging.getLogger(__name__)
+
+
+class HostLimiter:
+    """Hand out one semaphore per hostname so no single host gets more than `limit` checks at once."""
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def for_url(self, url: str) -> asyncio.Semaphore:
+        host = (urlparse(url).hostname or "").lower()
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = self._semaphores[host] = asyncio.Semaphore(self._limit)
+        return sem
+
+
+async def check_target_async(
+    client,
+    url: str,
+    in_flight: asyncio.Semaphore,
+    hosts: HostLimiter,
+    on_start=None,
+    assertions: Assertions | None = None,
+) -> dict:
+    """
+    SSRF-guard, consult the host's circuit, then check one URL; the host slot is taken before the global
+    slot so a busy host cannot hog it.
+    """
+    async with hosts.for_url(url):
+        async with in_flight:
+            if on_start is not None:
+                on_start()
+            start = time.perf_counter()
+            skipped = None
+            host = (urlparse(url).hostname or "").lower()
+            timer = PhaseTimer()
+            with metrics.CHECKS_IN_FLIGHT.track_inprogress(), timer.measuring():
+                if dns_cache.is_fresh(host):
+                    blocked, reason = is_url_blocked(url)
+                else:
+                    blocked, reason = await asyncio.to_thread(is_url_blocked, url)
+                if blocked:
+                    logger.info("%s blocked (SSRF): %s", url, reason)
+                    skipped, result = "blocked", blocked_result(reason)
+                elif (error := host_circuits.fast_fail(host)) is not None:
+                    skipped, result = "circuit_open", blocked_result(error)
+                else:
+                    result = await check_url_async(client, url, assertions, timer)
+                    host_circuits.record(host, result)
+            metrics.observe_check(result, time.perf_counter() - start, skipped)
+            return result
+
+
+async def run_scheduled_async(
+    conn, schedule: Schedule, sink: ResultSink, membership: Membership, partitions: PartitionMaintainer
+) -> None:
+    """
+    Start each URL's probe as it comes due without waiting for earlier ones to finish.
+    Schedule lag is measured when the probe gets its concurrency slots, so saturation shows up as lag.
+    Database work (target refresh, result flushes) runs in worker threads, never on the event loop, so it
+    does not stall checks in flight or inflate their timings.
+    """
+    in_flight = asyncio.Semaphore(settings.MAX_CONCURRENT_CHECKS)
+    hosts = HostLimiter(settings.MAX_CONCURRENT_CHECKS_PER_HOST)
+    running: dict[str, asyncio.Task] = {}
+    # Set by a check that fills the batch, so the loop flushes it without waiting for its next wake-up.
+    batch_full = asyncio.Event()
+
+    async def run_one(probe: Probe, due: float) -> None:
+        try:
+            result = await check_target_async(
+                client, probe.url, in_flight, hosts,
+                on_start=lambda: schedule.lag.observe(time.monotonic() - due),
+                assertions=probe.assertions,
+            )
+            until = backoff_until(schedule.record(probe.key, due, result["is_up"], time.monotonic()))
+            for row in schedule.fan_out(probe, due):
+                sink.buffer(row["id"], result, until)
+            if sink.full:
+                batch_full.set()
+        except Exception:
+            logger.exception("Check of %s failed", probe.url)
+        finally:
+            running.pop(probe.key, None)
+
+    async with create_async_client() as client:
+        try:
+            while True:
+                now = time.monotonic()
+                if schedule.refresh_due(now):
+                    with metrics.REFRESH_SECONDS.time():
+                        targets = await asyncio.to_thread(membership.owned_targets, conn)
+                        schedule.sync(targets, now)
+                        sink.incidents.retain({row["id"] for row in targets})
+                        sink.log_stats()
+                        await asyncio.to_thread(partitions.run_if_due, conn)
+                    metrics.SCHEDULED_TARGETS.set(len(schedule))
+                    metrics.SCHEDULED_URLS.set(schedule.probe_count)
+                    metrics.BACKED_OFF_TARGETS.set(schedule.backed_off)
+                for probe, due in schedule.pop_due(now):
+                    if probe.key in running:
+                        logger.warning("%s still being checked; skipping this slot", probe.url)
+                        continue
+                    running[probe.key] = asyncio.create_task(run_one(probe, due))
+                batch_full.clear()
+                if sink.flush_due(time.monotonic()):
+                    await sink.flush_async()
+                metrics.CYCLE_SECONDS.observe(time.monotonic() - now)
+                now = time.monotonic()
+                try:
+                    await asyncio.wait_for(
+                        batch_full.wait(), min(schedule.seconds_until_next(now), sink.seconds_until_flush(now))
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(running.values()):
+                task.cancel()
@@ -0,0 +1,97 @@
+"""
+Failure handling for dead targets and unreachable hosts.
+
+Targets that keep failing are checked less often: from the BACKOFF_AFTER_FAILURES-th consecutive failure
+on, each further failure doubles the interval, up to BACKOFF_MAX_SECONDS. The first success drops it
+straight back to the target's own interval.
+
+Hosts that stop answering altogether trip a per-host circuit after CIRCUIT_FAILURE_THRESHOLD consecutive
+checks without an HTTP response (connect error, timeout, DNS failure). While it is open, checks of any
+target on that host fail immediately without touching the network. Every CIRCUIT_OPEN_SECONDS one check
+is let through as a probe, and a probe that gets any response closes the circuit. Fast-failed checks are
+still recorded as down.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Doubling stops mattering long before this; it only keeps 2 ** n small.
+_MAX_DOUBLINGS = 20
+
+
+def backoff_interval(interval: float, failures: int) -> float:
+    """Seconds until the next check of a target with this interval after `failures` consecutive failures."""
+    after = settings.BACKOFF_AFTER_FAILURES
+    if not after or failures < after:
+        return interval
+    doublings = min(failures - after + 1, _MAX_DOUBLINGS)
+    return min(interval * 2**doublings, max(settings.BACKOFF_MAX_SECONDS, interval))
+
+
+def backoff_until(next_due: float | None) -> datetime | None:
+    """Wall-clock time of a backed-off target's next check, from Schedule.record's monotonic time."""
+    if next_due is None:
+        return None
+    return datetime.now(timezone.utc) + timedelta(seconds=next_due - time.monotonic())
+
+
+class HostCircuits:
+    """Per-hostname circuit breakers; only hosts that are currently failing are tracked."""
+
+    def __init__(self, threshold: int, open_seconds: float):
+        self.threshold = threshold
+        self.open_seconds = open_seconds
+        self.fast_failures = 0
+        self._failures: dict[str, int] = {}
+        self._open_until: dict[str, float] = {}
+        self._last_error: dict[str, str] = {}
+
+    @property
+    def open_count(self) -> int:
+        return len(self._open_until)
+
+    def fast_fail(self, host: str) -> str | None:
+        """
+        Return the error to record instead of checking `host`, or None if the check should go ahead.
+        When an open circuit's wait is over, the caller's check is the probe and the next one waits again.
+        """
+        until = self._open_until.get(host)
+        if until is None:
+            return None
+        now = time.monotonic()
+        if now >= until:
+            self._open_until[host] = now + self.open_seconds
+            return None
+        self.fast_failures += 1
+        return f"Host unreachable, not checked (circuit open): {self._last_error.get(host, '')}"
+
+    def record(self, host: str, result: dict) -> None:
+        """Feed a real check's result for `host` (not a fast-failed one) into its circuit."""
+        if result["status_code"] is not None:
+            if self._open_until.pop(host, None) is not None:
+                logger.info("Host %s answering again; circuit closed", host)
+            self._failures.pop(host, None)
+            self._last_error.pop(host, None)
+            return
+        if not self.threshold:
+            return
+        failures = self._failures.get(host, 0) + 1
+        self._failures[host] = failures
+        self._last_error[host] = result["error"] or ""
+        if failures >= self.threshold:
+            if host not in self._open_until:
+                logger.warning(
+                    "Host %s unreachable after %d consecutive checks; failing its checks fast for %ss",
+                    host,
+                    failures,
+                    self.open_seconds,
+                )
+            self._open_until[host] = time.monotonic() + self.open_seconds
+
+
+host_circuits = HostCircuits(settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_OPEN_SECONDS)
@@ -0,0 +1 @@
+"""Benchmarks for the worker's hot paths (run from worker/: python -m bench.<name>)."""
@@ -0,0 +1,74 @@
+"""
+Microbenchmark: compiled SSRF range matcher vs. the original per-network loop.
+
+    python -m bench.ssrf_matcher            # timings as JSON
+
+Correctness of the matcher is covered by tests/test_ssrf.py.
+
+The legacy loop below is the pre-matcher implementation (IPv4 list scan, IPv6 loopback only), kept
+here as the baseline.
+"""
+
+import argparse
+import ipaddress
+import json
+import random
+import sys
+import timeit
+
+from ssrf import _DEFAULT_BLOCKED, is_blocked_ip
+
+_LEGACY_NETS = [
+    ipaddress.ip_network("127.0.0.0/8"),
+    ipaddress.ip_network("10.0.0.0/8"),
+    ipaddress.ip_network("172.16.0.0/12"),
+    ipaddress.ip_network("192.168.0.0/16"),
+    ipaddress.ip_network("169.254.0.0/16"),
+]
+
+
+def legacy_is_blocked_ip(ip_str: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(ip_str)
+    except ValueError:
+        return True
+    if ip.version == 4:
+        for net in _LEGACY_NETS:
+            if ip in net:
+                return True
+        return False
+    return ip.is_loopback
+
+
+def sample_addresses(n: int, seed: int = 1) -> list[str]:
+    """Mostly public addresses (the common case), with some private and IPv6 ones mixed in."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        if i % 10 == 0:
+            out.append(str(ipaddress.IPv6Address(rng.getrandbits(128))))
+        elif i % 10 == 1:
+            out.append(f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}")
+        else:
+            out.append(str(ipaddress.IPv4Address(rng.getrandbits(32))))
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--addresses", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    addresses = sample_addresses(args.addresses)
+    report = {"addresses": len(addresses), "blocked_ranges": len(_DEFAULT_BLOCKED)}
+    for name, fn in (("legacy_loop", legacy_is_blocked_ip), ("compiled_matcher", is_blocked_ip)):
+        best = min(timeit.repeat(lambda: [fn(a) for a in addresses], number=1, repeat=args.repeat))
+        report[name] = {"ns_per_lookup": round(best / len(addresses) * 1e9, 1)}
+    report["speedup"] = round(report["legacy_loop"]["ns_per_lookup"] / report["compiled_matcher"]["ns_per_lookup"], 2)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
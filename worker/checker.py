@@ -1,45 +1,227 @@
-"""Perform a single HTTP check: HEAD first, retry once with GET if HEAD fails or status >= 400."""
+"""Perform a single HTTP check: HEAD first, retry once with a streamed GET if HEAD fails or its status is not accepted.
+
+There is no GET retry when HEAD could not connect (refused, unresolvable, or connect timeout): the host
+is not answering, and a second attempt would only spend another HTTP_TIMEOUT_SECONDS finding that out.
+A HEAD that connected but then timed out is retried, since some servers and WAFs hang on HEAD only.
+
+GET bodies are streamed and read only up to HTTP_MAX_BODY_BYTES (decoded), then the response is closed,
+so a huge page or an endless stream costs at most that much bandwidth and memory. Targets with a body
+keyword or regex skip HEAD and are matched against that prefix. Regexes run on RE2, in time linear in the
+prefix, so a user's pattern cannot stall the worker by backtracking.
+"""
 
 import time
 from datetime import datetime, timezone
 
-import certifi
-import requests
+import httpx
+import re2
 
 from config import settings
+from timing import PhaseTimer
 
+_RE2_OPTIONS = re2.Options()
+_RE2_OPTIONS.log_errors = False
+_RE2_OPTIONS.never_capture = True
 
-def check_url(url: str) -> dict:
-    """
-    Attempt HEAD first; if HEAD fails or returns >= 400, retry once with GET.
-    Record latency_ms and status_code from the successful attempt.
-    Return dict: checked_at, status_code (int|None), latency_ms (int|None), is_up (bool), error (str|None).
-    """
-    checked_at = datetime.now(timezone.utc)
-    timeout = settings.HTTP_TIMEOUT_SECONDS
-    verify = certifi.where()
-    result = {
-        "checked_at": checked_at,
+# HEAD failures that say the host is unreachable rather than that it mishandles HEAD.
+NO_RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class Assertions:
+    """A target's expectations beyond "2xx or 3xx": an exact status code, and a keyword or regex in the body."""
+
+    __slots__ = ("expected_status", "keyword", "regex", "regex_error", "key")
+
+    def __init__(self, expected_status: int | None = None, keyword: str | None = None, regex: str | None = None):
+        self.expected_status = expected_status
+        self.keyword = keyword.encode() if keyword else None
+        self.regex = None
+        # Set for a stored pattern RE2 rejects (saved before the API validated with RE2); such checks fail.
+        self.regex_error: str | None = None
+        if regex:
+            try:
+                self.regex = re2.compile(regex, options=_RE2_OPTIONS)
+            except re2.error as e:
+                message = e.args[0].decode() if e.args and isinstance(e.args[0], bytes) else str(e)
+                self.regex_error = f"Invalid body_regex /{regex}/: {message}"
+        # Targets on one URL share a probe only if their assertions are the same.
+        self.key = f"{expected_status or ''}\x00{keyword or ''}\x00{regex or ''}"
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Assertions | None":
+        """The assertions configured on a target row, or None when it has none."""
+        expected_status, keyword, regex = row.get("expected_status"), row.get("body_keyword"), row.get("body_regex")
+        if expected_status is None and not keyword and not regex:
+            return None
+        return cls(expected_status, keyword, regex)
+
+    @property
+    def needs_body(self) -> bool:
+        return self.keyword is not None or self.regex is not None or self.regex_error is not None
+
+
+def status_accepted(status_code: int, assertions: Assertions | None) -> bool:
+    if assertions is not None and assertions.expected_status is not None:
+        return status_code == assertions.expected_status
+    return 200 <= status_code < 400
+
+
+def new_result(error: str | None = None) -> dict:
+    """A check_url-shaped result for a check starting now, with nothing measured yet."""
+    return {
+        "checked_at": datetime.now(timezone.utc),
         "status_code": None,
         "latency_ms": None,
+        "ttfb_ms": None,
+        "dns_ms": None,
+        "connect_ms": None,
+        "tls_ms": None,
+        "transfer_ms": None,
         "is_up": False,
-        "error": None,
+        "error": error,
     }
+
+
+def blocked_result(reason: str) -> dict:
+    """Return a check_url-shaped down result for a target that was not checked (SSRF guard, open circuit)."""
+    return new_result(reason)
+
+
+class BodyPrefix:
+    """Accumulates streamed body chunks up to a byte limit; done early once a keyword has been seen."""
+
+    def __init__(self, limit: int, keyword: bytes | None):
+        self.limit = limit
+        self.keyword = keyword
+        self.data = bytearray()
+        self.found = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add a chunk; return True when nothing more needs to be read."""
+        start = max(len(self.data) - len(self.keyword) + 1, 0) if self.keyword else 0
+        self.data += chunk[: self.limit - len(self.data)]
+        if self.keyword is not None and self.data.find(self.keyword, start) != -1:
+            self.found = True
+            return True
+        return len(self.data) >= self.limit
+
+
+def finish(result: dict, status_code: int, body: BodyPrefix | None, assertions: Assertions | None) -> dict:
+    """Fill status, is_up and any assertion error into a check result."""
+    result["status_code"] = status_code
+    if not status_accepted(status_code, assertions):
+        if assertions is not None and assertions.expected_status is not None:
+            result["error"] = f"Expected status {assertions.expected_status}, got {status_code}"
+        return result
+    if assertions is not None and body is not None:
+        if assertions.keyword is not None and not body.found:
+            result["error"] = f"Keyword {assertions.keyword.decode()!r} not in the first {len(body.data)} bytes"
+            return result
+        if assertions.regex_error is not None:
+            result["error"] = assertions.regex_error
+            return result
+        if assertions.regex is not None and not assertions.regex.search(body.data.decode("utf-8", "replace")):
+            result["error"] = f"No match for /{assertions.regex.pattern}/ in the first {len(body.data)} bytes"
+            return result
+    result["is_up"] = True
+    return result
+
+
+class CheckRun:
+    """
+    Everything about one check except its I/O, so check_url and check_url_async only differ in how they
+    send requests and read bodies: whether to send HEAD, whether its status settles the check, timing,
+    the body prefix and the result.
+    """
+
+    __slots__ = ("assertions", "timer", "result", "status_code", "body", "_start", "_attempt_start", "_headers_at")
+
+    def __init__(self, assertions: Assertions | None, timer: PhaseTimer | None):
+        self.assertions = assertions
+        self.timer = timer if timer is not None else PhaseTimer()
+        self.result = new_result()
+        self.status_code: int | None = None
+        self.body: BodyPrefix | None = None
+        self._start = time.perf_counter()
+        # Start of the request whose response settles the check (the GET after a failed HEAD).
+        self._attempt_start = self._start
+        self._headers_at = self._start
+
+    @property
+    def wants_head(self) -> bool:
+        return self.assertions is None or not self.assertions.needs_body
+
+    def head_done(self, status_code: int) -> None:
+        """A HEAD response arrived; an accepted status settles the check."""
+        if status_accepted(status_code, self.assertions):
+            self.status_code = status_code
+
+    @property
+    def wants_get(self) -> bool:
+        return self.status_code is None
+
+    def get_started(self) -> None:
+        """The GET is being sent; its time to first byte is counted from here, not from a failed HEAD."""
+        self._attempt_start = time.perf_counter()
+
+    def get_headers(self, status_code: int) -> BodyPrefix:
+        """The GET's headers arrived; return the prefix to feed its body chunks into."""
+        self._headers_at = time.perf_counter()
+        self.result["ttfb_ms"] = int((self._headers_at - self._attempt_start) * 1000)
+        self.status_code = status_code
+        self.body = BodyPrefix(settings.HTTP_MAX_BODY_BYTES, self.assertions.keyword if self.assertions else None)
+        return self.body
+
+    def complete(self) -> None:
+        """The last response is read: set timings, status, assertion error and is_up."""
+        result = self.result
+        end = time.perf_counter()
+        result["latency_ms"] = int((end - self._start) * 1000)
+        if self.body is None:
+            result["ttfb_ms"] = result["latency_ms"]  # HEAD: headers are the whole response
+            result["transfer_ms"] = 0
+        else:
+            result["transfer_ms"] = int((end - self._headers_at) * 1000)
+        finish(result, self.status_code, self.body, self.assertions)
+
+    def fail(self, error: Exception) -> None:
+        self.result["error"] = str(error) or type(error).__name__
+
+    def done(self) -> dict:
+        return self.timer.fill(self.result)
+
+
+def check_url(
+    client: httpx.Client, url: str, assertions: Assertions | None = None, timer: PhaseTimer | None = None
+) -> dict:
+    """
+    Attempt HEAD first (unless the body has to be matched); if HEAD fails (other than by connect error or
+    connect timeout) or its status is not accepted, retry once with a streamed GET. latency_ms covers the
+    whole check up to the end of the body prefix read, including a failed HEAD; ttfb_ms is the time from
+    sending the final request (the GET, after a fallback) to its headers, and transfer_ms the body read after
+    that. dns_ms, connect_ms and tls_ms come from `timer` (see timing.py);
+    DNS is only counted while the caller has it measuring, which lets it include the SSRF guard's lookup.
+    Return dict: checked_at, status_code (int|None), latency_ms, ttfb_ms, dns_ms, connect_ms, tls_ms,
+    transfer_ms (int|None), is_up (bool), error (str|None).
+    """
+    check = CheckRun(assertions, timer)
+    extensions = {"trace": check.timer.trace}
     try:
-        start = time.perf_counter()
-        resp = None
-        try:
-            resp = requests.head(url, timeout=timeout, allow_redirects=True, verify=verify)
-            if resp.status_code >= 400:
-                resp = requests.get(url, timeout=timeout, allow_redirects=True, verify=verify)
-        except (requests.RequestException, OSError):
-            resp = requests.get(url, timeout=timeout, allow_redirects=True, verify=verify)
-        elapsed_ms = int((time.perf_counter() - start) * 1000)
-        result["status_code"] = resp.status_code
-        result["latency_ms"] = elapsed_ms
-        result["is_up"] = 200 <= resp.status_code < 400
-    except requests.RequestException as e:
-        result["error"] = str(e)
+        if check.wants_head:
+            try:
+                check.head_done(client.head(url, extensions=extensions).status_code)
+            except NO_RETRY_ERRORS:
+                raise
+            except (httpx.HTTPError, OSError):
+                pass
+        if check.wants_get:
+            check.get_started()
+            with client.stream("GET", url, extensions=extensions) as resp:
+                body = check.get_headers(resp.status_code)
+                for chunk in resp.iter_bytes():
+                    if body.feed(chunk):
+                        break
+        check.complete()
     except Exception as e:
-        result["error"] = str(e)
-    return result
+        check.fail(e)
+    return check.done()
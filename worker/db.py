@@ -0,0 +1,48 @@
+"""Database helpers shared by the sync and async check engines."""
+
+from psycopg2.extras import RealDictCursor, execute_values
+
+
+def get_targets(conn) -> list[dict]:
+    """
+    Return list of {id, url, normalized_url, check_interval_seconds, expected_status, body_keyword, body_regex,
+    consecutive_failures} for all targets.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            """
+            SELECT
+                t.id, t.url, t.normalized_url, t.check_interval_seconds,
+                t.expected_status, t.body_keyword, t.body_regex,
+                COALESCE(s.consecutive_failures, 0) AS consecutive_failures
+            FROM targets t
+            LEFT JOIN target_status s ON s.target_id = t.id
+            """
+        )
+        return cur.fetchall()
+
+
+def insert_checks(cur, rows: list[tuple]) -> None:
+    """
+    Insert many (target_id, checked_at, status_code, latency_ms, is_up, error, ttfb_ms, dns_ms, connect_ms,
+    tls_ms, transfer_ms) rows in one statement. Rows of targets deleted since the last refresh are skipped.
+    """
+    execute_values(
+        cur,
+        """
+        INSERT INTO checks (
+            target_id, checked_at, status_code, latency_ms, is_up, error, ttfb_ms, dns_ms, connect_ms, tls_ms, transfer_ms
+        )
+        SELECT v.*
+        FROM (VALUES %s) AS v (
+            target_id, checked_at, status_code, latency_ms, is_up, error, ttfb_ms, dns_ms, connect_ms, tls_ms, transfer_ms
+        )
+        JOIN targets t ON t.id = v.target_id
+        """,
+        rows,
+        template=(
+            "(%s::int, %s::timestamptz, %s::int, %s::int, %s::boolean, %s::text, %s::int, %s::int, %s::int, %s::int,"
+            " %s::int)"
+        ),
+        page_size=len(rows),
+    )
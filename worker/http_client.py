@@ -0,0 +1,222 @@
+"""Long-lived pooled HTTP clients for checks (one per worker process, shared by every check)."""
+
+import asyncio
+import ssl
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+
+import certifi
+import httpcore
+import httpx
+
+from config import settings
+from resolver import ResolutionError, dns_cache
+from ssrf import is_blocked_ip
+
+
+@lru_cache(maxsize=2)
+def _ssl_context(verify: bool) -> ssl.SSLContext:
+    """CA bundle is loaded once per process, not on every check."""
+    if not verify:
+        ctx = ssl.create_default_context()
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+        return ctx
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+def _vetted_addresses(host: str) -> list[str]:
+    """Addresses from the shared DNS cache, re-checked against the SSRF blocklist (covers redirects too)."""
+    try:
+        addresses = dns_cache.resolve(host)
+    except ResolutionError as e:
+        raise httpcore.ConnectError(f"Resolution failed: {e}") from e
+    blocked = [ip for ip in addresses if is_blocked_ip(ip)]
+    if blocked:
+        raise httpcore.ConnectError(f"Resolved to blocked IP: {blocked[0]}")
+    return addresses
+
+
+class _PinnedBackend(httpcore.NetworkBackend):
+    """Connect to the vetted cached addresses instead of letting the socket layer resolve the host again."""
+
+    def __init__(self):
+        self._inner = httpcore.SyncBackend()
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        last_exc = None
+        for ip in _vetted_addresses(host):
+            try:
+                return self._inner.connect_tcp(ip, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError as e:
+                last_exc = e
+        raise last_exc
+
+    def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return self._inner.connect_unix_socket(path, timeout, socket_options)
+
+    def sleep(self, seconds):
+        self._inner.sleep(seconds)
+
+
+class _AsyncPinnedBackend(httpcore.AsyncNetworkBackend):
+    """Async twin of _PinnedBackend; cache misses are resolved in a worker thread."""
+
+    def __init__(self):
+        self._inner = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if dns_cache.is_fresh(host):
+            addresses = _vetted_addresses(host)
+        else:
+            addresses = await asyncio.to_thread(_vetted_addresses, host)
+        last_exc = None
+        for ip in addresses:
+            try:
+                return await self._inner.connect_tcp(ip, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError as e:
+                last_exc = e
+        raise last_exc
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._inner.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds):
+        await self._inner.sleep(seconds)
+
+
+def _pool_kwargs() -> dict:
+    if settings.HTTP_COLD_CONNECTIONS:
+        # No idle connections kept: every request pays TCP connect + TLS handshake, and latency includes it.
+        keepalive = {"max_keepalive_connections": 0}
+    else:
+        keepalive = {
+            "max_keepalive_connections": settings.HTTP_MAX_IDLE_CONNECTIONS,
+            "keepalive_expiry": settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        }
+    return {
+        "ssl_context": _ssl_context(settings.HTTP_VERIFY_SSL),
+        "max_connections": settings.MAX_CONCURRENT_CHECKS,
+        **keepalive,
+    }
+
+
+# httpcore exceptions and what httpx raises for them; most specific first.
+_ERRORS = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+
+
+@contextmanager
+def _httpx_errors() -> Iterator[None]:
+    """Re-raise httpcore errors as their httpx counterparts (the client attaches the request)."""
+    try:
+        yield
+    except Exception as e:
+        for core, mapped in _ERRORS:
+            if isinstance(e, core):
+                raise mapped(str(e)) from e
+        raise
+
+
+def _core_request(request: httpx.Request) -> httpcore.Request:
+    return httpcore.Request(
+        method=request.method,
+        url=httpcore.URL(
+            scheme=request.url.raw_scheme,
+            host=request.url.raw_host,
+            port=request.url.port,
+            target=request.url.raw_path,
+        ),
+        headers=request.headers.raw,
+        content=request.stream,
+        extensions=request.extensions,
+    )
+
+
+class _Body(httpx.SyncByteStream):
+    def __init__(self, stream):
+        self._stream = stream
+
+    def __iter__(self) -> Iterator[bytes]:
+        with _httpx_errors():
+            yield from self._stream
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class _AsyncBody(httpx.AsyncByteStream):
+    def __init__(self, stream):
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _httpx_errors():
+            async for chunk in self._stream:
+                yield chunk
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class _PinnedTransport(httpx.BaseTransport):
+    """
+    httpx transport over an httpcore pool that connects through _PinnedBackend (httpx.HTTPTransport takes no
+    network backend). Connections are capped at MAX_CONCURRENT_CHECKS in total; the sync engine runs one
+    check at a time, so it never has more than one connection in use per host.
+    """
+
+    def __init__(self):
+        self._pool = httpcore.ConnectionPool(network_backend=_PinnedBackend(), **_pool_kwargs())
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with _httpx_errors():
+            resp = self._pool.handle_request(_core_request(request))
+        return httpx.Response(resp.status, headers=resp.headers, stream=_Body(resp.stream), extensions=resp.extensions)
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+class _AsyncPinnedTransport(httpx.AsyncBaseTransport):
+    """Async twin of _PinnedTransport; per-host concurrency is capped by the async engine's HostLimiter."""
+
+    def __init__(self):
+        self._pool = httpcore.AsyncConnectionPool(network_backend=_AsyncPinnedBackend(), **_pool_kwargs())
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        with _httpx_errors():
+            resp = await self._pool.handle_async_request(_core_request(request))
+        return httpx.Response(resp.status, headers=resp.headers, stream=_AsyncBody(resp.stream), extensions=resp.extensions)
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+
+def _client_kwargs() -> dict:
+    # trust_env=False: an environment proxy would resolve hosts itself and bypass the pinned transport.
+    return {"timeout": settings.HTTP_TIMEOUT_SECONDS, "follow_redirects": True, "trust_env": False}
+
+
+def create_client() -> httpx.Client:
+    """Pooled client for the sync engine."""
+    return httpx.Client(transport=_PinnedTransport(), **_client_kwargs())
+
+
+def create_async_client() -> httpx.AsyncClient:
+    """Pooled client for the async engine; per-host concurrency is capped by the engine's HostLimiter."""
+    return httpx.AsyncClient(transport=_AsyncPinnedTransport(), **_client_kwargs())
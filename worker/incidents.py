@@ -0,0 +1,141 @@
+"""
+Incident detection: open and close one `incidents` row per confirmed outage instead of deriving outages
+from check history at read time.
+
+Each target's up/down state is debounced in memory. An outage is confirmed once INCIDENT_CONFIRM_FAILURES
+of the target's last INCIDENT_CONFIRM_WINDOW checks failed, and recovery once as many of the checks since
+then succeeded. After each transition the window starts empty, so a flapping target (alternating up and
+down) does not open an incident and a recovering one does not close it on its first good check. The
+incident starts at the first failed check in the confirming window and ends at the first successful one
+in the recovery window.
+
+Rows are written only on transitions, in the result sink's transaction, so the table grows with outages,
+not checks. State for targets this worker has not seen yet (startup, reassigned shards) comes from the
+open incidents already in the table.
+"""
+
+import logging
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# (checked_at, is_up, error or "HTTP <status>") of one check.
+_Check = tuple[datetime, bool, str | None]
+# (down, checks since the last transition, newest last, at most `window` of them).
+_State = tuple[bool, tuple[_Check, ...]]
+
+
+class IncidentTracker:
+    """Debounced per-target up/down state; `confirm` of the last `window` checks must agree to change it."""
+
+    def __init__(self, confirm: int, window: int):
+        self.confirm = confirm
+        self.window = max(window, confirm)
+        self._states: dict[int, _State] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.confirm > 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def retain(self, target_ids: set[int]) -> None:
+        """Drop state for targets no longer owned (another worker may change their incidents meanwhile)."""
+        for target_id in self._states.keys() - target_ids:
+            del self._states[target_id]
+
+    def write(self, cur, rows: list[tuple]) -> tuple[dict[int, _State], int, int]:
+        """
+        Fold a batch of check rows into per-target state and write the incidents it opens or closes (runs
+        in the caller's transaction). Returns the new states and the numbers of incidents opened and
+        closed, to be applied with commit() once the transaction has committed, so a failed flush can be
+        retried with the same rows.
+        """
+        if not self.enabled or not rows:
+            return {}, 0, 0
+        by_target: dict[int, list[tuple]] = {}
+        for row in rows:
+            by_target.setdefault(row[0], []).append(row)
+        unknown = [target_id for target_id in by_target if target_id not in self._states]
+        open_in_db = self._open_incidents(cur, unknown) if unknown else set()
+
+        staged: dict[int, _State] = {}
+        closes: list[tuple] = []
+        opens: list[tuple] = []
+        for target_id, target_rows in by_target.items():
+            state = self._states.get(target_id) or (target_id in open_in_db, ())
+            target_rows.sort(key=lambda r: r[1])
+            for row in target_rows:
+                error = row[5] or (f"HTTP {row[2]}" if row[2] is not None else None)
+                state = self._step(target_id, state, (row[1], row[4], error), closes, opens)
+            staged[target_id] = state
+
+        if closes:
+            execute_values(
+                cur,
+                """
+                UPDATE incidents i SET
+                    ended_at = v.ended_at,
+                    duration_seconds = GREATEST(extract(epoch FROM v.ended_at - i.started_at), 0)::int
+                FROM (VALUES %s) AS v (target_id, ended_at)
+                WHERE i.target_id = v.target_id AND i.ended_at IS NULL
+                """,
+                closes,
+                template="(%s::int, %s::timestamptz)",
+                page_size=len(closes),
+            )
+        if opens:
+            # Skips targets deleted meanwhile, and ones whose incident another worker already opened.
+            execute_values(
+                cur,
+                """
+                INSERT INTO incidents (target_id, started_at, ended_at, duration_seconds, error)
+                SELECT v.target_id, v.started_at, v.ended_at, v.duration_seconds, v.error
+                FROM (VALUES %s) AS v (target_id, started_at, ended_at, duration_seconds, error)
+                JOIN targets t ON t.id = v.target_id
+                ON CONFLICT (target_id) WHERE ended_at IS NULL DO NOTHING
+                """,
+                opens,
+                template="(%s::int, %s::timestamptz, %s::timestamptz, %s::int, %s::text)",
+                page_size=len(opens),
+            )
+        return staged, len(opens), len(closes) + sum(1 for o in opens if o[2] is not None)
+
+    def commit(self, staged: tuple[dict[int, _State], int, int]) -> None:
+        """Apply what write() returned after its transaction committed."""
+        states, opened, closed = staged
+        self._states.update(states)
+        metrics.INCIDENTS_OPENED.inc(opened)
+        metrics.INCIDENTS_CLOSED.inc(closed)
+
+    def _step(self, target_id: int, state: _State, check: _Check, closes: list, opens: list) -> _State:
+        down, recent = state
+        recent = (*recent, check)[-self.window :]
+        # While up, failures (is_up False) argue for a change; while down, successes do.
+        agreeing = [c for c in recent if c[1] == down]
+        if len(agreeing) < self.confirm:
+            return down, recent
+        since = agreeing[0]
+        if not down:
+            logger.warning("Target %s down since %s (%s): incident opened", target_id, since[0], since[2] or "")
+            opens.append((target_id, since[0], None, None, since[2]))
+            return True, ()
+        logger.info("Target %s back up since %s: incident closed", target_id, since[0])
+        if opens and opens[-1][0] == target_id and opens[-1][2] is None:
+            # Opened earlier in this batch: insert it closed.
+            _, started_at, _, _, error = opens[-1]
+            duration = max(int((since[0] - started_at).total_seconds()), 0)
+            opens[-1] = (target_id, started_at, since[0], duration, error)
+        else:
+            closes.append((target_id, since[0]))
+        return False, ()
+
+    @staticmethod
+    def _open_incidents(cur, target_ids: list[int]) -> set[int]:
+        cur.execute("SELECT target_id FROM incidents WHERE ended_at IS NULL AND target_id = ANY(%s)", (target_ids,))
+        return {row[0] for row in cur.fetchall()}
@@ -1,98 +1,123 @@
-"""Worker: periodic HTTP checks for all targets, results stored in checks table."""
+"""Worker: scheduled HTTP checks for all targets, results stored in checks table."""
 
+import asyncio
 import logging
+import signal
 import time
-from datetime import datetime, timezone
+from urllib.parse import urlparse
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
 
+import metrics
 from config import settings
-from checker import check_url
+from async_engine import run_scheduled_async
+from backoff import backoff_until, host_circuits
+from checker import Assertions, blocked_result, check_url
+from http_client import create_client
+from incidents import IncidentTracker
+from retention import PartitionMaintainer
+from scheduler import Schedule
+from sharding import Membership, default_worker_id
+from sink import ResultSink
 from ssrf import is_url_blocked
+from timing import PhaseTimer
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
 logger = logging.getLogger(__name__)
 
+# Pause before reconnecting after the DB connection or the scheduler loop fails.
+_RECONNECT_DELAY_SECONDS = 5
 
-def get_targets(conn) -> list[dict]:
-    """Return list of {id, url} for all targets."""
-    with conn.cursor(cursor_factory=RealDictCursor) as cur:
-        cur.execute("SELECT id, url FROM targets")
-        return cur.fetchall()
+
+def check_target(client, url: str, assertions: Assertions | None = None) -> dict:
+    """Perform one check (SSRF guard, then the host's circuit) and return its result."""
+    start = time.perf_counter()
+    skipped = None
+    timer = PhaseTimer()
+    with metrics.CHECKS_IN_FLIGHT.track_inprogress(), timer.measuring():
+        blocked, reason = is_url_blocked(url)
+        host = (urlparse(url).hostname or "").lower()
+        if blocked:
+            logger.info("%s blocked (SSRF): %s", url, reason)
+            skipped, result = "blocked", blocked_result(reason)
+        elif (error := host_circuits.fast_fail(host)) is not None:
+            skipped, result = "circuit_open", blocked_result(error)
+        else:
+            result = check_url(client, url, assertions, timer)
+            host_circuits.record(host, result)
+    metrics.observe_check(result, time.perf_counter() - start, skipped)
+    return result
 
 
-def insert_check(conn, target_id: int, checked_at: datetime, status_code: int | None, latency_ms: int | None, is_up: bool, error: str | None) -> None:
-    """Insert one row into checks."""
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            INSERT INTO checks (target_id, checked_at, status_code, latency_ms, is_up, error)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """,
-            (target_id, checked_at, status_code, latency_ms, is_up, error or None),
-        )
-    conn.commit()
+def run_scheduled(
+    conn, client, schedule: Schedule, sink: ResultSink, membership: Membership, partitions: PartitionMaintainer
+) -> None:
+    """Probe owned URLs one at a time as they come due; never returns unless the DB connection fails."""
+    while True:
+        now = time.monotonic()
+        if schedule.refresh_due(now):
+            with metrics.REFRESH_SECONDS.time():
+                targets = membership.owned_targets(conn)
+                schedule.sync(targets, now)
+                sink.incidents.retain({row["id"] for row in targets})
+                sink.log_stats()
+                partitions.run_if_due(conn)
+            metrics.SCHEDULED_TARGETS.set(len(schedule))
+            metrics.SCHEDULED_URLS.set(schedule.probe_count)
+            metrics.BACKED_OFF_TARGETS.set(schedule.backed_off)
+        for probe, due in schedule.pop_due(now):
+            schedule.lag.observe(time.monotonic() - due)
+            result = check_target(client, probe.url, probe.assertions)
+            until = backoff_until(schedule.record(probe.key, due, result["is_up"], time.monotonic()))
+            for row in schedule.fan_out(probe, due):
+                sink.add(row["id"], result, until)
+        sink.flush_if_due()
+        metrics.CYCLE_SECONDS.observe(time.monotonic() - now)
+        now = time.monotonic()
+        time.sleep(min(schedule.seconds_until_next(now), sink.seconds_until_flush(now)))
 
 
-def run_cycle(conn) -> None:
-    """Fetch all targets, perform check (with SSRF guard), record each result."""
-    targets = get_targets(conn)
-    if not targets:
-        logger.debug("No targets to check")
-        return
-    for row in targets:
-        target_id = row["id"]
-        url = row["url"]
-        blocked, reason = is_url_blocked(url)
-        if blocked:
-            insert_check(
-                conn,
-                target_id=target_id,
-                checked_at=datetime.now(timezone.utc),
-                status_code=None,
-                latency_ms=None,
-                is_up=False,
-                error=reason,
-            )
-            logger.info("Target %s blocked (SSRF): %s", target_id, reason)
-            continue
-        result = check_url(url)
-        insert_check(
-            conn,
-            target_id=target_id,
-            checked_at=result["checked_at"],
-            status_code=result["status_code"],
-            latency_ms=result["latency_ms"],
-            is_up=result["is_up"],
-            error=result["error"],
-        )
-        logger.info(
-            "Target %s: %s %s ms is_up=%s %s",
-            target_id,
-            result["status_code"],
-            result["latency_ms"],
-            result["is_up"],
-            result["error"] or "",
-        )
+def _handle_sigterm(signum, frame) -> None:
+    raise SystemExit(0)
 
 
 def main() -> None:
+    membership = Membership(settings.WORKER_ID or default_worker_id(), settings.WORKER_LEASE_SECONDS)
     logger.info(
-        "Worker starting (interval=%ss, timeout=%ss)",
+        "Worker %s starting (mode=%s, interval=%ss, timeout=%ss)",
+        membership.worker_id,
+        settings.WORKER_MODE,
         settings.CHECK_INTERVAL_SECONDS,
         settings.HTTP_TIMEOUT_SECONDS,
     )
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    schedule = Schedule(settings.CHECK_INTERVAL_SECONDS, settings.TARGET_REFRESH_SECONDS)
+    incidents = IncidentTracker(settings.INCIDENT_CONFIRM_FAILURES, settings.INCIDENT_CONFIRM_WINDOW)
+    sink = ResultSink(settings.RESULT_BATCH_SIZE, settings.RESULT_FLUSH_SECONDS, incidents=incidents)
+    partitions = PartitionMaintainer(settings.PARTITION_MAINTENANCE_SECONDS)
+    client = create_client() if settings.WORKER_MODE == "sync" else None
+    metrics.serve(settings.METRICS_PORT, sink)
     while True:
         try:
             conn = psycopg2.connect(settings.sync_database_url)
+            sink.attach(conn)
+            partitions.run_if_due(conn)
             try:
-                run_cycle(conn)
+                if settings.WORKER_MODE == "async":
+                    asyncio.run(run_scheduled_async(conn, schedule, sink, membership, partitions))
+                else:
+                    run_scheduled(conn, client, schedule, sink, membership, partitions)
+            except (KeyboardInterrupt, SystemExit):
+                logger.info("Shutting down; flushing %d buffered results", sink.pending)
+                sink.flush()
+                membership.leave(conn)
+                raise
             finally:
                 conn.close()
         except Exception as e:
-            logger.exception("Cycle failed: %s", e)
-        time.sleep(settings.CHECK_INTERVAL_SECONDS)
+            logger.exception("Worker loop failed: %s", e)
+        time.sleep(_RECONNECT_DELAY_SECONDS)
 
 
 if __name__ == "__main__":
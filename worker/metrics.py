@@ -0,0 +1,116 @@
+"""
+Prometheus metrics for the worker, served over HTTP on METRICS_PORT (0 disables the endpoint).
+
+Hot-path updates are single histogram observations or gauge increments (a lock and a few additions,
+around a microsecond) against checks that take milliseconds to seconds. DNS cache counters and the
+sink backlog are read when the endpoint is scraped, not recorded per check.
+"""
+
+import logging
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+
+from backoff import host_circuits
+from resolver import dns_cache
+
+logger = logging.getLogger(__name__)
+
+_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+CYCLE_SECONDS = Histogram(
+    "uptime_worker_cycle_seconds",
+    "Work done per scheduler wake-up (target refresh, due checks started or run, flush), excluding sleep",
+    buckets=_SECONDS_BUCKETS,
+)
+REFRESH_SECONDS = Histogram(
+    "uptime_worker_target_refresh_seconds",
+    "Heartbeat, target reload and partition maintenance at each TARGET_REFRESH_SECONDS",
+    buckets=_SECONDS_BUCKETS,
+)
+SCHEDULE_LAG_SECONDS = Histogram(
+    "uptime_worker_schedule_lag_seconds",
+    "How late each check started relative to its due time",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+CHECK_SECONDS = Histogram(
+    "uptime_worker_check_seconds",
+    "Wall time of one check including the SSRF guard's DNS lookup, by outcome (up, down, error, blocked, circuit_open)",
+    ["outcome"],
+    buckets=_SECONDS_BUCKETS,
+)
+CHECKS_IN_FLIGHT = Gauge("uptime_worker_checks_in_flight", "Checks currently running")
+SCHEDULED_TARGETS = Gauge("uptime_worker_scheduled_targets", "Targets owned by this worker at the last refresh")
+SCHEDULED_URLS = Gauge(
+    "uptime_worker_scheduled_urls", "Distinct normalized URLs probed for those targets (one probe serves every target on a URL)"
+)
+BACKED_OFF_TARGETS = Gauge(
+    "uptime_worker_backed_off_targets", "Owned targets checked less often because they keep failing (at the last refresh)"
+)
+DB_WRITE_SECONDS = Histogram(
+    "uptime_worker_db_write_seconds",
+    "Result sink flush: checks INSERT plus rollup, status and incident writes, one commit",
+    buckets=_SECONDS_BUCKETS,
+)
+DB_WRITE_ROWS = Counter("uptime_worker_result_rows_written", "Check results written to the database")
+DB_WRITE_FAILURES = Counter("uptime_worker_db_write_failures", "Result sink flushes that failed")
+RESULTS_DROPPED = Counter(
+    "uptime_worker_results_dropped",
+    "Check results never written: rejected by the database (rejected) or over the sink's buffer limit (overflow)",
+    ["reason"],
+)
+SSRF_BLOCKED = Counter("uptime_worker_ssrf_blocked", "Checks refused by the SSRF guard")
+INCIDENTS_OPENED = Counter("uptime_worker_incidents_opened", "Outages confirmed (INCIDENT_CONFIRM_FAILURES of the last window)")
+INCIDENTS_CLOSED = Counter("uptime_worker_incidents_closed", "Outages ended by a confirmed recovery")
+
+# Bound once: label lookup takes a lock and a dict probe on every call otherwise.
+_CHECK_OUTCOMES = {
+    outcome: CHECK_SECONDS.labels(outcome) for outcome in ("up", "down", "error", "blocked", "circuit_open")
+}
+
+
+def observe_check(result: dict, seconds: float, skipped: str | None = None) -> None:
+    """Record one finished check (a check_url-shaped result) under its outcome; `skipped` names why no request was made."""
+    if skipped is not None:
+        if skipped == "blocked":
+            SSRF_BLOCKED.inc()
+        outcome = skipped
+    elif result["is_up"]:
+        outcome = "up"
+    elif result["status_code"] is not None:
+        outcome = "down"
+    else:
+        outcome = "error"
+    _CHECK_OUTCOMES[outcome].observe(seconds)
+
+
+class _ScrapeCollector:
+    """DNS cache and host circuit counters and the sink backlog, read at scrape time."""
+
+    def __init__(self):
+        self.sink = None
+
+    def collect(self):
+        yield CounterMetricFamily("uptime_worker_dns_cache_hits", "Lookups answered from the DNS cache", value=dns_cache.hits)
+        yield CounterMetricFamily("uptime_worker_dns_cache_misses", "Lookups sent to a resolver", value=dns_cache.misses)
+        yield GaugeMetricFamily("uptime_worker_open_circuits", "Hosts whose checks are failing fast", value=host_circuits.open_count)
+        yield CounterMetricFamily(
+            "uptime_worker_circuit_fast_failures", "Checks failed without a request (circuit open)", value=host_circuits.fast_failures
+        )
+        if self.sink is not None:
+            yield GaugeMetricFamily(
+                "uptime_worker_results_pending", "Check results buffered and not yet written", value=self.sink.pending
+            )
+
+
+_collector = _ScrapeCollector()
+REGISTRY.register(_collector)
+
+
+def serve(port: int, sink) -> None:
+    """Start the metrics HTTP endpoint on a daemon thread (no-op when port is 0)."""
+    _collector.sink = sink
+    if not port:
+        return
+    start_http_server(port)
+    logger.info("Metrics on :%d/metrics", port)
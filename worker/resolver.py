@@ -0,0 +1,151 @@
+"""
+DNS cache shared by the SSRF guard and the HTTP transport.
+
+Answers are cached for their record TTL (clamped to DNS_MIN_TTL_SECONDS..DNS_MAX_TTL_SECONDS), failures
+for DNS_NEGATIVE_TTL_SECONDS, and the cache holds at most DNS_CACHE_SIZE hostnames (least recently used
+evicted first). Because the HTTP transport connects to addresses from this same cache, a check reaches
+an address the SSRF guard vetted instead of whatever a second lookup returns.
+
+Lookups go to the nameservers in resolv.conf (through dnspython, for the TTL), except for single-label
+names and names listed in /etc/hosts. Those go to the system resolver, which applies the hosts file and
+resolv.conf search domains as before. Other names are looked up as absolute names, without search domains.
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+import dns.exception
+import dns.resolver
+
+from config import settings
+from timing import record_dns
+
+
+class ResolutionError(Exception):
+    """Hostname could not be resolved (possibly a cached failure)."""
+
+
+class DnsCache:
+    def __init__(
+        self, max_size: int, min_ttl: float, max_ttl: float, negative_ttl: float, hosts_path: str = "/etc/hosts"
+    ):
+        self.max_size = max_size
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, list[str] | None, str | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hosts = _hosts_names(hosts_path)
+        try:
+            self._resolver = dns.resolver.Resolver()
+        except dns.resolver.NoResolverConfiguration:
+            self._resolver = None  # no resolv.conf: system resolver only (TTL unknown, min TTL applies)
+
+    def is_fresh(self, host: str) -> bool:
+        """True if resolve(host) will be answered from the cache (or host is an IP literal)."""
+        if _ip_literal(host):
+            return True
+        with self._lock:
+            entry = self._entries.get(host.lower())
+        return entry is not None and entry[0] > time.monotonic()
+
+    def resolve(self, host: str) -> list[str]:
+        """Return the host's addresses (IPv4 first), from cache when fresh; raise ResolutionError on failure."""
+        if _ip_literal(host):
+            return [host.strip("[]")]
+        host = host.lower()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(host)
+                self.hits += 1
+                expires, addresses, error = entry
+                if addresses is None:
+                    raise ResolutionError(error)
+                return addresses
+            self.misses += 1
+        started = time.perf_counter()
+        try:
+            addresses, ttl = self._lookup(host)
+        except ResolutionError as e:
+            record_dns(time.perf_counter() - started)
+            self._store(host, now + self.negative_ttl, None, str(e))
+            raise
+        record_dns(time.perf_counter() - started)
+        self._store(host, now + min(max(ttl, self.min_ttl), self.max_ttl), addresses, None)
+        return addresses
+
+    def _lookup(self, host: str) -> tuple[list[str], float]:
+        if self._resolver is None or "." not in host.rstrip(".") or host.rstrip(".") in self._hosts:
+            return _system_lookup(host), self.min_ttl
+        addresses: list[str] = []
+        ttls: list[float] = []
+        nxdomain = False
+        for rdtype in ("A", "AAAA"):
+            try:
+                answer = self._resolver.resolve(host, rdtype)
+            except dns.resolver.NXDOMAIN:
+                nxdomain = True
+                break
+            except dns.resolver.NoAnswer:
+                continue
+            except dns.exception.DNSException:
+                # No usable nameserver (or timeout): fall back to the system resolver, e.g. /etc/hosts.
+                return _system_lookup(host), self.min_ttl
+            ttls.append(answer.rrset.ttl)
+            addresses.extend(rr.address for rr in answer)
+        if nxdomain:
+            raise ResolutionError(f"{host}: name does not exist")
+        if not addresses:
+            raise ResolutionError(f"{host}: no A or AAAA records")
+        return addresses, min(ttls)
+
+    def _store(self, host: str, expires: float, addresses: list[str] | None, error: str | None) -> None:
+        with self._lock:
+            self._entries[host] = (expires, addresses, error)
+            self._entries.move_to_end(host)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+def _ip_literal(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return False
+    return True
+
+
+def _hosts_names(path: str) -> frozenset[str]:
+    """Hostnames and aliases listed in a hosts file (read once; empty if it cannot be read)."""
+    names: set[str] = set()
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                fields = line.split("#", 1)[0].split()
+                names.update(name.lower().rstrip(".") for name in fields[1:])
+    except OSError:
+        pass
+    return frozenset(names)
+
+
+def _system_lookup(host: str) -> list[str]:
+    try:
+        infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise ResolutionError(str(e)) from e
+    return list(dict.fromkeys(sockaddr[0] for (_, _, _, _, sockaddr) in infos))
+
+
+dns_cache = DnsCache(
+    max_size=settings.DNS_CACHE_SIZE,
+    min_ttl=settings.DNS_MIN_TTL_SECONDS,
+    max_ttl=settings.DNS_MAX_TTL_SECONDS,
+    negative_ttl=settings.DNS_NEGATIVE_TTL_SECONDS,
+)
@@ -0,0 +1,103 @@
+"""
+Partition maintenance for the day-partitioned checks table (see backend migration 006), and rollup expiry.
+
+Creates partitions CHECKS_PARTITION_PREMAKE_DAYS ahead so inserts never hit a missing day, and when
+CHECKS_RETENTION_DAYS is set drops whole day partitions older than that. Dropping a partition is a
+metadata operation, not a row-by-row DELETE.
+
+check_rollups is not partitioned: 1-minute rollups, about one row per check at a 60 s interval, are
+deleted after ROLLUP_MINUTE_RETENTION_DAYS and 1-hour rollups after ROLLUP_HOUR_RETENTION_DAYS, in
+batches of ROLLUP_EXPIRE_BATCH rows with a commit each. 1-day rollups (one row per target per day) are
+kept, so uptime over any older window is still available, at day resolution. Cutoffs are whole UTC days,
+matching what the API assumes is still there (backend/rollups.py).
+"""
+
+import logging
+import time
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rows per DELETE when expiring rollups, so no single statement holds locks or WAL for long.
+ROLLUP_EXPIRE_BATCH = 10_000
+
+
+class PartitionMaintainer:
+    def __init__(self, every_seconds: float):
+        self.every_seconds = every_seconds
+        self._next_run = 0.0
+
+    def run_if_due(self, conn) -> None:
+        now = time.monotonic()
+        if now < self._next_run:
+            return
+        self._next_run = now + self.every_seconds
+        maintain_partitions(conn)
+        expire_rollups(conn)
+
+
+def maintain_partitions(conn) -> None:
+    """Create upcoming day partitions and apply the retention policy (safe to run from every replica)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT ensure_checks_partitions(
+                (now() AT TIME ZONE 'UTC')::date - 1,
+                (now() AT TIME ZONE 'UTC')::date + %s
+            )
+            """,
+            (settings.CHECKS_PARTITION_PREMAKE_DAYS,),
+        )
+        created = cur.fetchone()[0]
+        dropped = 0
+        if settings.CHECKS_RETENTION_DAYS > 0:
+            cur.execute(
+                "SELECT drop_checks_partitions_before((now() AT TIME ZONE 'UTC')::date - %s)",
+                (settings.CHECKS_RETENTION_DAYS,),
+            )
+            dropped = cur.fetchone()[0]
+    conn.commit()
+    if created or dropped:
+        logger.info("Checks partitions: %d created, %d dropped (retention %s days)", created, dropped, settings.CHECKS_RETENTION_DAYS or "off")
+
+
+def ensure_partitions(conn, first_day, last_day) -> int:
+    """Create any missing checks partitions for the UTC days first_day..last_day; return how many were created."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT ensure_checks_partitions(%s, %s)", (first_day, last_day))
+        created = cur.fetchone()[0]
+    conn.commit()
+    if created:
+        logger.warning("Checks partitions: %d created for incoming results (maintenance had not run yet)", created)
+    return created
+
+
+def expire_rollups(conn) -> int:
+    """Delete 1-minute and 1-hour rollups older than their retention; return how many rows went."""
+    deleted = 0
+    for bucket_seconds, days in ((60, settings.ROLLUP_MINUTE_RETENTION_DAYS), (3600, settings.ROLLUP_HOUR_RETENTION_DAYS)):
+        if days <= 0:
+            continue
+        while True:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    DELETE FROM check_rollups
+                    WHERE ctid = ANY(ARRAY(
+                        SELECT ctid FROM check_rollups
+                        WHERE bucket_seconds = %s
+                          AND bucket_start < date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' - make_interval(days => %s)
+                        LIMIT %s
+                    ))
+                    """,
+                    (bucket_seconds, days, ROLLUP_EXPIRE_BATCH),
+                )
+                batch = cur.rowcount
+            conn.commit()
+            deleted += batch
+            if batch < ROLLUP_EXPIRE_BATCH:
+                break
+    if deleted:
+        logger.info("Rollups: %d expired rows deleted", deleted)
+    return deleted
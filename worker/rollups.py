@@ -0,0 +1,86 @@
+"""
+Incremental per-target rollups of check results at 1-minute, 1-hour and 1-day granularity.
+
+Each rollup row holds counts, up counts, min/max/sum latency and a latency sketch: a sparse log-bucket
+histogram {bucket index: count} where bucket i covers (GAMMA^(i-1), GAMMA^i] ms, so any quantile read
+back from it is within ~2% of the true value. Sketches merge by adding counts per index, which the
+merge_latency_sketch() SQL function does on upsert. The backend (backend/rollups.py) reads them with
+the same GAMMA.
+"""
+
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from psycopg2.extras import Json, execute_values
+
+GRANULARITIES = (60, 3600, 86400)
+GAMMA = 1.02 / 0.98
+_LOG_GAMMA = math.log(GAMMA)
+
+
+def sketch_index(latency_ms: int) -> int:
+    return math.ceil(math.log(latency_ms) / _LOG_GAMMA) if latency_ms > 0 else 0
+
+
+def _bucket_start(checked_at: datetime, seconds: int) -> datetime:
+    epoch = int(checked_at.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % seconds, tz=timezone.utc)
+
+
+def aggregate(rows: list[tuple]) -> list[tuple]:
+    """Fold check rows (target_id, checked_at, status_code, latency_ms, is_up, error, ...) into rollup rows."""
+    acc: dict[tuple, list] = {}
+    sketches: dict[tuple, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for target_id, checked_at, _, latency_ms, is_up, *_ in rows:
+        for seconds in GRANULARITIES:
+            key = (target_id, seconds, _bucket_start(checked_at, seconds))
+            a = acc.get(key)
+            if a is None:
+                # checks, up_checks, latency_count, latency_min, latency_max, latency_sum
+                a = acc[key] = [0, 0, 0, None, None, 0]
+            a[0] += 1
+            a[1] += 1 if is_up else 0
+            if latency_ms is not None:
+                a[2] += 1
+                a[3] = latency_ms if a[3] is None else min(a[3], latency_ms)
+                a[4] = latency_ms if a[4] is None else max(a[4], latency_ms)
+                a[5] += latency_ms
+                sketches[key][str(sketch_index(latency_ms))] += 1
+    return [(*key, *a, Json(sketches.get(key, {}))) for key, a in acc.items()]
+
+
+def upsert_rollups(cur, rows: list[tuple]) -> None:
+    """
+    Add a batch of check rows to their rollups (one multi-row upsert; runs in the caller's transaction).
+    Targets deleted since the last refresh are skipped.
+    """
+    rollups = aggregate(rows)
+    if not rollups:
+        return
+    execute_values(
+        cur,
+        """
+        INSERT INTO check_rollups (
+            target_id, bucket_seconds, bucket_start, checks, up_checks,
+            latency_count, latency_min, latency_max, latency_sum, latency_sketch
+        )
+        SELECT v.*
+        FROM (VALUES %s) AS v (
+            target_id, bucket_seconds, bucket_start, checks, up_checks,
+            latency_count, latency_min, latency_max, latency_sum, latency_sketch
+        )
+        JOIN targets t ON t.id = v.target_id
+        ON CONFLICT (target_id, bucket_seconds, bucket_start) DO UPDATE SET
+            checks = check_rollups.checks + EXCLUDED.checks,
+            up_checks = check_rollups.up_checks + EXCLUDED.up_checks,
+            latency_count = check_rollups.latency_count + EXCLUDED.latency_count,
+            latency_min = LEAST(check_rollups.latency_min, EXCLUDED.latency_min),
+            latency_max = GREATEST(check_rollups.latency_max, EXCLUDED.latency_max),
+            latency_sum = check_rollups.latency_sum + EXCLUDED.latency_sum,
+            latency_sketch = merge_latency_sketch(check_rollups.latency_sketch, EXCLUDED.latency_sketch)
+        """,
+        rollups,
+        template="(%s::int, %s::int, %s::timestamptz, %s::int, %s::int, %s::int, %s::int, %s::int, %s::bigint, %s::jsonb)",
+        page_size=len(rollups),
+    )
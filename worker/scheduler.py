@@ -0,0 +1,271 @@
+"""
+Check schedule: one probe per distinct request, kept in a min-heap keyed by its next due time
+(monotonic seconds).
+
+Targets of different users that make the same request (same scheme, host, port, path and query, and the
+same assertions, if any) share a probe, so the URL is fetched once per interval however many targets
+watch it, and the result is written as a check row for each of them. A URL with credentials in it is
+never shared: its probe serves only its own target.
+"""
+
+import heapq
+import logging
+import zlib
+from urllib.parse import urlsplit, urlunsplit
+
+import metrics
+from backoff import backoff_interval
+from checker import Assertions
+
+logger = logging.getLogger(__name__)
+
+
+def _phase(key: str) -> float:
+    """Stable fraction of the interval at which a probe fires, so probes do not all fire at once."""
+    return zlib.crc32(key.encode()) / 2**32
+
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def request_url(url: str) -> str | None:
+    """
+    The URL as the check requests it: scheme and host lowercased, default port and fragment dropped, path
+    and query as given. None if the URL carries credentials (or does not parse), so it must not be shared.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    if parts.username is not None or parts.password is not None:
+        return None
+    scheme = parts.scheme.lower()
+    host = parts.hostname or ""
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+class Probe:
+    """One distinct request (and set of assertions) and the owned targets that monitor it."""
+
+    __slots__ = ("key", "url", "interval", "assertions", "members")
+
+    def __init__(self, key: str, assertions: Assertions | None):
+        self.key = key
+        self.url = ""
+        self.interval = 0.0
+        self.assertions = assertions
+        self.members: list[dict] = []
+
+
+def group_by_url(rows: list[dict], default_interval: float) -> dict[str, Probe]:
+    """
+    Group target rows by request_url() and assertions. A shared probe fetches that canonical URL, never one
+    owner's raw URL; a URL with credentials gets a probe of its own. Each probe runs at the shortest
+    interval among its targets.
+    """
+    probes: dict[str, Probe] = {}
+    for row in rows:
+        assertions = Assertions.from_row(row)
+        url = request_url(row["url"])
+        key = url if url is not None else f"{row['url']}\x00target:{row['id']}"
+        if assertions is not None:
+            key = f"{key}\x00{assertions.key}"
+        probe = probes.get(key)
+        if probe is None:
+            probe = probes[key] = Probe(key, assertions)
+            probe.url = url if url is not None else row["url"]
+        probe.members.append(row)
+    for probe in probes.values():
+        probe.members.sort(key=lambda r: r["id"])
+        probe.interval = min(r.get("check_interval_seconds") or default_interval for r in probe.members)
+    return probes
+
+
+class LagTracker:
+    """Running count / mean / max of schedule lag (how late a check started vs. when it was due)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, lag: float) -> None:
+        lag = max(lag, 0.0)
+        metrics.SCHEDULE_LAG_SECONDS.observe(lag)
+        self.count += 1
+        self.total += lag
+        if lag > self.max:
+            self.max = lag
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Schedule:
+    """
+    Probes keyed by next due time. Each probe runs at the shortest interval of its targets; its first
+    run is offset by a stable phase within that interval and later runs are anchored to the previous
+    due time, so the period does not drift by however long the checks took. A URL that keeps failing
+    is spaced out by backoff_interval() until it succeeds again (see record()). Each target still gets
+    a check row about once per its own interval (see fan_out()).
+    """
+
+    def __init__(self, default_interval: float, refresh_interval: float):
+        self.default_interval = default_interval
+        self.refresh_interval = refresh_interval
+        self.lag = LagTracker()
+        self._targets: dict[int, dict] = {}
+        self._probes: dict[str, Probe] = {}
+        self._due: dict[str, float] = {}
+        # Consecutive failed probes, only for URLs whose last probe failed.
+        self._failures: dict[str, int] = {}
+        # Earliest due time of the probe whose result is next written for a target that shares its probe.
+        self._next_row: dict[int, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._next_refresh = 0.0
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    @property
+    def probe_count(self) -> int:
+        return len(self._probes)
+
+    def interval_for(self, row: dict) -> float:
+        return row.get("check_interval_seconds") or self.default_interval
+
+    def effective_interval(self, key: str) -> float:
+        """The probe's interval, stretched by backoff if its URL is failing."""
+        return backoff_interval(self._probes[key].interval, self._failures.get(key, 0))
+
+    @property
+    def backed_off(self) -> int:
+        """Targets currently checked less often than their interval."""
+        return sum(
+            len(self._probes[key].members)
+            for key in self._failures
+            if self.effective_interval(key) != self._probes[key].interval
+        )
+
+    def refresh_due(self, now: float) -> bool:
+        return now >= self._next_refresh
+
+    def sync(self, rows: list[dict], now: float) -> None:
+        """Replace the target set with rows from the DB: add new targets, update changed ones, drop deleted ones."""
+        probes = group_by_url(rows, self.default_interval)
+        for key, probe in probes.items():
+            due = self._due.get(key)
+            self._probes[key] = probe
+            if due is None:
+                # Newly owned (startup or reshard): carry on the backoff recorded in target_status.
+                failures = min(row.get("consecutive_failures") or 0 for row in probe.members)
+                if failures:
+                    self._failures[key] = failures
+            interval = self.effective_interval(key)
+            if due is None or due > now + interval:
+                # New URL, or its interval was shortened below the wait for its next slot.
+                self._push(key, now + _phase(key) * interval)
+        for key in list(self._probes):
+            if key not in probes:
+                del self._probes[key]
+                del self._due[key]
+                self._failures.pop(key, None)
+        self._targets = {row["id"]: row for row in rows}
+        for target_id in list(self._next_row):
+            if target_id not in self._targets:
+                del self._next_row[target_id]
+        self._next_refresh = now + self.refresh_interval
+        if self.lag.count:
+            logger.info(
+                "Schedule: %d targets on %d URLs, %d probes since last refresh, lag mean=%.2fs max=%.2fs",
+                len(self._targets),
+                len(self._probes),
+                self.lag.count,
+                self.lag.mean,
+                self.lag.max,
+            )
+        self.lag.reset()
+
+    def pop_due(self, now: float) -> list[tuple[Probe, float]]:
+        """Return (probe, due time) for every probe due at `now` and queue each one's next run."""
+        out = []
+        while self._heap and self._heap[0][0] <= now:
+            due, key = heapq.heappop(self._heap)
+            if self._due.get(key) != due:
+                continue  # stale entry for a deleted or rescheduled URL
+            out.append((self._probes[key], due))
+            interval = self.effective_interval(key)
+            next_due = due + interval
+            if next_due <= now:
+                # Fell more than a full interval behind: skip the missed slots but keep the phase.
+                next_due += interval * int((now - next_due) // interval + 1)
+            self._push(key, next_due)
+        return out
+
+    def fan_out(self, probe: Probe, due: float) -> list[dict]:
+        """
+        The probe's targets that get a check row from its run at `due`. A target whose interval is longer
+        than the probe's gets a row from the run nearest to each of its own slots, not from every run.
+        Targets deleted or handed to another worker since the probe was popped are left out.
+        """
+        if len(probe.members) == 1:
+            row = probe.members[0]
+            return [row] if row["id"] in self._targets else []
+        slack = probe.interval / 2
+        out = []
+        for row in probe.members:
+            target_id = row["id"]
+            if target_id in self._targets and self._next_row.get(target_id, 0.0) <= due + slack:
+                out.append(row)
+                self._next_row[target_id] = due + self.interval_for(row)
+        return out
+
+    def record(self, key: str, due: float, is_up: bool, now: float) -> float | None:
+        """
+        Count a finished probe that was due at `due` and move its next run if its backoff changed:
+        later after another failure, back to the normal interval after a success. Returns the
+        (monotonic) time of the next run while the URL is backed off, else None.
+        """
+        before = self._failures.get(key, 0)
+        if is_up:
+            if not before:
+                return None
+            del self._failures[key]
+        else:
+            self._failures[key] = before + 1
+        probe = self._probes.get(key)
+        if probe is None:
+            return None  # deleted or handed to another worker meanwhile
+        interval = self.effective_interval(key)
+        if interval != backoff_interval(probe.interval, before):
+            next_due = max(due + interval, now)
+            if is_up:
+                logger.info("%s recovered after %d failed checks; back to every %ss", probe.url, before, interval)
+            else:
+                logger.info("%s failed %d checks in a row; next check in %.0fs", probe.url, before + 1, next_due - now)
+            self._push(key, next_due)
+        if interval == probe.interval:
+            return None
+        return self._due[key]
+
+    def seconds_until_next(self, now: float) -> float:
+        """How long the caller can sleep before the next probe or target refresh is due."""
+        wake = self._next_refresh
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if self._heap:
+            wake = min(wake, self._heap[0][0])
+        return max(wake - now, 0.0)
+
+    def _push(self, key: str, due: float) -> None:
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, key))
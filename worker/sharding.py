@@ -0,0 +1,89 @@
+"""
+Horizontal scaling: each live worker owns a share of URLs, and so of targets, via rendezvous (highest-random-weight)
+hashing on the URL as the check requests it (scheduler.request_url), so all targets that share a probe land on
+the same worker. URLs with credentials, which never share a probe, are hashed on their normalized_url.
+
+Workers heartbeat into worker_heartbeats on every target refresh; a worker that misses heartbeats for
+WORKER_LEASE_SECONDS is reaped by its peers. When membership changes, only the URLs whose top-scoring
+worker changed move, and every worker picks up the new layout on its next refresh.
+"""
+
+import hashlib
+import logging
+import os
+import socket
+
+from psycopg2.extras import RealDictCursor
+
+from db import get_targets
+from scheduler import request_url
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _score(worker_id: str, key) -> int:
+    digest = hashlib.blake2b(f"{worker_id}:{key}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def shard_key(row: dict) -> str:
+    """What a target is sharded on: the same URL scheduler.group_by_url groups probes by."""
+    return request_url(row["url"]) or row["normalized_url"]
+
+
+def owner_of(key, workers: list[str]) -> str:
+    """The worker with the highest hash score for `key`; stable as long as that worker stays alive."""
+    return max(workers, key=lambda w: _score(w, key))
+
+
+class Membership:
+    """This worker's heartbeat lease and view of the live worker set."""
+
+    def __init__(self, worker_id: str, lease_seconds: float):
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.workers: list[str] = [worker_id]
+
+    def heartbeat(self, conn) -> list[str]:
+        """Renew our lease, reap expired peers, and return the sorted live worker ids (uses the DB clock)."""
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                INSERT INTO worker_heartbeats (worker_id, hostname, started_at, last_seen_at)
+                VALUES (%s, %s, now(), now())
+                ON CONFLICT (worker_id) DO UPDATE SET last_seen_at = now()
+                """,
+                (self.worker_id, socket.gethostname()),
+            )
+            cur.execute(
+                "DELETE FROM worker_heartbeats WHERE last_seen_at < now() - make_interval(secs => %s)",
+                (self.lease_seconds,),
+            )
+            cur.execute("SELECT worker_id FROM worker_heartbeats ORDER BY worker_id")
+            workers = [row["worker_id"] for row in cur.fetchall()]
+        conn.commit()
+        if workers != self.workers:
+            logger.info("Worker membership changed: %d live (%s)", len(workers), ", ".join(workers))
+            self.workers = workers
+        return workers
+
+    def owned_targets(self, conn) -> list[dict]:
+        """Heartbeat, then return the targets this worker owns under the current membership."""
+        workers = self.heartbeat(conn)
+        targets = get_targets(conn)
+        if len(workers) == 1:
+            return targets
+        # Keyed on the request URL, not the target, so every target sharing a probe lands on the same worker.
+        owned = [row for row in targets if owner_of(shard_key(row), workers) == self.worker_id]
+        logger.debug("Owning %d of %d targets across %d workers", len(owned), len(targets), len(workers))
+        return owned
+
+    def leave(self, conn) -> None:
+        """Drop our lease on clean shutdown so peers take over our targets on their next refresh."""
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM worker_heartbeats WHERE worker_id = %s", (self.worker_id,))
+        conn.commit()
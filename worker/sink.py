@@ -0,0 +1,276 @@
+"""Buffered check-result writer: many rows per INSERT and one commit per batch instead of per result.
+
+Each batch also updates the per-target rollups, latest status and incidents in the same transaction, so
+none of them ever disagrees with the checks it summarizes.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+import psycopg2
+import psycopg2.errors
+
+import metrics
+from db import insert_checks
+from incidents import IncidentTracker
+from retention import ensure_partitions
+from rollups import upsert_rollups
+from status import upsert_status
+
+logger = logging.getLogger(__name__)
+
+
+class SinkStats:
+    """Flush counters since the last report; read by ResultSink.log_stats."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.batches = 0
+        self.rows = 0
+        self.max_batch = 0
+        self.flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    def observe(self, batch_size: int, seconds: float) -> None:
+        self.batches += 1
+        self.rows += batch_size
+        self.max_batch = max(self.max_batch, batch_size)
+        self.flush_seconds += seconds
+        self.max_flush_seconds = max(self.max_flush_seconds, seconds)
+
+
+class ResultSink:
+    """
+    Collect check results and write them when `batch_size` rows are buffered or the oldest buffered row
+    is `flush_seconds` old, whichever comes first. Rows of targets deleted meanwhile are skipped by the
+    statements themselves. A batch that hits a day with no checks partition yet gets the partitions
+    created and is retried. If the database still rejects it (IntegrityError, DataError), it is written
+    again one row at a time and the rows that still fail are dropped, so one bad row cannot hold up the rest. On
+    any other error the rows stay buffered (up to `max_buffered`, oldest dropped first) and the error
+    propagates so the worker can reconnect.
+
+    A flush takes the buffer before writing it, so results can keep being buffered while flush_async()
+    writes from a worker thread. Only one flush may run at a time.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_seconds: float,
+        max_buffered: int | None = None,
+        incidents: IncidentTracker | None = None,
+    ):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_buffered = max_buffered or batch_size * 10
+        self.stats = SinkStats()
+        self.incidents = incidents if incidents is not None else IncidentTracker(0, 0)
+        self._conn = None
+        self._rows: list[tuple] = []
+        self._oldest: float | None = None
+        # Latest backoff_until per buffered target (None when it is on its normal schedule).
+        self._backoff: dict[int, datetime | None] = {}
+        # Rows taken by a flush that is still writing them.
+        self._writing = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows) + self._writing
+
+    @property
+    def full(self) -> bool:
+        return len(self._rows) >= self.batch_size
+
+    def attach(self, conn) -> None:
+        """Write through `conn` from now on (called again after every reconnect)."""
+        self._conn = conn
+
+    def add(self, target_id: int, result: dict, backoff_until: datetime | None = None) -> None:
+        """Buffer a result (see buffer()) and flush if the batch is full or overdue."""
+        self.buffer(target_id, result, backoff_until)
+        if self.full:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def buffer(self, target_id: int, result: dict, backoff_until: datetime | None = None) -> None:
+        """
+        Buffer a check_url-shaped result for target_id, with the time of its next check if the target is
+        backed off. Never writes; the caller flushes when flush_due().
+        """
+        self._rows.append(
+            (
+                target_id,
+                result["checked_at"],
+                result["status_code"],
+                result["latency_ms"],
+                result["is_up"],
+                result["error"] or None,
+                result["ttfb_ms"],
+                result["dns_ms"],
+                result["connect_ms"],
+                result["tls_ms"],
+                result["transfer_ms"],
+            )
+        )
+        self._backoff[target_id] = backoff_until
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        logger.info(
+            "Target %s: %s %s ms is_up=%s %s",
+            target_id,
+            result["status_code"],
+            result["latency_ms"],
+            result["is_up"],
+            result["error"] or "",
+        )
+
+    def seconds_until_flush(self, now: float) -> float:
+        """How long until the time threshold forces a flush (flush_seconds when nothing is buffered)."""
+        if self._oldest is None:
+            return self.flush_seconds
+        return max(self._oldest + self.flush_seconds - now, 0.0)
+
+    def flush_due(self, now: float) -> bool:
+        return bool(self._rows) and (self.full or self.seconds_until_flush(now) == 0.0)
+
+    def flush_if_due(self) -> None:
+        if self.flush_due(time.monotonic()):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write every buffered row: one multi-row INSERT (plus rollup and status upserts) per batch_size rows,
+        then any incident changes, one commit.
+        """
+        batch = self._take()
+        if batch is None:
+            return
+        try:
+            self._write_batch(*batch)
+        except Exception:
+            self._put_back(*batch)
+            raise
+
+    async def flush_async(self) -> None:
+        """flush() with the database work in a worker thread, so the event loop keeps running checks meanwhile."""
+        batch = self._take()
+        if batch is None:
+            return
+        try:
+            await asyncio.to_thread(self._write_batch, *batch)
+        except Exception:
+            self._put_back(*batch)
+            raise
+
+    def log_stats(self) -> None:
+        """Log flush counters since the last call, then reset them."""
+        s = self.stats
+        if s.batches:
+            logger.info(
+                "Result sink: %d rows in %d batches (max %d), flush mean=%.1fms max=%.1fms",
+                s.rows,
+                s.batches,
+                s.max_batch,
+                s.flush_seconds / s.batches * 1000,
+                s.max_flush_seconds * 1000,
+            )
+        s.reset()
+
+    def _take(self) -> tuple[list[tuple], dict[int, datetime | None]] | None:
+        """Detach the buffered rows (and their backoff) for writing; None if there are none."""
+        if not self._rows:
+            return None
+        batch = self._rows, self._backoff
+        self._rows, self._backoff, self._oldest = [], {}, None
+        self._writing = len(batch[0])
+        return batch
+
+    def _put_back(self, rows: list[tuple], backoff: dict[int, datetime | None]) -> None:
+        """Return rows whose write failed to the front of the buffer, dropping the oldest over max_buffered."""
+        self._writing = 0
+        self._rows = rows + self._rows
+        self._backoff = {**backoff, **self._backoff}
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        overflow = len(self._rows) - self.max_buffered
+        if overflow > 0:
+            logger.warning("Result sink over capacity; dropping %d oldest results", overflow)
+            metrics.RESULTS_DROPPED.labels("overflow").inc(overflow)
+            del self._rows[:overflow]
+
+    def _write_batch(self, rows: list[tuple], backoff: dict[int, datetime | None]) -> None:
+        start = time.perf_counter()
+        try:
+            try:
+                staged = self._write_all(rows, backoff)
+            except psycopg2.errors.CheckViolation:
+                # Also what a row for a day with no checks partition raises (e.g. just past midnight, before
+                # maintenance ran). That is not the rows' fault: create the batch's days and retry once.
+                self._conn.rollback()
+                days = [row[1].astimezone(timezone.utc).date() for row in rows]
+                ensure_partitions(self._conn, min(days), max(days))
+                staged = self._write_all(rows, backoff)
+        except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+            metrics.DB_WRITE_FAILURES.inc()
+            try:
+                self._conn.rollback()
+                logger.warning("Batch of %d check rows rejected (%s); writing them one at a time", len(rows), str(e).strip())
+                rows, staged = self._write_each(rows, backoff)
+            except Exception:
+                self._rollback_quietly()
+                raise
+        except Exception:
+            metrics.DB_WRITE_FAILURES.inc()
+            self._rollback_quietly()
+            raise
+        self.incidents.commit(staged)
+        self._writing = 0
+        elapsed = time.perf_counter() - start
+        self.stats.observe(len(rows), elapsed)
+        metrics.DB_WRITE_SECONDS.observe(elapsed)
+        metrics.DB_WRITE_ROWS.inc(len(rows))
+        logger.debug("Flushed %d check rows in %.1f ms", len(rows), elapsed * 1000)
+
+    def _write_all(self, rows: list[tuple], backoff: dict[int, datetime | None]) -> tuple:
+        """Write rows batch_size at a time plus their incidents in one transaction; return the staged incidents."""
+        with self._conn.cursor() as cur:
+            for i in range(0, len(rows), self.batch_size):
+                self._write(cur, rows[i : i + self.batch_size], backoff)
+            staged = self.incidents.write(cur, rows)
+        self._conn.commit()
+        return staged
+
+    def _rollback_quietly(self) -> None:
+        try:
+            self._conn.rollback()
+        except Exception:
+            pass  # connection is gone; the worker reconnects
+
+    def _write(self, cur, rows: list[tuple], backoff: dict[int, datetime | None]) -> None:
+        insert_checks(cur, rows)
+        upsert_rollups(cur, rows)
+        upsert_status(cur, rows, backoff)
+
+    def _write_each(self, rows: list[tuple], backoff: dict[int, datetime | None]) -> tuple[list[tuple], tuple]:
+        """Write rows one at a time under a savepoint each and drop the ones the database rejects; one commit."""
+        written = []
+        with self._conn.cursor() as cur:
+            for row in rows:
+                cur.execute("SAVEPOINT check_row")
+                try:
+                    self._write(cur, [row], backoff)
+                except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT check_row")
+                    metrics.RESULTS_DROPPED.labels("rejected").inc()
+                    logger.warning("Dropping check result for target %s: %s", row[0], str(e).strip())
+                    continue
+                cur.execute("RELEASE SAVEPOINT check_row")
+                written.append(row)
+            staged = self.incidents.write(cur, written)
+        self._conn.commit()
+        return written, staged
@@ -1,39 +1,142 @@
-"""SSRF protection: block localhost and private/link-local IP ranges."""
+"""SSRF protection: block localhost and private, link-local, reserved and metadata IP ranges (IPv4 and IPv6)."""
 
 import ipaddress
 import socket
+from bisect import bisect_right
 from urllib.parse import urlparse
 
+from config import settings
+from resolver import ResolutionError, dns_cache
 
-# Blocked ranges per SPEC: localhost, 127.0.0.1, 10/8, 172.16/12, 192.168/16, 169.254/16
-_BLOCKED_NETS = [
-    ipaddress.ip_network("127.0.0.0/8"),      # loopback
-    ipaddress.ip_network("10.0.0.0/8"),       # private
-    ipaddress.ip_network("172.16.0.0/12"),    # private
-    ipaddress.ip_network("192.168.0.0/16"),   # private
-    ipaddress.ip_network("169.254.0.0/16"),   # link-local
+
+# Blocked ranges per SPEC (loopback, private, link-local) plus the other non-public special-purpose ranges.
+_DEFAULT_BLOCKED = [
+    # IPv4
+    "0.0.0.0/8",            # "this network"
+    "10.0.0.0/8",           # private
+    "100.64.0.0/10",        # carrier-grade NAT (also Alibaba metadata 100.100.100.200)
+    "127.0.0.0/8",          # loopback
+    "169.254.0.0/16",       # link-local (AWS/GCP/Azure metadata 169.254.169.254)
+    "172.16.0.0/12",        # private
+    "192.0.0.0/24",         # IETF protocol assignments
+    "192.0.2.0/24",         # TEST-NET-1
+    "192.88.99.0/24",       # 6to4 relay anycast
+    "192.168.0.0/16",       # private
+    "198.18.0.0/15",        # benchmarking
+    "198.51.100.0/24",      # TEST-NET-2
+    "203.0.113.0/24",       # TEST-NET-3
+    "168.63.129.16/32",     # Azure wire server / metadata
+    "224.0.0.0/4",          # multicast
+    "240.0.0.0/4",          # reserved, incl. broadcast 255.255.255.255
+    # IPv6 (IPv4-mapped, 6to4 and NAT64 addresses are checked by their embedded IPv4 address instead)
+    "::/96",                # unspecified and deprecated IPv4-compatible
+    "::1/128",              # loopback
+    "64:ff9b:1::/48",       # local-use NAT64
+    "100::/64",             # discard-only
+    "2001::/23",            # IETF protocol assignments (Teredo, ORCHID, ...)
+    "2001:db8::/32",        # documentation
+    "fc00::/7",             # unique local (incl. AWS metadata fd00:ec2::254)
+    "fe80::/10",            # link-local
+    "fec0::/10",            # site-local (deprecated)
+    "ff00::/8",             # multicast
 ]
 _BLOCKED_HOSTNAMES = frozenset(("localhost", "localhost."))
+_IPV4_MASK = 0xFFFFFFFF
+_IPV4_MAPPED_HIGH = 0xFFFF                      # ::ffff:0:0/96, upper 96 bits
+_NAT64_HIGH = 0x0064FF9B << 64                  # 64:ff9b::/96, upper 96 bits
+_SIXTOFOUR_HIGH = 0x2002                        # 2002::/16, upper 16 bits
+
+
+class RangeMatcher:
+    """
+    Blocklist minus allowlist compiled into sorted, disjoint [start, end] integer intervals per address
+    family; a lookup is one binary search instead of a scan over every network.
+    """
+
+    def __init__(self, blocked: list[str], allowed: list[str] = ()):
+        self._starts: dict[int, list[int]] = {}
+        self._ends: dict[int, list[int]] = {}
+        for version in (4, 6):
+            block = _merge(_intervals(blocked, version))
+            allow = _merge(_intervals(allowed, version))
+            final = _subtract(block, allow)
+            self._starts[version] = [start for start, _ in final]
+            self._ends[version] = [end for _, end in final]
+
+    def contains(self, version: int, value: int) -> bool:
+        i = bisect_right(self._starts[version], value) - 1
+        return i >= 0 and value <= self._ends[version][i]
+
+
+def _intervals(cidrs, version: int) -> list[tuple[int, int]]:
+    out = []
+    for cidr in cidrs:
+        net = ipaddress.ip_network(cidr, strict=False)
+        if net.version == version:
+            out.append((int(net.network_address), int(net.broadcast_address)))
+    return out
 
 
-def _is_blocked_ip(ip_str: str) -> bool:
+def _merge(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[list[int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def _subtract(block: list[tuple[int, int]], allow: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    out = []
+    for start, end in block:
+        for a_start, a_end in allow:
+            if a_end < start or a_start > end:
+                continue
+            if a_start > start:
+                out.append((start, a_start - 1))
+            start = a_end + 1
+            if start > end:
+                break
+        if start <= end:
+            out.append((start, end))
+    return out
+
+
+def _cidr_list(value: str) -> list[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+_matcher = RangeMatcher(
+    _DEFAULT_BLOCKED + _cidr_list(settings.SSRF_EXTRA_BLOCKED_CIDRS),
+    _cidr_list(settings.SSRF_ALLOWED_CIDRS),
+)
+
+
+def is_blocked_ip(ip_str: str) -> bool:
+    # inet_pton + int arithmetic: parsing with ipaddress.ip_address would cost more than the lookup.
+    try:
+        value = int.from_bytes(socket.inet_pton(socket.AF_INET, ip_str), "big")
+        return _matcher.contains(4, value)
+    except OSError:
+        pass
     try:
-        ip = ipaddress.ip_address(ip_str)
-    except ValueError:
+        value = int.from_bytes(socket.inet_pton(socket.AF_INET6, ip_str.split("%", 1)[0]), "big")
+    except OSError:
         return True
-    if ip.version == 4:
-        for net in _BLOCKED_NETS:
-            if ip in net:
-                return True
-        return False
-    # IPv6: block ::1
-    return ip.is_loopback
+    # Judge IPv6 addresses that embed an IPv4 address (mapped, NAT64, 6to4) by the IPv4 address they reach.
+    high = value >> 32
+    if high == _IPV4_MAPPED_HIGH or high == _NAT64_HIGH:
+        return _matcher.contains(4, value & _IPV4_MASK)
+    if value >> 112 == _SIXTOFOUR_HIGH:
+        return _matcher.contains(4, (value >> 80) & _IPV4_MASK)
+    return _matcher.contains(6, value)
 
 
 def is_url_blocked(url: str) -> tuple[bool, str | None]:
     """
     Return (True, reason) if the URL should be blocked for SSRF; else (False, None).
-    Resolves hostname to IP(s) and blocks if any resolve to blocked ranges.
+    Resolves hostname to IP(s) through the shared DNS cache and blocks if any resolve to blocked ranges.
     """
     try:
         parsed = urlparse(url)
@@ -42,14 +145,14 @@ def is_url_blocked(url: str) -> tuple[bool, str | None]:
     host = (parsed.hostname or "").strip().lower()
     if not host:
         return True, "Missing hostname"
-    if host in _BLOCKED_HOSTNAMES:
+    if host in _BLOCKED_HOSTNAMES or host.rstrip(".").endswith(".localhost"):
         return True, "localhost is not allowed"
     # Resolve hostname to IP(s)
     try:
-        for (_, _, _, _, sockaddr) in socket.getaddrinfo(host, None):
-            ip_str = sockaddr[0]
-            if _is_blocked_ip(ip_str):
-                return True, f"Resolved to blocked IP: {ip_str}"
-    except socket.gaierror as e:
+        addresses = dns_cache.resolve(host)
+    except ResolutionError as e:
         return True, f"Resolution failed: {e}"
+    for ip_str in addresses:
+        if is_blocked_ip(ip_str):
+            return True, f"Resolved to blocked IP: {ip_str}"
     return False, None
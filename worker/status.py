@@ -0,0 +1,136 @@
+"""
+Latest-status upsert: keeps one target_status row per target current with each batch of checks.
+
+The API's /targets/status reads this table instead of searching checks for each target's newest row,
+so its cost does not grow with check history. The same statement sends one NOTIFY per updated target
+on RESULT_NOTIFY_CHANNEL (delivered on commit), which the API fans out to live dashboards.
+"""
+
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+
+from config import settings
+
+# Errors are cut to this many characters in notifications (NOTIFY payloads are capped at 8000 bytes).
+_NOTIFY_ERROR_CHARS = 1000
+
+
+def latest(rows: list[tuple]) -> list[tuple]:
+    """
+    Reduce a batch of check rows to one row per target: its newest check plus the start and length of
+    the trailing run of equal is_up values, and whether that run spans the whole batch (the state may
+    have started in an earlier batch).
+    """
+    by_target: dict[int, list[tuple]] = {}
+    for row in rows:
+        by_target.setdefault(row[0], []).append(row)
+    out = []
+    for target_rows in by_target.values():
+        target_rows.sort(key=lambda r: r[1])
+        newest = target_rows[-1]
+        run_start = len(target_rows) - 1
+        while run_start > 0 and target_rows[run_start - 1][4] == newest[4]:
+            run_start -= 1
+        out.append((*newest[:6], target_rows[run_start][1], len(target_rows) - run_start, run_start == 0))
+    return out
+
+
+# Payload is "<user_id>|<json>" so the API can route it without parsing the JSON.
+_NOTIFY = """
+SELECT count(pg_notify(
+    %(channel)s,
+    t.user_id || '|' || json_build_object(
+        'target_id', up.target_id,
+        'checked_at', up.checked_at,
+        'is_up', up.is_up,
+        'status_code', up.status_code,
+        'latency_ms', up.latency_ms,
+        'error', left(up.error, %(error_chars)s),
+        'state_since', up.state_since,
+        'consecutive_failures', up.consecutive_failures,
+        'backoff_until', up.backoff_until,
+        'state_changed', old.is_up IS DISTINCT FROM up.is_up OR NOT v.whole_batch
+    )::text
+))
+FROM up
+JOIN v ON v.target_id = up.target_id
+JOIN targets t ON t.id = up.target_id
+LEFT JOIN old ON old.target_id = up.target_id
+"""
+
+
+def upsert_status(cur, rows: list[tuple], backoff: dict[int, datetime | None] | None = None) -> None:
+    """
+    Fold a batch of check rows into target_status (one statement; runs in the caller's transaction).
+    `backoff` maps target ids to when a backed-off target is next checked (missing or None: not backed off).
+    Targets deleted since the last refresh are skipped.
+    """
+    backoff = backoff or {}
+    values = [(*row, backoff.get(row[0])) for row in latest(rows)]
+    if not values:
+        return
+    channel = settings.RESULT_NOTIFY_CHANNEL
+    if channel:
+        # Bind the channel now; execute_values only fills the VALUES placeholder, so escape any % left.
+        tail = cur.mogrify(_NOTIFY, {"channel": channel, "error_chars": _NOTIFY_ERROR_CHARS}).decode().replace("%", "%%")
+    else:
+        tail = "SELECT count(*) FROM up"
+    # All CTEs see the table as it was before the upsert, so `old` holds the previous state.
+    sql = (
+        """
+        WITH v (
+            target_id, checked_at, status_code, latency_ms, is_up, error, run_start, run_length, whole_batch,
+            backoff_until
+        ) AS (
+            VALUES %s
+        ),
+        old AS (
+            SELECT s.target_id, s.is_up, s.state_since, s.consecutive_failures
+            FROM target_status s JOIN v ON v.target_id = s.target_id
+        ),
+        up AS (
+            INSERT INTO target_status (
+                target_id, checked_at, status_code, latency_ms, is_up, error, state_since, consecutive_failures,
+                backoff_until
+            )
+            SELECT
+                v.target_id, v.checked_at, v.status_code, v.latency_ms, v.is_up, v.error,
+                CASE WHEN v.whole_batch AND old.is_up = v.is_up THEN old.state_since ELSE v.run_start END,
+                CASE
+                    WHEN v.is_up THEN 0
+                    WHEN v.whole_batch AND old.is_up = v.is_up THEN old.consecutive_failures + v.run_length
+                    ELSE v.run_length
+                END,
+                v.backoff_until
+            FROM v
+            JOIN targets t ON t.id = v.target_id
+            LEFT JOIN old ON old.target_id = v.target_id
+            ON CONFLICT (target_id) DO UPDATE SET
+                checked_at = EXCLUDED.checked_at,
+                status_code = EXCLUDED.status_code,
+                latency_ms = EXCLUDED.latency_ms,
+                is_up = EXCLUDED.is_up,
+                error = EXCLUDED.error,
+                state_since = EXCLUDED.state_since,
+                consecutive_failures = EXCLUDED.consecutive_failures,
+                backoff_until = EXCLUDED.backoff_until,
+                updated_at = now()
+            WHERE target_status.checked_at <= EXCLUDED.checked_at
+            RETURNING
+                target_id, checked_at, status_code, latency_ms, is_up, error, state_since, consecutive_failures,
+                backoff_until
+        )
+        """
+        + tail
+    )
+    execute_values(
+        cur,
+        sql,
+        values,
+        template=(
+            "(%s::int, %s::timestamptz, %s::int, %s::int, %s::boolean, %s::text, %s::timestamptz, %s::int,"
+            " %s::boolean, %s::timestamptz)"
+        ),
+        page_size=len(values),
+    )
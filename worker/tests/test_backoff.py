@@ -0,0 +1,164 @@
+"""Backoff of failing targets, per-host circuit breakers, and the checker's fail-fast on unreachable hosts."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+import backoff
+from async_checker import check_url_async
+from backoff import HostCircuits, backoff_interval, backoff_until
+from checker import check_url
+
+
+@pytest.fixture(autouse=True)
+def backoff_settings(monkeypatch):
+    monkeypatch.setattr(backoff.settings, "BACKOFF_AFTER_FAILURES", 3)
+    monkeypatch.setattr(backoff.settings, "BACKOFF_MAX_SECONDS", 900)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(backoff.time, "monotonic", clock)
+    return clock
+
+
+def test_backoff_starts_at_threshold_and_doubles():
+    assert [backoff_interval(60, n) for n in range(8)] == [60, 60, 60, 120, 240, 480, 900, 900]
+
+
+def test_backoff_is_capped_but_never_below_own_interval():
+    assert backoff_interval(600, 3) == 900
+    assert backoff_interval(600, 10) == 900
+    assert backoff_interval(3600, 10) == 3600
+
+
+def test_backoff_survives_huge_failure_counts():
+    assert backoff_interval(60, 10**6) == 900
+
+
+def test_backoff_disabled(monkeypatch):
+    monkeypatch.setattr(backoff.settings, "BACKOFF_AFTER_FAILURES", 0)
+    assert backoff_interval(60, 50) == 60
+
+
+def test_backoff_until():
+    assert backoff_until(None) is None
+    expected = datetime.now(timezone.utc) + timedelta(seconds=120)
+    assert abs(backoff_until(backoff.time.monotonic() + 120) - expected) < timedelta(seconds=1)
+
+
+def down(error="Connection refused"):
+    return {"status_code": None, "error": error}
+
+
+def up(status=503):
+    return {"status_code": status, "error": None}
+
+
+def test_circuit_opens_after_threshold(clock):
+    circuits = HostCircuits(threshold=3, open_seconds=60)
+    for _ in range(2):
+        circuits.record("a.example.com", down())
+        assert circuits.fast_fail("a.example.com") is None
+    circuits.record("a.example.com", down("timed out"))
+    assert circuits.open_count == 1
+    error = circuits.fast_fail("a.example.com")
+    assert error is not None and "circuit open" in error and "timed out" in error
+    assert circuits.fast_fail("b.example.com") is None
+    assert circuits.fast_failures == 1
+
+
+def test_any_http_response_resets_the_count(clock):
+    circuits = HostCircuits(threshold=3, open_seconds=60)
+    circuits.record("a.example.com", down())
+    circuits.record("a.example.com", down())
+    circuits.record("a.example.com", up(500))  # an error status is still an answer
+    circuits.record("a.example.com", down())
+    circuits.record("a.example.com", down())
+    assert circuits.fast_fail("a.example.com") is None
+
+
+def test_half_open_lets_one_probe_through_then_closes_on_answer(clock):
+    circuits = HostCircuits(threshold=1, open_seconds=60)
+    circuits.record("a.example.com", down())
+    assert circuits.fast_fail("a.example.com") is not None
+    clock.now += 60
+    assert circuits.fast_fail("a.example.com") is None  # the probe
+    assert circuits.fast_fail("a.example.com") is not None  # everything else waits for it
+    circuits.record("a.example.com", up(200))
+    assert circuits.open_count == 0
+    assert circuits.fast_fail("a.example.com") is None
+
+
+def test_half_open_probe_failure_reopens(clock):
+    circuits = HostCircuits(threshold=1, open_seconds=60)
+    circuits.record("a.example.com", down())
+    clock.now += 60
+    assert circuits.fast_fail("a.example.com") is None
+    circuits.record("a.example.com", down())
+    clock.now += 59
+    assert circuits.fast_fail("a.example.com") is not None
+    clock.now += 1
+    assert circuits.fast_fail("a.example.com") is None
+
+
+def test_circuits_disabled(clock):
+    circuits = HostCircuits(threshold=0, open_seconds=60)
+    for _ in range(10):
+        circuits.record("a.example.com", down())
+    assert circuits.fast_fail("a.example.com") is None and circuits.open_count == 0
+
+
+def head_failing(error):
+    """A mock transport whose HEAD raises `error` and whose GET answers 200; records the methods sent."""
+    methods = []
+
+    def handler(request):
+        methods.append(request.method)
+        if request.method == "HEAD":
+            raise error(f"HEAD {error.__name__}", request=request)
+        return httpx.Response(200, content=b"ok")
+
+    return handler, methods
+
+
+@pytest.mark.parametrize("error", [httpx.ConnectError, httpx.ConnectTimeout])
+def test_unreachable_host_fails_fast_without_get(error):
+    handler, methods = head_failing(error)
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        result = check_url(client, "http://a.example.com/")
+    assert methods == ["HEAD"]
+    assert not result["is_up"] and result["error"] == f"HEAD {error.__name__}"
+
+
+@pytest.mark.parametrize("error", [httpx.ReadTimeout, httpx.WriteTimeout, httpx.RemoteProtocolError, httpx.ReadError])
+def test_head_failure_after_connect_retries_with_get(error):
+    handler, methods = head_failing(error)
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        result = check_url(client, "http://a.example.com/")
+    assert methods == ["HEAD", "GET"]
+    assert result["is_up"] and result["status_code"] == 200
+
+
+@pytest.mark.parametrize("error, methods", [(httpx.ConnectError, ["HEAD"]), (httpx.ReadTimeout, ["HEAD", "GET"])])
+def test_async_checker_matches_sync(error, methods):
+    handler, sent = head_failing(error)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await check_url_async(client, "http://a.example.com/")
+
+    result = asyncio.run(run())
+    assert sent == methods
+    assert result["is_up"] == (len(methods) == 2)
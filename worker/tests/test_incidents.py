@@ -0,0 +1,163 @@
+"""IncidentTracker: N-of-M debounce for opening and closing incidents."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import incidents
+from incidents import IncidentTracker
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeCursor:
+    """Answers the open-incidents lookup; write statements are captured by the execute_values patch."""
+
+    def __init__(self, open_in_db=()):
+        self.open_in_db = set(open_in_db)
+        self.looked_up = []
+
+    def execute(self, sql, params):
+        self.looked_up.append(list(params[0]))
+        self._result = [(t,) for t in params[0] if t in self.open_in_db]
+
+    def fetchall(self):
+        return self._result
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Incidents the tracker opens and closes, as ("open"|"close", values) in statement order."""
+    out = []
+
+    def execute_values(cur, sql, argslist, **kwargs):
+        kind = "close" if sql.lstrip().startswith("UPDATE") else "open"
+        out.extend((kind, values) for values in argslist)
+
+    monkeypatch.setattr(incidents, "execute_values", execute_values)
+    return out
+
+
+def checks(pattern, target_id=1, start=0):
+    """Rows for a pattern like "DDUD" (U up, D down), one minute apart."""
+    return [
+        (target_id, T0 + timedelta(minutes=start + i), 200 if c == "U" else 503, 10, c == "U", None)
+        for i, c in enumerate(pattern)
+    ]
+
+
+def feed(tracker, rows, cur=None, commit=True):
+    staged = tracker.write(cur or FakeCursor(), rows)
+    if commit:
+        tracker.commit(staged)
+    return staged
+
+
+def minute(n):
+    return T0 + timedelta(minutes=n)
+
+
+def test_opens_once_confirm_failures_agree(written):
+    tracker = IncidentTracker(confirm=3, window=3)
+    feed(tracker, checks("UDD"))
+    assert written == []
+    feed(tracker, checks("D", start=3))
+    assert written == [("open", (1, minute(1), None, None, "HTTP 503"))]
+
+
+def test_exactly_n_of_m_opens_at_first_failure_in_window(written):
+    tracker = IncidentTracker(confirm=3, window=5)
+    feed(tracker, checks("DUDUD"))
+    assert written == [("open", (1, minute(0), None, None, "HTTP 503"))]
+
+
+def test_n_failures_spread_wider_than_window_do_not_open(written):
+    tracker = IncidentTracker(confirm=3, window=4)
+    feed(tracker, checks("DUDUDUDU"))
+    assert written == []
+
+
+def test_flapping_target_never_opens(written):
+    tracker = IncidentTracker(confirm=2, window=2)
+    feed(tracker, checks("UDUDUDUDUD"))
+    assert written == []
+
+
+def test_recovery_needs_confirm_successes_and_ends_at_first_one(written):
+    tracker = IncidentTracker(confirm=2, window=3)
+    feed(tracker, checks("DD"))
+    assert [w[0] for w in written] == ["open"]
+    feed(tracker, checks("UD", start=2))
+    assert [w[0] for w in written] == ["open"]
+    feed(tracker, checks("U", start=4))
+    assert written[1] == ("close", (1, minute(2)))
+
+
+def test_window_restarts_after_a_transition(written):
+    tracker = IncidentTracker(confirm=2, window=2)
+    # The failures that opened the incident do not count toward closing it, nor a later reopen.
+    feed(tracker, checks("DDUDU"))
+    assert [w[0] for w in written] == ["open"]
+    feed(tracker, checks("UD", start=5))
+    assert [w[0] for w in written] == ["open", "close"]
+    feed(tracker, checks("D", start=7))
+    assert [w[0] for w in written] == ["open", "close", "open"]
+
+
+def test_open_and_close_in_one_batch_inserts_a_closed_incident(written):
+    tracker = IncidentTracker(confirm=2, window=2)
+    feed(tracker, checks("DDUU"))
+    assert written == [("open", (1, minute(0), minute(2), 120, "HTTP 503"))]
+
+
+def test_rows_are_folded_in_time_order(written):
+    tracker = IncidentTracker(confirm=2, window=2)
+    rows = checks("DDUU")
+    feed(tracker, list(reversed(rows)))
+    assert written == [("open", (1, minute(0), minute(2), 120, "HTTP 503"))]
+
+
+def test_targets_are_debounced_independently(written):
+    tracker = IncidentTracker(confirm=2, window=2)
+    feed(tracker, checks("DU", target_id=1) + checks("DD", target_id=2))
+    assert [(kind, values[0]) for kind, values in written] == [("open", 2)]
+
+
+def test_state_only_advances_on_commit(written):
+    tracker = IncidentTracker(confirm=2, window=2)
+    feed(tracker, checks("D"))
+    feed(tracker, checks("D", start=1), commit=False)  # transaction failed
+    assert len(written) == 1
+    written.clear()
+    feed(tracker, checks("D", start=1))  # retried with the same rows
+    assert written == [("open", (1, minute(0), None, None, "HTTP 503"))]
+
+
+def test_unknown_target_is_seeded_from_open_incidents(written):
+    tracker = IncidentTracker(confirm=2, window=2)
+    cur = FakeCursor(open_in_db={1})
+    feed(tracker, checks("UU", target_id=1) + checks("UU", target_id=2), cur=cur)
+    assert sorted(cur.looked_up[0]) == [1, 2]
+    assert written == [("close", (1, minute(0)))]
+    cur = FakeCursor()
+    feed(tracker, checks("U", target_id=1, start=2), cur=cur)
+    assert cur.looked_up == []  # known now
+
+
+def test_error_text_comes_from_the_check(written):
+    tracker = IncidentTracker(confirm=1, window=1)
+    feed(tracker, [(1, minute(0), None, None, False, "Connection refused")])
+    assert written == [("open", (1, minute(0), None, None, "Connection refused"))]
+
+
+def test_disabled_tracker_writes_nothing(written):
+    tracker = IncidentTracker(confirm=0, window=0)
+    assert feed(tracker, checks("DDDD")) == ({}, 0, 0)
+    assert written == [] and len(tracker) == 0
+
+
+def test_retain_forgets_targets_no_longer_owned(written):
+    tracker = IncidentTracker(confirm=2, window=2)
+    feed(tracker, checks("U", target_id=1) + checks("U", target_id=2))
+    tracker.retain({2})
+    assert len(tracker) == 1
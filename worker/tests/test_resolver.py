@@ -0,0 +1,70 @@
+"""DnsCache: which names go to the system resolver instead of the nameservers, and the hosts file parser."""
+
+import pytest
+
+import resolver
+from resolver import DnsCache, ResolutionError, _hosts_names
+
+
+class FakeResolver:
+    """Stands in for dns.resolver.Resolver and fails the test if it is asked anything."""
+
+    def __init__(self):
+        self.queries = []
+
+    def resolve(self, host, rdtype):
+        self.queries.append((host, rdtype))
+        raise AssertionError(f"{host} sent to the nameservers")
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    hosts = tmp_path / "hosts"
+    hosts.write_text("127.0.0.1 localhost  # loopback\n10.0.0.5 db.internal DB-Alias.internal.\n# 10.0.0.6 gone.example\n")
+    dns_cache = DnsCache(max_size=10, min_ttl=5, max_ttl=60, negative_ttl=30, hosts_path=str(hosts))
+    dns_cache._resolver = FakeResolver()
+    system = []
+
+    def system_lookup(host):
+        system.append(host)
+        if host == "missing":
+            raise ResolutionError("missing: Name or service not known")
+        return ["10.0.0.5"]
+
+    monkeypatch.setattr(resolver, "_system_lookup", system_lookup)
+    dns_cache.system = system
+    return dns_cache
+
+
+def test_hosts_names(tmp_path):
+    hosts = tmp_path / "hosts"
+    hosts.write_text("127.0.0.1 localhost  # loopback\n\n::1 ip6-localhost ip6-loopback\n# 10.0.0.6 gone.example\n")
+    assert _hosts_names(str(hosts)) == {"localhost", "ip6-localhost", "ip6-loopback"}
+    assert _hosts_names(str(tmp_path / "absent")) == frozenset()
+
+
+@pytest.mark.parametrize("host", ["localhost", "postgres", "postgres.", "db.internal", "DB.Internal", "db-alias.internal"])
+def test_single_label_and_hosts_names_use_system_resolver(cache, host):
+    assert cache.resolve(host) == ["10.0.0.5"]
+    assert cache.system == [host.lower()]
+    assert cache._resolver.queries == []
+
+
+def test_system_resolver_answer_cached_for_min_ttl(cache):
+    cache.resolve("postgres")
+    cache.resolve("postgres")
+    assert cache.system == ["postgres"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_system_resolver_failure_cached(cache):
+    for _ in range(2):
+        with pytest.raises(ResolutionError):
+            cache.resolve("missing")
+    assert cache.system == ["missing"]
+
+
+def test_other_names_go_to_nameservers(cache):
+    with pytest.raises(AssertionError, match="sent to the nameservers"):
+        cache.resolve("gone.example")
+    assert cache.system == []
@@ -0,0 +1,67 @@
+"""Rollup aggregation and the log-bucket latency sketch."""
+
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from rollups import GAMMA, GRANULARITIES, aggregate, sketch_index
+
+T0 = datetime(2026, 3, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("latency_ms", [2, 3, 49, 50, 51, 999, 1000, 1001, 29_999, 120_000])
+def test_sketch_index_bucket_contains_latency(latency_ms):
+    i = sketch_index(latency_ms)
+    assert GAMMA ** (i - 1) < latency_ms <= GAMMA**i * (1 + 1e-12)
+
+
+def test_sketch_index_is_monotonic_and_buckets_are_narrow():
+    indexes = [sketch_index(ms) for ms in range(1, 100_000)]
+    assert indexes == sorted(indexes)
+    # Each bucket is only ~4% wide, so consecutive large latencies mostly share a bucket...
+    assert sketch_index(10_000) == sketch_index(10_001)
+    # ...and latencies 5% apart never do.
+    assert all(sketch_index(ms) < sketch_index(math.ceil(ms * 1.05)) for ms in range(20, 100_000, 97))
+
+
+def test_zero_and_one_ms_share_bucket_zero():
+    assert sketch_index(0) == sketch_index(1) == 0
+
+
+def row(target_id, checked_at, latency_ms, is_up=True):
+    return (target_id, checked_at, 200 if is_up else 500, latency_ms, is_up, None)
+
+
+def by_key(rollups):
+    return {(r[0], r[1], r[2]): r for r in rollups}
+
+
+def test_aggregate_buckets_per_granularity():
+    rows = [
+        row(1, T0 + timedelta(seconds=5), 100),
+        row(1, T0 + timedelta(seconds=59), 300, is_up=False),
+        row(1, T0 + timedelta(seconds=60), 200),
+        row(1, T0 + timedelta(hours=1), None, is_up=False),
+    ]
+    out = by_key(aggregate(rows))
+    assert len(out) == 3 + 2 + 1
+    minute = out[(1, 60, T0)]
+    assert minute[3:9] == (2, 1, 2, 100, 300, 400)
+    assert minute[9].adapted == {str(sketch_index(100)): 1, str(sketch_index(300)): 1}
+    day = out[(1, 86400, T0.replace(hour=0))]
+    assert day[3:9] == (4, 2, 3, 100, 300, 600)
+    assert sum(day[9].adapted.values()) == 3  # latency-less checks count but are not sketched
+    assert {(k[1]) for k in out} == set(GRANULARITIES)
+
+
+def test_sketches_merge_by_adding_counts():
+    rng = random.Random(7)
+    rows = [row(1, T0 + timedelta(seconds=rng.randrange(3600)), rng.randrange(1, 5000)) for _ in range(500)]
+    whole = by_key(aggregate(rows))[(1, 3600, T0)][9].adapted
+    merged = {}
+    for part in (rows[:200], rows[200:]):
+        for k, v in by_key(aggregate(part))[(1, 3600, T0)][9].adapted.items():
+            merged[k] = merged.get(k, 0) + v
+    assert merged == whole
@@ -0,0 +1,181 @@
+"""Schedule: phase spreading, anchored rescheduling, interval changes, backoff, and fan-out to shared probes."""
+
+import pytest
+
+import backoff
+from scheduler import LagTracker, Schedule, _phase, group_by_url
+
+
+@pytest.fixture(autouse=True)
+def backoff_settings(monkeypatch):
+    monkeypatch.setattr(backoff.settings, "BACKOFF_AFTER_FAILURES", 3)
+    monkeypatch.setattr(backoff.settings, "BACKOFF_MAX_SECONDS", 900)
+
+
+def row(target_id, url="https://example.com/", interval=60, failures=0, **extra):
+    return {
+        "id": target_id,
+        "url": url,
+        "normalized_url": url,
+        "check_interval_seconds": interval,
+        "expected_status": None,
+        "body_keyword": None,
+        "body_regex": None,
+        "consecutive_failures": failures,
+        **extra,
+    }
+
+
+def schedule(rows, now=0.0, default_interval=300, refresh=30):
+    s = Schedule(default_interval, refresh)
+    s.sync(rows, now)
+    return s
+
+
+def key_of(s, url="https://example.com/"):
+    (key,) = [k for k, p in s._probes.items() if p.url == url]
+    return key
+
+
+def test_phase_is_stable_and_spread():
+    keys = [f"https://host{i}.example.com/" for i in range(1000)]
+    phases = [_phase(k) for k in keys]
+    assert phases == [_phase(k) for k in keys]
+    assert all(0 <= p < 1 for p in phases)
+    # Roughly uniform: every tenth of the interval gets some probes.
+    assert {int(p * 10) for p in phases} == set(range(10))
+
+
+def test_first_run_is_offset_by_phase():
+    s = schedule([row(1, interval=60)], now=1000.0)
+    key = key_of(s)
+    assert s._due[key] == pytest.approx(1000.0 + _phase(key) * 60)
+
+
+def test_pop_due_returns_only_due_probes_and_anchors_next_run():
+    s = schedule([row(1, interval=60)], now=0.0)
+    key = key_of(s)
+    first = s._due[key]
+    assert s.pop_due(first - 0.001) == []
+    [(probe, due)] = s.pop_due(first + 5)  # popped 5 s late
+    assert probe.key == key and due == first
+    assert s._due[key] == first + 60  # anchored to the due time, not to when it ran
+
+
+def test_falling_behind_skips_missed_slots_but_keeps_phase():
+    s = schedule([row(1, interval=60)], now=0.0)
+    key = key_of(s)
+    first = s._due[key]
+    assert len(s.pop_due(first + 250)) == 1  # one run, not five catch-up runs
+    assert s._due[key] == first + 300
+
+
+def test_interval_change_reschedules():
+    s = schedule([row(1, interval=600)], now=0.0)
+    key = key_of(s)
+    first = s._due[key]
+    s.pop_due(first)
+    assert s._due[key] == first + 600
+    # Shortened below the wait for the next slot: rescheduled within the new interval.
+    now = first + 10
+    s.sync([row(1, interval=60)], now=now)
+    assert now <= s._due[key] <= now + 60
+    [(_, due)] = s.pop_due(s._due[key])
+    assert s._due[key] == due + 60
+    # Lengthened: the pending slot stays, later runs use the new interval.
+    s.sync([row(1, interval=600)], now=due + 1)
+    pending = s._due[key]
+    assert pending == due + 60
+    s.pop_due(pending)
+    assert s._due[key] == pending + 600
+
+
+def test_deleted_probe_leaves_only_stale_heap_entries():
+    s = schedule([row(1, url="https://a.example.com/"), row(2, url="https://b.example.com/")], now=0.0)
+    gone = key_of(s, "https://a.example.com/")
+    kept = key_of(s, "https://b.example.com/")
+    s.sync([row(2, url="https://b.example.com/")], now=0.0)
+    assert [p.key for p, _ in s.pop_due(1000.0)] == [kept]
+    assert gone not in s._due
+    assert s.seconds_until_next(0.0) == pytest.approx(min(s._due[kept], s._next_refresh))
+
+
+def test_seconds_until_next_wakes_for_refresh():
+    s = schedule([row(1, interval=3600)], now=0.0, refresh=30)
+    assert s.seconds_until_next(0.0) == pytest.approx(min(30.0, s._due[key_of(s)]))
+    assert s.seconds_until_next(10_000.0) == 0.0
+
+
+def test_backoff_grows_after_threshold_and_resets_on_success():
+    s = schedule([row(1, interval=60)], now=0.0)
+    key = key_of(s)
+    due = s._due[key]
+    gaps = []
+    for _ in range(7):
+        [(_, due)] = s.pop_due(s._due[key])
+        next_run = s.record(key, due, is_up=False, now=due + 1)
+        gaps.append(s._due[key] - due)
+        assert (next_run is None) == (gaps[-1] == 60)
+    assert gaps == [60, 60, 120, 240, 480, 900, 900]
+    assert s.backed_off == 1
+    [(_, due)] = s.pop_due(s._due[key])
+    assert s.record(key, due, is_up=True, now=due + 1) is None
+    assert s._due[key] == due + 60
+    assert s.backed_off == 0
+
+
+def test_success_without_failures_does_not_reschedule():
+    s = schedule([row(1, interval=60)], now=0.0)
+    key = key_of(s)
+    [(_, due)] = s.pop_due(s._due[key])
+    assert s.record(key, due, is_up=True, now=due + 1) is None
+    assert s._due[key] == due + 60
+
+
+def test_newly_owned_probe_continues_backoff_from_target_status():
+    s = schedule([row(1, interval=60, failures=4)], now=0.0)
+    key = key_of(s)
+    assert s.effective_interval(key) == 240
+    assert s._due[key] == pytest.approx(_phase(key) * 240)
+
+
+def test_record_for_deleted_probe_is_ignored():
+    s = schedule([row(1)], now=0.0)
+    key = key_of(s)
+    s.sync([], now=0.0)
+    assert s.record(key, 0.0, is_up=False, now=1.0) is None
+
+
+def test_shared_probe_runs_at_shortest_interval_and_fans_out_per_target_interval():
+    s = schedule([row(1, interval=60), row(2, interval=120)], now=0.0)
+    key = key_of(s)
+    probe = s._probes[key]
+    assert probe.interval == 60 and len(s) == 2 and s.probe_count == 1
+    rows_per_run = []
+    for _ in range(6):
+        [(probe, due)] = s.pop_due(s._due[key])
+        rows_per_run.append([r["id"] for r in s.fan_out(probe, due)])
+    assert rows_per_run == [[1, 2], [1], [1, 2], [1], [1, 2], [1]]
+
+
+def test_fan_out_skips_targets_removed_since_pop():
+    s = schedule([row(1), row(2)], now=0.0)
+    [(probe, due)] = s.pop_due(s._due[key_of(s)])
+    s.sync([row(2)], now=due)
+    assert [r["id"] for r in s.fan_out(probe, due)] == [2]
+
+
+def test_group_by_url_splits_on_assertions():
+    probes = group_by_url([row(1), row(2, body_keyword="ok"), row(3)], 300)
+    assert sorted(len(p.members) for p in probes.values()) == [1, 2]
+
+
+def test_lag_tracker():
+    lag = LagTracker()
+    assert lag.mean == 0.0
+    for value in (-0.5, 1.0, 3.0):
+        lag.observe(value)
+    assert (lag.count, lag.max) == (3, 3.0)
+    assert lag.mean == pytest.approx(4.0 / 3)
+    lag.reset()
+    assert (lag.count, lag.total, lag.max) == (0, 0.0, 0.0)
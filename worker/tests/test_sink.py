@@ -0,0 +1,148 @@
+"""ResultSink write path: missing day partitions are created and retried, bad rows dropped one by one."""
+
+from datetime import date, datetime, timedelta, timezone
+
+import psycopg2.errors
+import pytest
+
+import sink
+from sink import ResultSink
+
+TODAY = datetime(2026, 1, 1, 23, 59, 59, tzinfo=timezone.utc)
+TOMORROW = TODAY + timedelta(seconds=2)
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.db.statements.append(sql)
+
+
+class FakeDatabase:
+    """Stands in for the connection and the write statements: checks partitioned by UTC day, FK on targets."""
+
+    def __init__(self, partitions, targets):
+        self.partitions = set(partitions)
+        self.targets = set(targets)
+        self.rows = []
+        self.pending = []
+        self.statements = []
+        self.ensured = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.rows += self.pending
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def insert_checks(self, cur, rows):
+        for row in rows:
+            if row[1].astimezone(timezone.utc).date() not in self.partitions:
+                raise psycopg2.errors.CheckViolation('no partition of relation "checks" found for row')
+            if row[0] not in self.targets:
+                raise psycopg2.errors.ForeignKeyViolation("insert or update on table \"checks\" violates foreign key")
+        self.pending += rows
+
+    def ensure_partitions(self, conn, first_day, last_day):
+        self.ensured.append((first_day, last_day))
+        day = first_day
+        while day <= last_day:
+            self.partitions.add(day)
+            day += timedelta(days=1)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDatabase(partitions={TODAY.date()}, targets={1, 2})
+    monkeypatch.setattr(sink, "insert_checks", db.insert_checks)
+    monkeypatch.setattr(sink, "upsert_rollups", lambda cur, rows: None)
+    monkeypatch.setattr(sink, "upsert_status", lambda cur, rows, backoff: None)
+    monkeypatch.setattr(sink, "ensure_partitions", db.ensure_partitions)
+    return db
+
+
+def result(checked_at, is_up=True):
+    return {
+        "checked_at": checked_at,
+        "status_code": 200 if is_up else 500,
+        "latency_ms": 10,
+        "is_up": is_up,
+        "error": None,
+        "ttfb_ms": 5,
+        "dns_ms": None,
+        "connect_ms": None,
+        "tls_ms": None,
+        "transfer_ms": 5,
+    }
+
+
+def make_sink(db):
+    s = ResultSink(batch_size=100, flush_seconds=60)
+    s.attach(db)
+    return s
+
+
+def dropped(reason):
+    return sink.metrics.RESULTS_DROPPED.labels(reason)._value.get()
+
+
+def test_missing_partition_is_created_and_batch_retried(db):
+    s = make_sink(db)
+    before = dropped("rejected")
+    s.buffer(1, result(TODAY))
+    s.buffer(2, result(TOMORROW))
+    s.flush()
+    assert db.ensured == [(TODAY.date(), date(2026, 1, 2))]
+    assert [(r[0], r[1]) for r in db.rows] == [(1, TODAY), (2, TOMORROW)]
+    assert dropped("rejected") == before
+    assert s.pending == 0
+    assert not any("SAVEPOINT" in sql for sql in db.statements)
+
+
+def test_partition_error_that_persists_is_not_dropped(db, monkeypatch):
+    def denied(conn, first_day, last_day):
+        raise psycopg2.OperationalError("permission denied for table checks")
+
+    monkeypatch.setattr(sink, "ensure_partitions", denied)
+    s = make_sink(db)
+    s.buffer(1, result(TOMORROW))
+    with pytest.raises(psycopg2.OperationalError):
+        s.flush()
+    assert db.rows == []
+    assert s.pending == 1
+
+
+def test_row_specific_failure_drops_only_that_row(db):
+    s = make_sink(db)
+    before = dropped("rejected")
+    s.buffer(1, result(TODAY))
+    s.buffer(99, result(TODAY))
+    s.buffer(2, result(TODAY))
+    s.flush()
+    assert [r[0] for r in db.rows] == [1, 2]
+    assert dropped("rejected") == before + 1
+    assert s.pending == 0
+
+
+def test_connection_error_keeps_rows_buffered(db, monkeypatch):
+    def lost(cur, rows):
+        raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    monkeypatch.setattr(sink, "insert_checks", lost)
+    s = make_sink(db)
+    s.buffer(1, result(TODAY))
+    with pytest.raises(psycopg2.OperationalError):
+        s.flush()
+    assert s.pending == 1
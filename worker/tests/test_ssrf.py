@@ -0,0 +1,103 @@
+"""SSRF range matcher: every built-in range at its edges, and IPv6 addresses that embed an IPv4 address."""
+
+import ipaddress
+
+import pytest
+
+import ssrf
+from ssrf import _DEFAULT_BLOCKED, RangeMatcher, is_blocked_ip
+
+NETS = [ipaddress.ip_network(cidr) for cidr in _DEFAULT_BLOCKED]
+IPV4_NETS = [net for net in NETS if net.version == 4]
+
+
+@pytest.fixture(autouse=True)
+def default_matcher(monkeypatch):
+    """Judge against the built-in list only, whatever SSRF_* variables the environment sets."""
+    monkeypatch.setattr(ssrf, "_matcher", RangeMatcher(_DEFAULT_BLOCKED))
+
+
+def mapped(ip: ipaddress.IPv4Address) -> str:
+    return str(ipaddress.IPv6Address((0xFFFF << 32) | int(ip)))
+
+
+def nat64(ip: ipaddress.IPv4Address) -> str:
+    return str(ipaddress.IPv6Address((0x0064FF9B << 96) | int(ip)))
+
+
+def sixtofour(ip: ipaddress.IPv4Address) -> str:
+    return str(ipaddress.IPv6Address((0x2002 << 112) | (int(ip) << 80) | 1))
+
+
+def outside_neighbours(net):
+    """The addresses just below and above net that are in no built-in range."""
+    max_value = 2**net.max_prefixlen - 1
+    for value in (int(net.network_address) - 1, int(net.broadcast_address) + 1):
+        if not 0 <= value <= max_value:
+            continue
+        ip = ipaddress.ip_address(value) if net.version == 4 else ipaddress.IPv6Address(value)
+        if not any(ip in other for other in NETS if other.version == net.version):
+            yield ip
+
+
+@pytest.mark.parametrize("net", NETS, ids=str)
+def test_range_edges_blocked(net):
+    assert is_blocked_ip(str(net.network_address))
+    assert is_blocked_ip(str(net.broadcast_address))
+
+
+@pytest.mark.parametrize("net", NETS, ids=str)
+def test_range_neighbours_allowed(net):
+    for ip in outside_neighbours(net):
+        assert not is_blocked_ip(str(ip)), f"{ip} next to {net}"
+
+
+@pytest.mark.parametrize("embed", [mapped, nat64, sixtofour], ids=["mapped", "nat64", "6to4"])
+@pytest.mark.parametrize("net", IPV4_NETS, ids=str)
+def test_embedded_ipv4_range_edges(net, embed):
+    assert is_blocked_ip(embed(net.network_address))
+    assert is_blocked_ip(embed(net.broadcast_address))
+    for ip in outside_neighbours(net):
+        assert not is_blocked_ip(embed(ip)), f"{embed(ip)} embeds {ip} next to {net}"
+
+
+@pytest.mark.parametrize(
+    "ip, blocked",
+    [
+        ("::ffff:127.0.0.1", True),
+        ("::ffff:169.254.169.254", True),
+        ("::ffff:8.8.8.8", False),
+        ("64:ff9b::c0a8:101", True),       # NAT64 of 192.168.1.1
+        ("64:ff9b::a9fe:a9fe", True),      # NAT64 of 169.254.169.254
+        ("64:ff9b::808:808", False),       # NAT64 of 8.8.8.8
+        ("2002:a00:1::1", True),           # 6to4 of 10.0.0.1
+        ("2002:7f00:1::", True),           # 6to4 of 127.0.0.1
+        ("2002:808:808::1", False),        # 6to4 of 8.8.8.8
+        ("64:ff9b:1::1", True),            # local-use NAT64 is blocked as a range
+        ("fd00:ec2::254", True),           # AWS metadata
+        ("fe80::1%eth0", True),            # scope id is ignored
+        ("2606:4700:4700::1111", False),
+        ("8.8.8.8", False),
+        ("", True),
+        ("not-an-ip", True),
+        ("10.0.0.256", True),
+    ],
+)
+def test_special_addresses(ip, blocked):
+    assert is_blocked_ip(ip) is blocked
+
+
+def test_allowlist_carves_out_of_blocklist():
+    matcher = RangeMatcher(["10.0.0.0/8", "fc00::/7"], ["10.1.0.0/16", "fd00::/8"])
+    assert matcher.contains(4, int(ipaddress.IPv4Address("10.0.255.255")))
+    assert not matcher.contains(4, int(ipaddress.IPv4Address("10.1.0.0")))
+    assert not matcher.contains(4, int(ipaddress.IPv4Address("10.1.255.255")))
+    assert matcher.contains(4, int(ipaddress.IPv4Address("10.2.0.0")))
+    assert matcher.contains(6, int(ipaddress.IPv6Address("fc00::")))
+    assert not matcher.contains(6, int(ipaddress.IPv6Address("fd00::1")))
+
+
+def test_overlapping_and_adjacent_ranges_merge():
+    matcher = RangeMatcher(["10.0.0.0/24", "10.0.1.0/24", "10.0.0.128/25"])
+    assert matcher._starts[4] == [int(ipaddress.IPv4Address("10.0.0.0"))]
+    assert matcher._ends[4] == [int(ipaddress.IPv4Address("10.0.1.255"))]
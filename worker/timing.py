@@ -0,0 +1,80 @@
+"""
+Per-check phase timing: DNS, TCP connect and TLS handshake, from httpcore's `trace` request extension and
+the DNS cache.
+
+A PhaseTimer is made active (a context variable) while a check resolves and requests; the checker passes its
+callback as the requests' `trace` extension (kept across redirects), and DnsCache.resolve reports each
+lookup it sends to a resolver. Phases add up over every connection the check opens (HEAD, GET retry,
+redirects). A lookup made while a connection is being opened is counted as DNS, not connect. A check on
+a reused pooled connection has zero connect and TLS time. Each event costs one perf_counter() call.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_active: ContextVar["PhaseTimer | None"] = ContextVar("phase_timer", default=None)
+
+_CONNECT_STARTED = "connection.connect_tcp.started"
+_TLS_STARTED = "connection.start_tls.started"
+
+
+class PhaseTimer:
+    """Accumulated seconds per phase for one check."""
+
+    __slots__ = ("dns", "connect", "tls", "_connect_start", "_tls_start", "_dns_during_connect")
+
+    def __init__(self):
+        self.dns = 0.0
+        self.connect = 0.0
+        self.tls = 0.0
+        self._connect_start: float | None = None
+        self._tls_start: float | None = None
+        self._dns_during_connect = 0.0
+
+    def trace(self, name: str, info: dict) -> None:
+        """httpcore trace callback (sync clients)."""
+        if name == _CONNECT_STARTED:
+            self._connect_start = time.perf_counter()
+            self._dns_during_connect = 0.0
+        elif name == _TLS_STARTED:
+            self._tls_start = time.perf_counter()
+        elif self._connect_start is not None and name.startswith("connection.connect_tcp."):
+            self.connect += time.perf_counter() - self._connect_start - self._dns_during_connect
+            self._connect_start = None
+        elif self._tls_start is not None and name.startswith("connection.start_tls."):
+            self.tls += time.perf_counter() - self._tls_start
+            self._tls_start = None
+
+    async def atrace(self, name: str, info: dict) -> None:
+        """httpcore trace callback (async clients)."""
+        self.trace(name, info)
+
+    @contextmanager
+    def measuring(self) -> Iterator["PhaseTimer"]:
+        """Charge DNS lookups made inside the block (in this context, or threads started from it) to this check."""
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    def add_dns(self, seconds: float) -> None:
+        self.dns += seconds
+        if self._connect_start is not None:
+            self._dns_during_connect += seconds
+
+    def fill(self, result: dict) -> dict:
+        """Set dns_ms, connect_ms and tls_ms on a check result."""
+        result["dns_ms"] = int(self.dns * 1000)
+        result["connect_ms"] = int(self.connect * 1000)
+        result["tls_ms"] = int(self.tls * 1000)
+        return result
+
+
+def record_dns(seconds: float) -> None:
+    """Charge a resolver lookup to the active check, if any."""
+    timer = _active.get()
+    if timer is not None:
+        timer.add_dns(seconds)